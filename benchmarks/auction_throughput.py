@@ -0,0 +1,52 @@
+"""
+Throughput of continuous matching against a call auction for a burst of orders.
+
+Run from the repository root:
+    python -m benchmarks.auction_throughput --orders 100000
+"""
+import argparse
+import random
+import time
+
+from matching_engine import OrderBook
+
+
+def make_burst(count, spread, seed):
+    rng = random.Random(seed)
+    return [
+        ("buy" if rng.random() < 0.5 else "sell", round(100 + rng.gauss(0, spread), 2), rng.randint(1, 100))
+        for _ in range(count)
+    ]
+
+
+def run_burst(burst, auction):
+    order_book = OrderBook("BENCH", "Benchmark")
+    order_book.set_auction_mode(auction)
+    start = time.perf_counter()
+    for side, price, quantity in burst:
+        order_book.submit(order_book.create_order(side, price, quantity))
+    submitted = time.perf_counter()
+    volume = order_book.uncross()[1] if auction else 0
+    end = time.perf_counter()
+    return submitted - start, end - submitted, volume, len(order_book.orders)
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--spread", type=float, default=1.0, help="Standard deviation of limit prices around 100")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    burst = make_burst(args.orders, args.spread, args.seed)
+
+    for name, auction in (("continuous", False), ("call auction", True)):
+        # Best of N to reduce noise from other processes
+        submit, uncross, volume, resting = min(run_burst(burst, auction) for _ in range(args.repeat))
+        total = submit + uncross
+        print(f"{name:<16}submit {submit * 1e3:8.1f} ms  uncross {uncross * 1e3:8.1f} ms  "
+              f"{args.orders / total:>10.0f} orders/s  ({resting} orders left resting)")
+
+
+if __name__ == '__main__':
+    run()
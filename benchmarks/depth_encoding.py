@@ -0,0 +1,100 @@
+"""
+Encoded size and encode/decode time of the packed MarketDepth message against
+a naive layout with one submessage (double price, int64 quantity) per level,
+with and without gzip compression.
+
+Run from the repository root:
+    python -m benchmarks.depth_encoding --levels 10 100 1000
+"""
+import argparse
+import gzip
+import random
+import time
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+from market_depth import decode_depth, encode_depth
+from matching_engine import OrderBook
+
+
+def naive_depth_class():
+    """
+    Build the naive message type at runtime, it is only needed for the comparison:
+        message NaiveLevel { double price = 1; int64 quantity = 2; }
+        message NaiveDepth { string ticker_symbol = 1; repeated NaiveLevel bids = 2; repeated NaiveLevel asks = 3; }
+    """
+    field = descriptor_pb2.FieldDescriptorProto
+    file_proto = descriptor_pb2.FileDescriptorProto(name="naive_depth.proto", package="benchmarks", syntax="proto3")
+    level = file_proto.message_type.add(name="NaiveLevel")
+    level.field.add(name="price", number=1, type=field.TYPE_DOUBLE, label=field.LABEL_OPTIONAL)
+    level.field.add(name="quantity", number=2, type=field.TYPE_INT64, label=field.LABEL_OPTIONAL)
+    depth = file_proto.message_type.add(name="NaiveDepth")
+    depth.field.add(name="ticker_symbol", number=1, type=field.TYPE_STRING, label=field.LABEL_OPTIONAL)
+    for number, name in ((2, "bids"), (3, "asks")):
+        depth.field.add(name=name, number=number, type=field.TYPE_MESSAGE, label=field.LABEL_REPEATED,
+                        type_name=".benchmarks.NaiveLevel")
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("benchmarks.NaiveDepth"))
+
+
+def make_book(levels, seed):
+    """A book with `levels` price levels on each side, a few ticks apart, like a deep liquid book."""
+    rng = random.Random(seed)
+    order_book = OrderBook("BENCH", "Benchmark")
+    bid = ask = 10000  # Ticks of 0.01
+    for _ in range(levels):
+        bid -= rng.randint(1, 3)
+        ask += rng.randint(1, 3)
+        order_book.submit(order_book.create_order("buy", bid / 100, rng.randint(1, 5000)))
+        order_book.submit(order_book.create_order("sell", ask / 100, rng.randint(1, 5000)))
+    return order_book
+
+
+def per_call_us(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    NaiveDepth = naive_depth_class()
+
+    print(f"{'levels':>7}{'format':>8}{'bytes':>9}{'gzip':>9}{'encode us':>11}{'serialize us':>14}{'decode us':>11}")
+    for levels in args.levels:
+        snapshot = make_book(levels, args.seed).snapshot
+        repeat = max(args.repeat * 10 // levels, 20)
+
+        def encode_naive():
+            bids, asks = snapshot.bids(levels), snapshot.asks(levels)
+            depth = NaiveDepth(ticker_symbol=snapshot.symbol)
+            for price, quantity in bids:
+                depth.bids.add(price=price, quantity=quantity)
+            for price, quantity in asks:
+                depth.asks.add(price=price, quantity=quantity)
+            return depth
+
+        def decode_naive(data):
+            depth = NaiveDepth.FromString(data)
+            return [(level.price, level.quantity) for level in depth.bids], [(level.price, level.quantity) for level in depth.asks]
+
+        packed = encode_depth(snapshot, levels, 0.01)
+        for name, encode, message_class, decode in (
+                ("packed", lambda: encode_depth(snapshot, levels, 0.01), type(packed),
+                 lambda data: decode_depth(type(packed).FromString(data))),
+                ("naive", encode_naive, NaiveDepth, decode_naive)):
+            message = encode()
+            data = message.SerializeToString()
+            print(f"{levels:>7}{name:>8}{len(data):>9}{len(gzip.compress(data)):>9}"
+                  f"{per_call_us(encode, repeat):>11.1f}{per_call_us(message.SerializeToString, repeat):>14.1f}"
+                  f"{per_call_us(lambda: decode(data), repeat):>11.1f}")
+
+
+if __name__ == '__main__':
+    run()
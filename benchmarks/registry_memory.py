@@ -0,0 +1,93 @@
+"""
+Memory cost per ticker of the registry, with eager and lazy order book creation.
+
+Run from the repository root:
+    python -m benchmarks.registry_memory --symbols 10000
+"""
+import argparse
+import asyncio
+import gc
+import tracemalloc
+
+import ticker_service_pb2
+from matching_engine import BookSide, OrderBook
+from ticker_registry import TickerRegistry
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def make_tickers(count):
+    return [ticker_service_pb2.TickerInfo(symbol=f"SYM{i:05d}", name=f"Instrument {i}") for i in range(count)]
+
+
+async def fill_books(registry, symbols, orders_per_book):
+    for symbol in symbols:
+        order_book = registry.get_order_book(symbol)
+        for i in range(orders_per_book):
+            # Bids below asks so the orders rest instead of matching
+            await order_book.add_limit_order("buy" if i % 2 else "sell", 101 - (i % 2) * 2, 10)
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=10000)
+    parser.add_argument("--active-fraction", type=float, default=0.02, help="Fraction of symbols receiving orders")
+    parser.add_argument("--orders-per-book", type=int, default=10)
+    args = parser.parse_args()
+    count = args.symbols
+
+    tickers = make_tickers(count)
+    active = [ticker.symbol for ticker in tickers[:int(count * args.active_fraction)]]
+
+    def eager():
+        # What the servicer used to do: one OrderBook per ticker up front
+        return {ticker.symbol: OrderBook(ticker.symbol, ticker.name) for ticker in tickers}
+
+    def lazy_registry():
+        return TickerRegistry(OrderBook, tickers)
+
+    def lazy_with_activity():
+        registry = TickerRegistry(OrderBook, tickers)
+        asyncio.run(fill_books(registry, active, args.orders_per_book))
+        return registry
+
+    eager_bytes, _ = measure(eager)
+    lazy_bytes, _ = measure(lazy_registry)
+
+    # Build, fill, then drain and reclaim within one trace so the freed memory is visible
+    gc.collect()
+    tracemalloc.start()
+    registry = lazy_with_activity()
+    gc.collect()
+    active_bytes = tracemalloc.get_traced_memory()[0]
+    _drain_and_reclaim(registry)
+    gc.collect()
+    reclaim_bytes = tracemalloc.get_traced_memory()[0] - active_bytes
+    tracemalloc.stop()
+
+    print(f"{count} symbols, {len(active)} active with {args.orders_per_book} resting orders each")
+    print(f"{'eager order books':<36}{eager_bytes / 1e6:>10.2f} MB {eager_bytes / count:>10.0f} B/symbol")
+    print(f"{'lazy registry, no orders':<36}{lazy_bytes / 1e6:>10.2f} MB {lazy_bytes / count:>10.0f} B/symbol")
+    print(f"{'lazy registry, active books':<36}{active_bytes / 1e6:>10.2f} MB {active_bytes / count:>10.0f} B/symbol")
+    print(f"{'freed by reclaiming idle books':<36}{-reclaim_bytes / 1e6:>10.2f} MB ({len(registry.order_books)} books left)")
+
+
+def _drain_and_reclaim(registry):
+    for order_book in registry.order_books.values():
+        order_book.orders.clear()
+        order_book.bids = BookSide(is_buy=True)
+        order_book.asks = BookSide(is_buy=False)
+    return registry.reclaim_idle_books(0)
+
+
+if __name__ == '__main__':
+    run()
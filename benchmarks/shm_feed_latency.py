@@ -0,0 +1,89 @@
+"""
+Latency from snapshot publication to a reader in another process seeing it in
+the shared-memory feed, plus the cost of publishing and reading one update.
+
+Run from the repository root:
+    python -m benchmarks.shm_feed_latency --updates 20000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from matching_engine import OrderBook
+from shm_feed import SharedMemoryFeed, SharedMemoryReader
+
+
+def write_updates(name, updates, depth, interval, ready):
+    feed = SharedMemoryFeed(name, depth, max_symbols=1)
+    order_book = OrderBook("BENCH", "Benchmark")
+    rng = random.Random(1)
+    orders = [("buy" if rng.random() < 0.5 else "sell", round(100 + rng.gauss(0, 1), 2), rng.randint(1, 100))
+              for _ in range(updates)]
+    for side, price, quantity in orders[:1000]:
+        order_book.submit(order_book.create_order(side, price, quantity))
+    start = time.perf_counter()
+    for _ in range(updates):
+        feed.publish(order_book.snapshot)
+    print(f"publish {(time.perf_counter() - start) / updates * 1e6:8.2f} us per update ({depth} levels)")
+
+    # Every order below changes the depth, so it publishes exactly one new snapshot version
+    order_book.snapshot_listeners.append(feed.publish)
+    ready.set()
+    time.sleep(0.5)
+    for side, price, quantity in orders:
+        order_book.submit(order_book.create_order(side, price, quantity))
+        # Paced, so the reader is not just measuring how far it lags behind the writer
+        deadline = time.perf_counter() + interval
+        while time.perf_counter() < deadline:
+            pass
+    time.sleep(0.5)
+    feed.close()
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=50, help="Time between orders (us)")
+    args = parser.parse_args()
+    name = f"shm_feed_bench_{time.monotonic_ns()}"
+
+    ready = multiprocessing.Event()
+    writer = multiprocessing.Process(target=write_updates,
+                                     args=(name, args.updates, args.depth, args.interval / 1e6, ready))
+    writer.start()
+    ready.wait()
+    reader = SharedMemoryReader(name)
+    latencies = []
+    book = reader.read("BENCH")
+    last_sequence = int(book["sequence"])
+    last_version = int(book["snapshot_version"]) + args.updates
+    while book["snapshot_version"] < last_version:
+        sequence = reader.sequence("BENCH")
+        if sequence == last_sequence or sequence & 1:
+            continue
+        book = reader.read("BENCH")
+        latencies.append(time.monotonic_ns() - int(book["publish_ns"]))
+        last_sequence = int(book["sequence"])
+
+    start = time.perf_counter()
+    for _ in range(args.updates):
+        reader.read("BENCH")
+    read_ns = (time.perf_counter() - start) / args.updates * 1e9
+    reader.close()
+    writer.join()
+
+    latencies = np.array(latencies) / 1e3
+    if len(os.sched_getaffinity(0)) < 2:
+        print("Warning: only one CPU available, the latencies below include switching between writer and reader")
+    print(f"read    {read_ns / 1e3:8.2f} us per consistent copy")
+    print(f"seen {len(latencies)} of {args.updates} updates, publish to read latency (us): "
+          f"p50 {np.percentile(latencies, 50):.1f}  p99 {np.percentile(latencies, 99):.1f}  max {latencies.max():.1f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,229 @@
+import math
+import time
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram in the spirit of HdrHistogram.
+
+    Values (integer nanoseconds) are grouped by their power of two and each
+    power of two is split into a fixed number of linear sub-buckets, so the
+    relative error of any reported percentile stays below
+    1 / 2**(sub_bucket_bits - 1) regardless of magnitude. Recording is a
+    couple of integer operations and a list increment.
+    """
+
+    def __init__(self, sub_bucket_bits=7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.half_count = 1 << (sub_bucket_bits - 1)
+        self.counts = [0] * (2 * self.half_count)
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def _bucket_index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self.half_count + (value >> shift)
+
+    def _bucket_bounds(self, index):
+        shift = index // self.half_count - 1
+        if shift <= 0:
+            return index, index
+        mantissa = index - shift * self.half_count
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        """Record a single non-negative integer value (nanoseconds)."""
+        if value < 0:
+            value = 0
+        index = self._bucket_index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.total_count += 1
+        self.total_sum += value
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other):
+        """Add all recorded values of another histogram with the same layout."""
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        self.max_value = max(self.max_value, other.max_value)
+
+    def reset(self):
+        self.counts = [0] * (2 * self.half_count)
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def mean(self):
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+    def percentile(self, percent):
+        """
+        Get the value at the given percentile (0-100).
+        Returns the upper bound of the bucket holding that rank, clamped to the recorded max.
+        """
+        if not self.total_count:
+            return 0
+        rank = max(1, math.ceil(self.total_count * percent / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._bucket_bounds(index)[1], self.max_value)
+        return self.max_value
+
+    def percentiles(self, percents=(50, 90, 99, 99.9)):
+        """Get several percentiles in a single pass over the buckets."""
+        result = {}
+        if not self.total_count:
+            return {percent: 0 for percent in percents}
+        ranks = sorted((max(1, math.ceil(self.total_count * percent / 100.0)), percent) for percent in percents)
+        seen = 0
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(ranks) and seen >= ranks[position][0]:
+                result[ranks[position][1]] = min(self._bucket_bounds(index)[1], self.max_value)
+                position += 1
+            if position == len(ranks):
+                break
+        return {percent: result.get(percent, self.max_value) for percent in percents}
+
+    def summary(self, percents=(50, 90, 99, 99.9)):
+        """Get count, min, mean, max and the requested percentiles as a dict."""
+        return {
+            "count": self.total_count,
+            "min": self.min_value or 0,
+            "mean": self.mean(),
+            "max": self.max_value,
+            "percentiles": self.percentiles(percents),
+        }
+
+
+def format_summary(name, histogram, unit_ns=1000, unit="us"):
+    """Format a histogram summary as a single human readable line."""
+    summary = histogram.summary()
+    percentiles = "  ".join(
+        f"p{percent:g}={value / unit_ns:.1f}" for percent, value in summary["percentiles"].items()
+    )
+    return (
+        f"{name:<36} n={summary['count']:<8} min={summary['min'] / unit_ns:.1f}  "
+        f"mean={summary['mean'] / unit_ns:.1f}  {percentiles}  max={summary['max'] / unit_ns:.1f} ({unit})"
+    )
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request. Each mark() records the time since
+    the previous mark under the given stage name; finish() records the total.
+    """
+    __slots__ = ("stats", "rpc", "symbol", "start_ns", "last_ns")
+
+    def __init__(self, stats, rpc, symbol):
+        self.stats = stats
+        self.rpc = rpc
+        self.symbol = symbol
+        self.start_ns = self.last_ns = time.perf_counter_ns()
+
+    def mark(self, stage):
+        now = time.perf_counter_ns()
+        self.stats.record(self.rpc, self.symbol, stage, now - self.last_ns)
+        self.last_ns = now
+
+    def finish(self):
+        now = time.perf_counter_ns()
+        self.stats.record(self.rpc, self.symbol, "total", now - self.start_ns)
+
+
+class _NullTimer:
+    """Stand-in used when instrumentation is disabled, so call sites need no checks."""
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class LatencyStats:
+    """
+    Per (rpc, symbol, stage) latency histograms for the server.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.started_ns = time.monotonic_ns()
+
+    def timer(self, rpc, symbol):
+        """Start timing a request. Returns a no-op timer when disabled."""
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self, rpc, symbol)
+
+    def record(self, rpc, symbol, stage, elapsed_ns):
+        key = (rpc, symbol, stage)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+
+    def reset(self):
+        self.histograms.clear()
+        self.started_ns = time.monotonic_ns()
+
+    def collect(self, rpc="", symbol=""):
+        """
+        Get histograms matching the optional rpc/symbol filters.
+        Returns:
+            list: (rpc, symbol, stage, histogram) tuples. Entries with an empty symbol
+            aggregate the stage over all symbols of that rpc.
+        """
+        per_symbol = []
+        per_rpc = {}
+        for (key_rpc, key_symbol, stage), histogram in self.histograms.items():
+            if rpc and key_rpc != rpc:
+                continue
+            if key_symbol and (not symbol or key_symbol == symbol):
+                per_symbol.append((key_rpc, key_symbol, stage, histogram))
+            aggregate = per_rpc.get((key_rpc, stage))
+            if aggregate is None:
+                aggregate = per_rpc[(key_rpc, stage)] = LatencyHistogram(histogram.sub_bucket_bits)
+            aggregate.merge(histogram)
+
+        aggregates = [(key_rpc, "", stage, histogram) for (key_rpc, stage), histogram in per_rpc.items()]
+        return sorted(aggregates, key=lambda entry: entry[:3]) + sorted(per_symbol, key=lambda entry: entry[:3])
+
+    def dump(self):
+        """Format the per-rpc aggregates as text, one stage per line."""
+        lines = []
+        for rpc, symbol, stage, histogram in self.collect():
+            if symbol:
+                continue
+            lines.append(format_summary(f"{rpc}.{stage}", histogram))
+        return "\n".join(lines)
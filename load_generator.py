@@ -0,0 +1,344 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import grpc
+
+import ticker_service_pb2
+import ticker_service_pb2_grpc
+from latency_stats import LatencyHistogram, format_summary
+
+
+def parse_mix(text, value_type=float):
+    """Parse a 'AAPL=3,GOOGL=1' style option into a dict."""
+    mix = {}
+    if not text:
+        return mix
+    for item in text.split(","):
+        symbol, _, value = item.partition("=")
+        mix[symbol.strip()] = value_type(value) if value else value_type(1)
+    return mix
+
+
+class LoadStats:
+    def __init__(self):
+        self.ack_latency = LatencyHistogram()  # Intended send time -> ack (coordinated omission corrected)
+        self.service_time = LatencyHistogram()  # Actual send time -> ack
+        self.wire_in_latency = LatencyHistogram()  # Client send -> server receive
+        self.send_to_match_latency = LatencyHistogram()  # Client send -> fill, for orders that traded
+        self.market_data_latency = LatencyHistogram()  # Client send -> update received by a subscriber
+        self.server_latency = LatencyHistogram()  # Server receive -> publish of the update it triggered
+        self.wire_out_latency = LatencyHistogram()  # Publish -> update received by a subscriber
+        self.sequence_gaps = 0
+        self.sent = 0
+        self.acked = 0
+        self.errors = {}
+        self.market_data_updates = 0
+        self.market_data_batches = 0  # Messages received by multiplexed subscribers
+        self.max_backlog = 0
+
+    def record_error(self, code):
+        self.errors[code] = self.errors.get(code, 0) + 1
+
+
+class OrderFactory:
+    """
+    Generates a random order flow according to the configured symbol and order mix.
+    """
+
+    def __init__(self, symbol_weights, base_prices, market_ratio=0.0, buy_ratio=0.5,
+                 price_spread=0.02, min_quantity=1, max_quantity=20, seed=None):
+        self.symbols = list(symbol_weights)
+        self.cum_weights = []
+        total = 0.0
+        for symbol in self.symbols:
+            total += symbol_weights[symbol]
+            self.cum_weights.append(total)
+        self.base_prices = base_prices
+        self.market_ratio = market_ratio
+        self.buy_ratio = buy_ratio
+        self.price_spread = price_spread
+        self.min_quantity = min_quantity
+        self.max_quantity = max_quantity
+        self.random = random.Random(seed)
+
+    def next_order(self):
+        rnd = self.random
+        symbol = rnd.choices(self.symbols, cum_weights=self.cum_weights)[0]
+        side = "buy" if rnd.random() < self.buy_ratio else "sell"
+        quantity = rnd.randint(self.min_quantity, self.max_quantity)
+
+        if rnd.random() < self.market_ratio:
+            return "market", ticker_service_pb2.MarketOrderRequest(
+                ticker_symbol=symbol, side=side, quantity=quantity)
+
+        # Buy orders are placed below the base price and sell orders above it, with
+        # enough overlap that a fraction of the flow crosses and trades.
+        base_price = self.base_prices.get(symbol, 100.0)
+        offset = rnd.uniform(-0.25, 1.0) * base_price * self.price_spread
+        price = base_price - offset if side == "buy" else base_price + offset
+        return "limit", ticker_service_pb2.LimitOrderRequest(
+            ticker_symbol=symbol, side=side, price=round(price, 2), quantity=quantity)
+
+
+async def dispatch_orders(queue, factory, stats, rate, duration, poisson, worker_count):
+    """
+    Open-loop scheduler: every order gets an intended send time derived only from
+    the target rate, never from how fast the server answers, so slow responses
+    show up as latency instead of silently lowering the offered load.
+    """
+    interval_ns = 1e9 / rate
+    rnd = random.Random()
+    start = time.perf_counter_ns()
+    end = start + int(duration * 1e9)
+    intended = float(start)
+
+    while intended < end:
+        delay = intended - time.perf_counter_ns()
+        if delay > 0:
+            await asyncio.sleep(delay / 1e9)
+
+        now = time.perf_counter_ns()
+        while intended <= now and intended < end:
+            queue.put_nowait((int(intended), factory.next_order()))
+            intended += rnd.expovariate(1.0) * interval_ns if poisson else interval_ns
+        stats.max_backlog = max(stats.max_backlog, queue.qsize())
+
+    for _ in range(worker_count):
+        queue.put_nowait(None)
+
+
+async def order_worker(stub, queue, stats, metadata=()):
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        intended_ns, (kind, request) = item
+
+        send_ns = time.perf_counter_ns()
+        request.client_send_time_ns = time.time_ns()
+        stats.sent += 1
+        try:
+            if kind == "limit":
+                response = await stub.SubmitLimitOrder(request, metadata=metadata)
+            else:
+                response = await stub.SubmitMarketOrder(request, metadata=metadata)
+        except grpc.aio.AioRpcError as e:
+            stats.record_error(e.code().name)
+            continue
+
+        done_ns = time.perf_counter_ns()
+        stats.acked += 1
+        stats.ack_latency.record(done_ns - intended_ns)
+        stats.service_time.record(done_ns - send_ns)
+        # Wall clock differences between client and server: exact on the same host,
+        # as good as the clock synchronisation otherwise
+        stats.wire_in_latency.record(response.receive_time_ns - response.client_send_time_ns)
+        if response.match_time_ns:
+            stats.send_to_match_latency.record(response.match_time_ns - response.client_send_time_ns)
+
+
+def record_market_data(market_data, now, last_sequences, stats):
+    """
+    Measures an update against the timestamps it carries: the client send time
+    of the order that triggered it (end to end), the server receive/publish
+    times and the per-ticker sequence number.
+    """
+    stats.market_data_updates += 1
+    last_sequence = last_sequences.get(market_data.ticker_symbol)
+    if last_sequence and market_data.sequence != last_sequence + 1:
+        stats.sequence_gaps += 1
+    last_sequences[market_data.ticker_symbol] = market_data.sequence
+    if market_data.client_send_time_ns:
+        stats.market_data_latency.record(now - market_data.client_send_time_ns)
+    if market_data.order_receive_monotonic_ns:
+        stats.server_latency.record(market_data.publish_monotonic_ns - market_data.order_receive_monotonic_ns)
+    stats.wire_out_latency.record(now - market_data.publish_time_ns)
+
+
+async def market_data_subscriber(stub, ticker_symbol, stats, options=None):
+    """
+    Subscribes to one ticker and records each update.
+    """
+    last_sequences = {}
+    request = ticker_service_pb2.TickerRequest(ticker_symbol=ticker_symbol, options=options)
+    try:
+        async for market_data in stub.ConnectToMarketData(request):
+            record_market_data(market_data, time.time_ns(), last_sequences, stats)
+    except grpc.aio.AioRpcError as e:
+        if e.code() != grpc.StatusCode.CANCELLED:
+            stats.record_error(f"SUBSCRIBE_{e.code().name}")
+
+
+async def multiplexed_subscriber(stub, ticker_symbols, stats, options=None):
+    """
+    Subscribes to several tickers over one stream and records each update of every batch.
+    """
+    last_sequences = {}
+    request = ticker_service_pb2.MultiTickerRequest(ticker_symbols=ticker_symbols, options=options)
+    try:
+        async for batch in stub.SubscribeMarketData(request):
+            now = time.time_ns()
+            stats.market_data_batches += 1
+            for market_data in batch.updates:
+                record_market_data(market_data, now, last_sequences, stats)
+    except grpc.aio.AioRpcError as e:
+        if e.code() != grpc.StatusCode.CANCELLED:
+            stats.record_error(f"SUBSCRIBE_{e.code().name}")
+
+
+def client_metadata(client_id, connection_index):
+    """Metadata identifying the client of a connection, used by the server's rate limiter."""
+    if not client_id:
+        return ()
+    return (("client-id", f"{client_id}-{connection_index}"),)
+
+
+def open_channel(target):
+    # A local subchannel pool forces one TCP connection per channel instead of
+    # letting gRPC share a single connection between identical channels.
+    return grpc.aio.insecure_channel(target, options=[("grpc.use_local_subchannel_pool", 1)])
+
+
+async def run_load(args):
+    stats = LoadStats()
+
+    channels = [open_channel(args.target) for _ in range(args.connections)]
+    stubs = [ticker_service_pb2_grpc.TickerServiceStub(channel) for channel in channels]
+
+    symbol_weights = parse_mix(args.symbols)
+    if not symbol_weights:
+        response = await stubs[0].GetTickers(ticker_service_pb2.TickerRequest())
+        symbol_weights = {ticker.symbol: 1.0 for ticker in response.tickers}
+    factory = OrderFactory(
+        symbol_weights,
+        parse_mix(args.prices),
+        market_ratio=args.market_ratio,
+        buy_ratio=args.buy_ratio,
+        price_spread=args.price_spread,
+        min_quantity=args.min_quantity,
+        max_quantity=args.max_quantity,
+        seed=args.seed,
+    )
+
+    # Subscriber fleet, spread round-robin over the symbols and its own connections
+    subscriber_target = args.subscriber_target or args.target
+    subscription_options = ticker_service_pb2.SubscriptionOptions(
+        only_on_change=args.only_on_change, min_interval_ms=args.min_interval)
+    subscriber_channels = [open_channel(subscriber_target) for _ in range(min(args.subscribers, args.connections))]
+    subscriber_tasks = []
+    for index in range(args.subscribers):
+        stub = ticker_service_pb2_grpc.TickerServiceStub(subscriber_channels[index % len(subscriber_channels)])
+        if args.multiplexed:
+            subscriber = multiplexed_subscriber(stub, factory.symbols, stats, subscription_options)
+        else:
+            subscriber = market_data_subscriber(stub, factory.symbols[index % len(factory.symbols)], stats,
+                                                subscription_options)
+        subscriber_tasks.append(asyncio.create_task(subscriber))
+    if subscriber_tasks:
+        await asyncio.sleep(args.warmup)
+
+    queue = asyncio.Queue()
+    worker_count = args.connections * args.concurrency
+    workers = [
+        asyncio.create_task(order_worker(
+            stubs[index % len(stubs)], queue, stats, client_metadata(args.client_id, index % len(stubs))))
+        for index in range(worker_count)
+    ]
+
+    started = time.perf_counter()
+    await dispatch_orders(queue, factory, stats, args.rate, args.duration, args.poisson, worker_count)
+    try:
+        await asyncio.wait_for(asyncio.gather(*workers), timeout=args.drain_timeout)
+    except asyncio.TimeoutError:
+        stats.record_error("DRAIN_TIMEOUT")
+    elapsed = time.perf_counter() - started
+
+    # Give subscribers a moment to receive the updates for the last orders
+    if subscriber_tasks:
+        await asyncio.sleep(args.warmup)
+    for task in subscriber_tasks + workers:
+        task.cancel()
+    await asyncio.gather(*subscriber_tasks, *workers, return_exceptions=True)
+    for channel in channels + subscriber_channels:
+        await channel.close()
+
+    return stats, elapsed
+
+
+def report(stats, elapsed, args):
+    print(f"\nTarget rate: {args.rate:.0f}/s  Achieved: {stats.acked / elapsed:.0f} acks/s over {elapsed:.1f}s")
+    print(f"Sent: {stats.sent}  Acked: {stats.acked}  Max scheduler backlog: {stats.max_backlog}")
+    print(f"Market data updates received: {stats.market_data_updates}  Sequence gaps: {stats.sequence_gaps}")
+    if stats.market_data_batches:
+        print(f"Market data batches received: {stats.market_data_batches}  "
+              f"({stats.market_data_updates / stats.market_data_batches:.1f} updates per batch)")
+    if stats.errors:
+        print("Errors: " + ", ".join(f"{code}={count}" for code, count in sorted(stats.errors.items())))
+    print(format_summary("ack latency", stats.ack_latency))
+    print(format_summary("service time", stats.service_time))
+    print(format_summary("wire in", stats.wire_in_latency))
+    print(format_summary("send to match", stats.send_to_match_latency))
+    print(format_summary("server receive to publish", stats.server_latency))
+    print(format_summary("wire out", stats.wire_out_latency))
+    print(format_summary("market data end to end", stats.market_data_latency))
+
+    if args.json:
+        result = {
+            "args": vars(args),
+            "elapsed": elapsed,
+            "sent": stats.sent,
+            "acked": stats.acked,
+            "errors": stats.errors,
+            "max_backlog": stats.max_backlog,
+            "market_data_updates": stats.market_data_updates,
+            "market_data_batches": stats.market_data_batches,
+            "sequence_gaps": stats.sequence_gaps,
+            "ack_latency_ns": stats.ack_latency.summary(),
+            "service_time_ns": stats.service_time.summary(),
+            "wire_in_latency_ns": stats.wire_in_latency.summary(),
+            "send_to_match_latency_ns": stats.send_to_match_latency.summary(),
+            "server_latency_ns": stats.server_latency.summary(),
+            "wire_out_latency_ns": stats.wire_out_latency.summary(),
+            "market_data_latency_ns": stats.market_data_latency.summary(),
+        }
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop gRPC load generator for the ticker service")
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--connections", type=int, default=4, help="Number of client connections")
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight orders per connection")
+    parser.add_argument("--rate", type=float, default=1000, help="Target orders per second (all connections)")
+    parser.add_argument("--duration", type=float, default=10, help="Test duration in seconds")
+    parser.add_argument("--poisson", action="store_true", help="Use Poisson arrivals instead of a fixed interval")
+    parser.add_argument("--symbols", default="", help="Symbol mix, e.g. AAPL=3,GOOGL=1 (default: all tickers, equal weight)")
+    parser.add_argument("--prices", default="AAPL=100,GOOGL=500,AMZN=3000", help="Base price per symbol")
+    parser.add_argument("--market-ratio", type=float, default=0.05, help="Fraction of market orders")
+    parser.add_argument("--buy-ratio", type=float, default=0.5, help="Fraction of buy orders")
+    parser.add_argument("--price-spread", type=float, default=0.02, help="Limit price offset as a fraction of base price")
+    parser.add_argument("--min-quantity", type=int, default=1)
+    parser.add_argument("--max-quantity", type=int, default=20)
+    parser.add_argument("--subscribers", type=int, default=0, help="Number of market data subscribers to attach")
+    parser.add_argument("--multiplexed", action="store_true",
+                        help="Each subscriber watches all symbols over one SubscribeMarketData stream")
+    parser.add_argument("--only-on-change", action="store_true",
+                        help="Subscribers only receive updates that change the best bid or ask")
+    parser.add_argument("--min-interval", type=int, default=0, help="Subscribers receive at most one update per ticker per N ms")
+    parser.add_argument("--subscriber-target", default="", help="Subscribe through this relay instead of --target")
+    parser.add_argument("--warmup", type=float, default=0.5, help="Seconds to let subscribers connect and drain")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="Seconds to wait for in-flight orders at the end")
+    parser.add_argument("--client-id", default="loadgen", help="Client id sent per connection as '<id>-<n>' (empty: none)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", default="", help="Write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    stats, elapsed = asyncio.run(run_load(args))
+    report(stats, elapsed, args)
@@ -0,0 +1,111 @@
+import asyncio
+import collections
+import contextvars
+import time
+
+
+# (rpc, ticker_symbol) of the request a task is serving. Handlers set it once at
+# the start; every callback of that task then runs in a context holding it.
+current_request = contextvars.ContextVar("current_request", default=("", ""))
+
+
+class SlowCallback:
+    __slots__ = ("timestamp_ns", "duration_ns", "rpc", "ticker_symbol", "callback")
+
+    def __init__(self, timestamp_ns, duration_ns, rpc, ticker_symbol, callback):
+        self.timestamp_ns = timestamp_ns
+        self.duration_ns = duration_ns
+        self.rpc = rpc
+        self.ticker_symbol = ticker_symbol
+        self.callback = callback
+
+    def __repr__(self):
+        return f"SlowCallback({self.rpc}, {self.ticker_symbol}, {self.callback}, {self.duration_ns / 1e6:.2f}ms)"
+
+
+def describe_callback(callback):
+    """Get a short name for an event loop callback, resolving task steps to their coroutine."""
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", repr(coro))
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+class LoopMonitor:
+    """
+    Watches the asyncio event loop the server runs on.
+
+    A sampler task sleeps for a fixed interval and records how late it wakes up
+    (scheduling lag) into the "EventLoop"/"lag" histogram of the server stats.
+    Every callback the loop runs is timed as well; callbacks running longer than
+    the threshold are recorded, attributed to the RPC and symbol of the request
+    that was executing, as a "slow_callback" stage and in a bounded list of
+    recent events.
+    """
+
+    def __init__(self, stats, interval=0.01, slow_callback_threshold=0.005, max_events=100):
+        self.stats = stats
+        self.interval = interval
+        self.slow_callback_threshold_ns = int(slow_callback_threshold * 1e9)
+        self.slow_callbacks = collections.deque(maxlen=max_events)
+        self.sampler_task = None
+        self._original_run = None
+
+    def start(self):
+        """
+        Start sampling lag and timing callbacks. Does nothing with stats disabled,
+        so the loop then runs without the Handle._run patch.
+        """
+        if self.sampler_task is not None or not self.stats.enabled:
+            return
+        self._install_callback_timer()
+        self.sampler_task = asyncio.get_running_loop().create_task(self._sample_lag())
+
+    def stop(self):
+        if self.sampler_task is not None:
+            self.sampler_task.cancel()
+            self.sampler_task = None
+        if self._original_run is not None:
+            asyncio.Handle._run = self._original_run
+            self._original_run = None
+
+    def clear(self):
+        self.slow_callbacks.clear()
+
+    async def _sample_lag(self):
+        interval_ns = int(self.interval * 1e9)
+        expected = time.perf_counter_ns() + interval_ns
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter_ns()
+            if self.stats.enabled:
+                self.stats.record("EventLoop", "", "lag", max(0, now - expected))
+            expected = now + interval_ns
+
+    def _install_callback_timer(self):
+        # Handle._run executes every callback the loop schedules (including each
+        # step of every task), so wrapping it times all work on the loop for the
+        # cost of two clock reads per callback.
+        original_run = asyncio.Handle._run
+        threshold_ns = self.slow_callback_threshold_ns
+        monitor = self
+
+        def _timed_run(handle):
+            start = time.perf_counter_ns()
+            original_run(handle)
+            elapsed = time.perf_counter_ns() - start
+            if elapsed >= threshold_ns:
+                monitor._record_slow_callback(handle, elapsed)
+
+        self._original_run = original_run
+        asyncio.Handle._run = _timed_run
+
+    def _record_slow_callback(self, handle, elapsed_ns):
+        context = getattr(handle, "_context", None)
+        rpc, ticker_symbol = context.get(current_request, ("", "")) if context is not None else ("", "")
+        if not self.stats.enabled:
+            return
+        self.stats.record(rpc or "EventLoop", ticker_symbol, "slow_callback", elapsed_ns)
+        self.slow_callbacks.append(SlowCallback(
+            time.time_ns(), elapsed_ns, rpc, ticker_symbol, describe_callback(handle._callback)))
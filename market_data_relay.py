@@ -0,0 +1,230 @@
+"""
+Market data relay: fans the market data of a server out to many subscribers.
+
+The relay subscribes upstream once per ticker that has downstream subscribers,
+keeps the latest update of each as its copy of the book, and serves
+ConnectToMarketData, GetMarketData and GetTickers with the same API as the
+server. Relays can therefore be chained into a tree, so the matching process
+only serves a handful of relays however many viewers there are:
+
+    python market_data_relay.py --upstream localhost:50051 --port 50061
+    python market_data_relay.py --upstream localhost:50061 --port 50062
+
+Updates are forwarded as the serialized bytes received from upstream, so the
+relay never parses or re-serializes them. Every update carries the full top of
+book, so a subscriber too slow to keep up loses its oldest queued updates
+instead of slowing down the others.
+"""
+import argparse
+import asyncio
+import signal
+
+import grpc
+import ticker_service_pb2
+
+SERVICE_NAME = "ticker_service.TickerService"
+# Upstream failures worth resubscribing after, e.g. a restarting server; anything else is passed on to subscribers
+RETRYABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED)
+
+
+class RelayedTicker:
+    """
+    Upstream subscription of one ticker and the queues of its downstream subscribers.
+    """
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.latest = None  # Serialized latest MarketData, sent first to new subscribers
+        self.subscribers = set()  # Queues of serialized MarketData, or of the AioRpcError that ended the ticker
+        self.upstream_task = None
+        self.updates = 0  # Updates received from upstream
+        self.dropped = 0  # Updates dropped from the queues of slow subscribers
+
+
+class MarketDataRelay:
+    def __init__(self, upstream, queue_size=64, reconnect_delay=1.0):
+        self.upstream = upstream
+        self.channel = grpc.aio.insecure_channel(upstream)
+        # Responses are passed through as bytes: no deserializer upstream, no serializer downstream
+        self.upstream_market_data = self.channel.unary_stream(
+            f"/{SERVICE_NAME}/ConnectToMarketData",
+            request_serializer=ticker_service_pb2.TickerRequest.SerializeToString)
+        self.upstream_get_market_data = self.channel.unary_unary(
+            f"/{SERVICE_NAME}/GetMarketData",
+            request_serializer=ticker_service_pb2.TickerRequest.SerializeToString)
+        self.upstream_get_tickers = self.channel.unary_unary(f"/{SERVICE_NAME}/GetTickers")
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.tickers = {}  # symbol -> RelayedTicker with at least one subscriber
+
+    def handler(self):
+        """
+        Generic handler serving the relayed RPCs; other RPCs are answered with UNIMPLEMENTED.
+        """
+        return grpc.method_handlers_generic_handler(SERVICE_NAME, {
+            "ConnectToMarketData": grpc.unary_stream_rpc_method_handler(
+                self.ConnectToMarketData, request_deserializer=ticker_service_pb2.TickerRequest.FromString),
+            "GetMarketData": grpc.unary_unary_rpc_method_handler(
+                self.GetMarketData, request_deserializer=ticker_service_pb2.TickerRequest.FromString),
+            "GetTickers": grpc.unary_unary_rpc_method_handler(self.GetTickers),
+        })
+
+    async def ConnectToMarketData(self, request, context):
+        """
+        Streams the market data of a ticker, starting with its latest update if
+        there is one. The first subscriber of a ticker starts its upstream subscription.
+        A non-retryable upstream error ends the stream with the same status.
+        """
+        symbol = request.ticker_symbol
+        ticker = self.tickers.get(symbol)
+        if ticker is None:
+            ticker = self.tickers[symbol] = RelayedTicker(symbol)
+            ticker.upstream_task = asyncio.create_task(self.relay_upstream(ticker))
+            print(f"Relaying ticker: {symbol}")
+
+        queue = asyncio.Queue(self.queue_size)
+        if ticker.latest is not None:
+            queue.put_nowait(ticker.latest)
+        ticker.subscribers.add(queue)
+        try:
+            while True:
+                market_data = await queue.get()
+                if isinstance(market_data, grpc.aio.AioRpcError):
+                    await context.abort(market_data.code(), market_data.details())
+                yield market_data
+        finally:
+            ticker.subscribers.discard(queue)
+            if not ticker.subscribers and self.tickers.get(symbol) is ticker:
+                # Last subscriber gone: stop relaying the ticker
+                ticker.upstream_task.cancel()
+                del self.tickers[symbol]
+                print(f"Stopped relaying ticker: {symbol}")
+
+    async def GetMarketData(self, request, context):
+        ticker = self.tickers.get(request.ticker_symbol)
+        if ticker is not None and ticker.latest is not None:
+            return ticker.latest
+        try:
+            return await self.upstream_get_market_data(request)
+        except grpc.aio.AioRpcError as e:
+            await context.abort(e.code(), e.details())
+
+    async def GetTickers(self, request, context):
+        try:
+            return await self.upstream_get_tickers(request)
+        except grpc.aio.AioRpcError as e:
+            await context.abort(e.code(), e.details())
+
+    async def relay_upstream(self, ticker):
+        """
+        Subscribes upstream to a ticker and forwards every update to its
+        subscribers, resubscribing after a delay whenever the stream ends or
+        fails with a retryable status. Any other error, such as NOT_FOUND for an
+        unknown ticker, is passed on to the subscribers and ends the ticker.
+        """
+        request = ticker_service_pb2.TickerRequest(ticker_symbol=ticker.symbol)
+        while True:
+            call = self.upstream_market_data(request)
+            try:
+                # Once subscribed, fetch the current state for subscribers that join before the next update
+                initial_sequence = await self.initialize_latest(ticker, request)
+                async for market_data in call:
+                    if initial_sequence:
+                        # Skip updates the initial state already includes
+                        if ticker_service_pb2.MarketData.FromString(market_data).sequence <= initial_sequence:
+                            continue
+                        initial_sequence = 0
+                    ticker.latest = market_data
+                    ticker.updates += 1
+                    self.fan_out(ticker, market_data)
+                print(f"Upstream stream for {ticker.symbol} ended")
+            except grpc.aio.AioRpcError as e:
+                print(f"Upstream stream for {ticker.symbol} failed: {e.code().name} {e.details()}")
+                if e.code() not in RETRYABLE_CODES:
+                    self.close_ticker(ticker, e)
+                    return
+            finally:
+                call.cancel()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def close_ticker(self, ticker, error):
+        """
+        Stop relaying a ticker and end the streams of its subscribers with the upstream error.
+        Later subscribers start a new upstream subscription.
+        """
+        if self.tickers.get(ticker.symbol) is ticker:
+            del self.tickers[ticker.symbol]
+        self.fan_out(ticker, error)
+        print(f"Stopped relaying ticker: {ticker.symbol}")
+
+    async def initialize_latest(self, ticker, request):
+        """
+        Get the latest update of a ticker from upstream and forward it, unless it
+        is already known.
+        Returns:
+            int: its sequence number, 0 if there is none yet
+        """
+        try:
+            market_data = await self.upstream_get_market_data(request)
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                return 0  # Upstream without GetMarketData, subscribers wait for the next update
+            raise
+        sequence = ticker_service_pb2.MarketData.FromString(market_data).sequence
+        if sequence and market_data != ticker.latest:
+            ticker.latest = market_data
+            self.fan_out(ticker, market_data)
+        return sequence
+
+    @staticmethod
+    def fan_out(ticker, market_data):
+        for queue in ticker.subscribers:
+            if queue.full():
+                queue.get_nowait()  # The update replaces the oldest one queued
+                ticker.dropped += 1
+            queue.put_nowait(market_data)
+
+    async def dump_stats_periodically(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            for ticker in self.tickers.values():
+                print(f"{ticker.symbol}: {len(ticker.subscribers)} subscribers, "
+                      f"{ticker.updates} updates, {ticker.dropped} dropped")
+
+
+async def serve(port=50061, upstream="localhost:50051", queue_size=64, reconnect_delay=1.0, stats_interval=0):
+    relay = MarketDataRelay(upstream, queue_size, reconnect_delay)
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((relay.handler(),))
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    print(f"Relay started on port {port}, upstream {upstream}")
+    stats_task = asyncio.create_task(relay.dump_stats_periodically(stats_interval)) if stats_interval > 0 else None
+    # Shut down cleanly on Ctrl-C or SIGTERM: a cancelled wait_for_termination() also cancels the server's own
+    # shutdown, so stop() could not be awaited after it
+    stop_requested = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop_requested.set)
+    try:
+        await stop_requested.wait()
+    finally:
+        await server.stop(1)
+        tasks = [ticker.upstream_task for ticker in relay.tickers.values()]
+        if stats_task is not None:
+            tasks.append(stats_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await relay.channel.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Market data relay")
+    parser.add_argument("--port", type=int, default=50061)
+    parser.add_argument("--upstream", default="localhost:50051", help="Server or relay to subscribe to")
+    parser.add_argument("--queue-size", type=int, default=64, help="Updates queued per subscriber before the oldest are dropped")
+    parser.add_argument("--reconnect-delay", type=float, default=1, help="Seconds to wait before resubscribing upstream")
+    parser.add_argument("--stats-interval", type=float, default=0, help="Print per-ticker counters every N seconds (0 = never)")
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.port, args.upstream, args.queue_size, args.reconnect_delay, args.stats_interval))
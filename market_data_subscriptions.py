@@ -0,0 +1,302 @@
+import asyncio
+import time
+
+import grpc
+import ticker_service_pb2
+
+
+class MarketDataSubscription:
+    """
+    Market data subscription of one stream to any number of tickers.
+
+    The server pushes updates of the subscribed tickers as they are published;
+    they accumulate until the stream's generator takes them, so all updates
+    published while it was waiting for its turn on the event loop (or for flow
+    control) go out together as one MarketDataBatch.
+
+    Updates pass the stream's SubscriptionOptions before they are queued:
+    updates that do not change the best bid and ask (only_on_change) or do not
+    move a best price far enough (min_price_move) are skipped, and with
+    min_interval_ms at most one update per ticker is sent per interval. An
+    update held back by the interval is replaced by any newer one and sent
+    when the interval ends, so the client always ends up with the latest state.
+    """
+
+    def __init__(self, options=None):
+        self.symbols = set()
+        self.pending = []  # MarketData published since the last batch, in publication order
+        self.ready = asyncio.Event()
+        self.error = None  # (grpc.StatusCode, details) that ends the stream
+        self.last_sent = {}  # symbol -> latest MarketData queued for the client
+        self.last_sent_ns = {}  # symbol -> monotonic time it was queued
+        self.deferred = {}  # symbol -> latest MarketData held back by min_interval_ms
+        self.flush_handles = {}  # symbol -> timer sending the deferred update
+        self.set_options(options or ticker_service_pb2.SubscriptionOptions())
+
+    def set_options(self, options):
+        self.only_on_change = options.only_on_change
+        self.min_interval_ns = options.min_interval_ms * 1_000_000
+        self.min_price_move = options.min_price_move
+        self.filtered = self.only_on_change or self.min_interval_ns > 0 or self.min_price_move > 0
+
+    def push(self, market_data):
+        if not self.filtered:
+            self.pending.append(market_data)
+            self.ready.set()
+            return
+
+        symbol = market_data.ticker_symbol
+        last_sent = self.last_sent.get(symbol)
+        if last_sent is not None and not self._is_news(market_data, last_sent):
+            # Back to what the client has seen, so an update held back is no longer news either
+            self.deferred.pop(symbol, None)
+            return
+        if self.min_interval_ns > 0:
+            wait_ns = self.last_sent_ns.get(symbol, 0) + self.min_interval_ns - time.monotonic_ns()
+            if wait_ns > 0:
+                self.deferred[symbol] = market_data
+                if symbol not in self.flush_handles:
+                    self.flush_handles[symbol] = asyncio.get_running_loop().call_later(
+                        wait_ns / 1e9, self._flush, symbol)
+                return
+        self._send(market_data)
+
+    def _is_news(self, market_data, last_sent):
+        if self.min_price_move > 0:
+            return (self._moved(market_data.best_bid_price, last_sent.best_bid_price) or
+                    self._moved(market_data.best_ask_price, last_sent.best_ask_price))
+        if self.only_on_change:
+            return (market_data.best_bid_price != last_sent.best_bid_price or
+                    market_data.best_ask_price != last_sent.best_ask_price or
+                    market_data.best_bid_quantity != last_sent.best_bid_quantity or
+                    market_data.best_ask_quantity != last_sent.best_ask_quantity)
+        return True
+
+    def _moved(self, price, last_price):
+        # An empty side is published as price 0, so a side emptying or filling up counts as a move
+        if not price or not last_price:
+            return price != last_price
+        return abs(price - last_price) >= self.min_price_move
+
+    def _send(self, market_data):
+        symbol = market_data.ticker_symbol
+        self.last_sent[symbol] = market_data
+        self.last_sent_ns[symbol] = time.monotonic_ns()
+        self.pending.append(market_data)
+        self.ready.set()
+
+    def _flush(self, symbol):
+        del self.flush_handles[symbol]
+        market_data = self.deferred.pop(symbol, None)
+        if market_data is not None:
+            self._send(market_data)
+
+    def forget(self, symbol):
+        """
+        Drop the filter state of a ticker that is no longer subscribed.
+        """
+        self.last_sent.pop(symbol, None)
+        self.last_sent_ns.pop(symbol, None)
+        self.deferred.pop(symbol, None)
+        handle = self.flush_handles.pop(symbol, None)
+        if handle is not None:
+            handle.cancel()
+
+    def close(self, code, details):
+        self.error = (code, details)
+        self.ready.set()
+
+    async def next_updates(self):
+        """
+        Wait for updates.
+        Returns:
+            list: the MarketData pending, or None once the subscription was closed
+        """
+        await self.ready.wait()
+        self.ready.clear()
+        if self.error is not None:
+            return None
+        updates, self.pending = self.pending, []
+        return updates
+
+    async def next_batch(self):
+        """
+        Wait for updates.
+        Returns:
+            MarketDataBatch: all updates pending, or None once the subscription was closed
+        """
+        updates = await self.next_updates()
+        return None if updates is None else ticker_service_pb2.MarketDataBatch(updates=updates)
+
+
+class DepthSubscription:
+    """
+    Market depth stream of one ticker. Every MarketDepth carries the whole
+    book up to the requested levels, so a client that falls behind only gets
+    the latest one.
+    """
+
+    def __init__(self, symbol, levels):
+        self.symbol = symbol
+        self.levels = levels
+        self.latest = None
+        self.ready = asyncio.Event()
+
+    def push(self, depth):
+        self.latest = depth
+        self.ready.set()
+
+    async def next_depth(self):
+        await self.ready.wait()
+        self.ready.clear()
+        depth, self.latest = self.latest, None
+        return depth
+
+
+class OrderBookEventSubscription:
+    """
+    Book event (market by order) stream of one ticker. Events cannot be
+    conflated like depth: a client that misses one can no longer keep its copy
+    of the book, so a client that falls more than max_pending events behind is
+    disconnected and has to start over from a snapshot.
+    """
+
+    def __init__(self, symbol, max_pending):
+        self.symbol = symbol
+        self.max_pending = max_pending
+        self.pending = []  # OrderBookEvent published since the last batch
+        self.ready = asyncio.Event()
+        self.error = None  # (grpc.StatusCode, details) that ends the stream
+
+    def push(self, book_event):
+        if self.error is not None:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.pending = []
+            self.error = (grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"More than {self.max_pending} book events behind, resubscribe and take a new snapshot")
+        else:
+            self.pending.append(book_event)
+        self.ready.set()
+
+    async def next_batch(self):
+        """
+        Wait for book events.
+        Returns:
+            OrderBookEventBatch: all events pending, or None once the client fell too far behind
+        """
+        await self.ready.wait()
+        self.ready.clear()
+        if self.error is not None:
+            return None
+        events, self.pending = self.pending, []
+        return ticker_service_pb2.OrderBookEventBatch(ticker_symbol=self.symbol, events=events)
+
+
+class OrderUpdateSubscription:
+    """
+    Order update stream of one client. Updates are not conflated either, so a
+    client that falls more than max_pending updates behind is disconnected
+    rather than queueing updates without bound.
+    """
+
+    def __init__(self, client_id, max_pending):
+        self.client_id = client_id
+        self.max_pending = max_pending
+        self.pending = []  # OrderUpdate published since the client last took them
+        self.ready = asyncio.Event()
+        self.error = None  # (grpc.StatusCode, details) that ends the stream
+
+    def push(self, order_update):
+        if self.error is not None:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.pending = []
+            self.error = (grpc.StatusCode.RESOURCE_EXHAUSTED, f"More than {self.max_pending} order updates behind")
+        else:
+            self.pending.append(order_update)
+        self.ready.set()
+
+    async def next_updates(self):
+        """
+        Wait for order updates.
+        Returns:
+            list: the OrderUpdate pending, or None once the client fell too far behind
+        """
+        await self.ready.wait()
+        self.ready.clear()
+        if self.error is not None:
+            return None
+        updates, self.pending = self.pending, []
+        return updates
+
+
+class SubscriptionIndex:
+    """
+    Market data, depth and book event subscriptions by ticker, so publishing an
+    update only visits the streams subscribed to its ticker.
+    """
+
+    def __init__(self):
+        self.by_symbol = {}  # symbol -> set of MarketDataSubscription
+        self.depth_by_symbol = {}  # symbol -> set of DepthSubscription
+        self.events_by_symbol = {}  # symbol -> set of OrderBookEventSubscription
+
+    def subscribed_symbols(self):
+        return self.by_symbol.keys() | self.depth_by_symbol.keys() | self.events_by_symbol.keys()
+
+    def add_events(self, subscription):
+        """
+        Returns:
+            bool: whether it is the first book event subscription of its ticker
+        """
+        subscribers = self.events_by_symbol.setdefault(subscription.symbol, set())
+        subscribers.add(subscription)
+        return len(subscribers) == 1
+
+    def remove_events(self, subscription):
+        """
+        Returns:
+            bool: whether it was the last book event subscription of its ticker
+        """
+        subscribers = self.events_by_symbol[subscription.symbol]
+        subscribers.discard(subscription)
+        if subscribers:
+            return False
+        del self.events_by_symbol[subscription.symbol]
+        return True
+
+    def add_depth(self, subscription):
+        self.depth_by_symbol.setdefault(subscription.symbol, set()).add(subscription)
+
+    def remove_depth(self, subscription):
+        subscribers = self.depth_by_symbol[subscription.symbol]
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self.depth_by_symbol[subscription.symbol]
+
+    def subscribe(self, subscription, symbols):
+        """
+        Returns:
+            list: the symbols that were newly subscribed
+        """
+        added = [symbol for symbol in dict.fromkeys(symbols) if symbol not in subscription.symbols]
+        for symbol in added:
+            subscription.symbols.add(symbol)
+            self.by_symbol.setdefault(symbol, set()).add(subscription)
+        return added
+
+    def unsubscribe(self, subscription, symbols):
+        for symbol in symbols:
+            if symbol not in subscription.symbols:
+                continue
+            subscription.symbols.discard(symbol)
+            subscription.forget(symbol)
+            subscribers = self.by_symbol[symbol]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.by_symbol[symbol]
+
+    def publish(self, market_data):
+        for subscription in self.by_symbol.get(market_data.ticker_symbol, ()):
+            subscription.push(market_data)
@@ -0,0 +1,69 @@
+"""
+Compact encoding of order book depth as MarketDepth messages.
+
+Prices are sent as integers in ticks of tick_size and the levels of each side
+as parallel packed arrays, best first: the best price in full, then for every
+level its distance in ticks from the previous one (0 for the best level).
+Neighbouring levels are usually a few ticks apart, so each price costs one
+or two bytes instead of an 8 byte double plus the tag and length of a
+submessage per level.
+"""
+import numpy as np
+
+import ticker_service_pb2
+
+NUMPY_MIN_LEVELS = 64  # Below this, converting to and from arrays costs more than plain Python loops
+
+
+def price_deltas(prices, tick_size, sign):
+    """
+    Convert prices, best first, to ticks.
+    Returns:
+        tuple: (best price in ticks, list of tick distances from the previous level, starting with 0)
+    """
+    if len(prices) < NUMPY_MIN_LEVELS:
+        ticks = [round(price / tick_size) for price in prices]
+        return ticks[0], [0] + [sign * (b - a) for a, b in zip(ticks, ticks[1:])]
+    ticks = np.rint(np.array(prices) / tick_size).astype(np.int64)
+    return int(ticks[0]), (sign * np.diff(ticks, prepend=ticks[0])).tolist()
+
+
+def encode_depth(snapshot, levels, tick_size, publish_time_ns=0):
+    """
+    Encode the top levels of both sides of a DepthSnapshot.
+    Prices that are not a multiple of tick_size are rounded to the nearest tick.
+    Returns:
+        MarketDepth: the message
+    """
+    bid_prices, bid_quantities, ask_prices, ask_quantities = snapshot.columns(levels)
+    depth = ticker_service_pb2.MarketDepth(
+        ticker_symbol=snapshot.symbol,
+        snapshot_version=snapshot.version,
+        tick_size=tick_size,
+        bid_quantities=bid_quantities,
+        ask_quantities=ask_quantities,
+        publish_time_ns=publish_time_ns,
+    )
+    if bid_prices:
+        depth.best_bid_ticks, deltas = price_deltas(bid_prices, tick_size, -1)
+        depth.bid_price_deltas.extend(deltas)
+    if ask_prices:
+        depth.best_ask_ticks, deltas = price_deltas(ask_prices, tick_size, 1)
+        depth.ask_price_deltas.extend(deltas)
+    return depth
+
+
+def _array(values):
+    return np.fromiter(values, np.int64, len(values))
+
+
+def decode_depth(depth):
+    """
+    Decode a MarketDepth message into NumPy arrays.
+    Returns:
+        tuple: (bid_prices, bid_quantities, ask_prices, ask_quantities), best first
+    """
+    bid_ticks = depth.best_bid_ticks - np.cumsum(_array(depth.bid_price_deltas))
+    ask_ticks = depth.best_ask_ticks + np.cumsum(_array(depth.ask_price_deltas))
+    return (bid_ticks * depth.tick_size, _array(depth.bid_quantities),
+            ask_ticks * depth.tick_size, _array(depth.ask_quantities))
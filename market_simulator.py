@@ -0,0 +1,283 @@
+"""
+Offline market simulator driving an OrderBook directly, without a server,
+sleeps or threads.
+
+Order flow is generated in NumPy batches: arrival times, event types (limit,
+market or cancel), sides, limit price offsets from the mid in ticks and
+quantities for a whole batch at once. The loop over the batch then only
+looks up the current mid, submits and records. Fills and book metrics are
+recorded against the simulated clock and can be saved to an .npz file:
+
+    python market_simulator.py --orders 1000000 --arrival poisson --rate 5000 --output sim.npz
+
+Limit prices are mid - offset for buys and mid + offset for sells, so a
+positive offset is passive and a negative one crosses the spread.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from matching_engine import OrderBook
+
+ARRIVALS = ("poisson", "uniform", "bursty")
+PRICE_DISTRIBUTIONS = ("normal", "laplace", "uniform")
+LIMIT, MARKET, CANCEL = 0, 1, 2
+FILL_COLUMNS = (("time_ns", np.int64), ("price", np.float64), ("quantity", np.int64),
+                ("buy_order_id", np.int64), ("sell_order_id", np.int64))
+METRIC_COLUMNS = (("time_ns", np.int64), ("best_bid", np.float64), ("best_ask", np.float64),
+                  ("bid_quantity", np.int64), ("ask_quantity", np.int64), ("resting_orders", np.int64))
+
+
+class FlowParameters:
+    """
+    Statistical description of the simulated order flow.
+    """
+
+    def __init__(self, rate=1000.0, arrival="poisson", burstiness=0.2, market_ratio=0.05, cancel_ratio=0.3,
+                 buy_ratio=0.5, price_distribution="normal", price_offset=2.0, price_scale=4.0, mean_quantity=50,
+                 tick_size=0.01, initial_mid=100.0):
+        if arrival not in ARRIVALS:
+            raise ValueError(f"Unknown arrival process: {arrival}")
+        if price_distribution not in PRICE_DISTRIBUTIONS:
+            raise ValueError(f"Unknown price distribution: {price_distribution}")
+        if market_ratio + cancel_ratio > 1:
+            raise ValueError("market_ratio + cancel_ratio must not exceed 1")
+        self.rate = rate  # Mean events per simulated second
+        self.arrival = arrival  # poisson, uniform (fixed interval) or bursty (gamma inter-arrival times)
+        self.burstiness = burstiness  # Gamma shape of bursty arrivals, lower is more clustered
+        self.market_ratio = market_ratio  # Share of events that are market orders
+        self.cancel_ratio = cancel_ratio  # Share of events that cancel a random resting order
+        self.buy_ratio = buy_ratio
+        self.price_distribution = price_distribution
+        self.price_offset = price_offset  # Mean limit price distance from the mid in ticks, positive is passive
+        self.price_scale = price_scale  # Spread of limit prices around that, in ticks
+        self.mean_quantity = mean_quantity  # Geometrically distributed
+        self.tick_size = tick_size
+        self.initial_mid = initial_mid  # Mid used while one side of the book is empty and nothing traded
+
+
+def generate_batch(rng, flow, count, start_ns):
+    """
+    Generate `count` events of order flow at once.
+    Returns:
+        tuple: (times_ns, kinds, is_buy, offset_ticks, quantities, cancel_picks) arrays
+    """
+    mean_interval_ns = 1e9 / flow.rate
+    if flow.arrival == "poisson":
+        intervals = rng.exponential(mean_interval_ns, count)
+    elif flow.arrival == "bursty":
+        intervals = rng.gamma(flow.burstiness, mean_interval_ns / flow.burstiness, count)
+    else:
+        intervals = np.full(count, mean_interval_ns)
+    times_ns = start_ns + np.cumsum(intervals).astype(np.int64)
+
+    draw = rng.random(count)
+    kinds = np.where(draw < flow.market_ratio, MARKET,
+                     np.where(draw < flow.market_ratio + flow.cancel_ratio, CANCEL, LIMIT)).astype(np.int8)
+    is_buy = rng.random(count) < flow.buy_ratio
+
+    if flow.price_distribution == "normal":
+        offsets = rng.normal(flow.price_offset, flow.price_scale, count)
+    elif flow.price_distribution == "laplace":
+        offsets = rng.laplace(flow.price_offset, flow.price_scale, count)
+    else:
+        offsets = rng.uniform(flow.price_offset - flow.price_scale, flow.price_offset + flow.price_scale, count)
+    offset_ticks = np.rint(offsets).astype(np.int64)
+
+    quantities = rng.geometric(1 / flow.mean_quantity, count)
+    cancel_picks = rng.random(count)  # Which resting order a cancel hits, as a fraction of the live ones
+    return times_ns, kinds, is_buy, offset_ticks, quantities, cancel_picks
+
+
+class SimulationResult:
+    """
+    Fills and book metrics of a run, as NumPy columns.
+    """
+
+    def __init__(self, fills, metrics, events, wall_seconds, counts):
+        self.fills = fills  # dict: column -> array, see FILL_COLUMNS
+        self.metrics = metrics  # dict: column -> array, see METRIC_COLUMNS
+        self.events = events
+        self.wall_seconds = wall_seconds
+        self.counts = counts  # dict: limit, market, cancel, cancel_misses (nothing resting), submitted_quantity -> count
+
+    def save(self, path):
+        np.savez(path, **{f"fill_{name}": column for name, column in self.fills.items()},
+                 **{f"metric_{name}": column for name, column in self.metrics.items()})
+
+    def summary(self):
+        fills, metrics = self.fills, self.metrics
+        volume = int(fills["quantity"].sum())
+        lines = [f"{self.events} events in {self.wall_seconds:.2f}s: {self.events / self.wall_seconds:,.0f} events/s",
+                 "  " + ", ".join(f"{name} {count}" for name, count in self.counts.items()),
+                 f"  {len(fills['quantity'])} fills, volume {volume}"]
+        if volume:
+            lines.append(f"  VWAP {float((fills['price'] * fills['quantity']).sum()) / volume:.4f}, "
+                         f"last {fills['price'][-1]:.4f}")
+        two_sided = ~np.isnan(metrics["best_bid"]) & ~np.isnan(metrics["best_ask"])
+        if two_sided.any():
+            spread = metrics["best_ask"][two_sided] - metrics["best_bid"][two_sided]
+            lines.append(f"  spread mean {spread.mean():.4f}, median {np.median(spread):.4f}; "
+                         f"{len(spread)} of {len(two_sided)} samples two-sided")
+        if len(metrics["resting_orders"]):
+            lines.append(f"  resting orders at the end: {metrics['resting_orders'][-1]}")
+        return "\n".join(lines)
+
+
+class MarketSimulator:
+    """
+    Feeds generated order flow into an OrderBook as fast as it can.
+
+    on_sample, if given, is called as on_sample(simulator, time_ns) after every
+    metrics sample, so a strategy under test can look at the book and call
+    submit_limit, submit_market or cancel between the simulated orders.
+    """
+
+    def __init__(self, flow=None, seed=1, batch_size=65536, sample_interval_ns=1_000_000_000, on_sample=None):
+        self.flow = flow or FlowParameters()
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.sample_interval_ns = sample_interval_ns
+        self.on_sample = on_sample
+        self.order_book = OrderBook("SIM", "Simulation")
+        self.order_book.snapshots_enabled = False  # Nobody reads depth snapshots here
+        self.order_book.fill_listeners.append(self._on_fill)
+        self.now_ns = 0  # Simulated clock
+        self.live = []  # Ids of orders that rested, possibly filled since; cancels pick from here
+        self.fills = tuple([] for _ in FILL_COLUMNS)
+        self.metrics = tuple([] for _ in METRIC_COLUMNS)
+        self.counts = {"limit": 0, "market": 0, "cancel": 0, "cancel_misses": 0, "submitted_quantity": 0}
+
+    def _on_fill(self, fill, buy_order, sell_order):
+        time_ns, price, quantity, buy_id, sell_id = self.fills
+        time_ns.append(self.now_ns)
+        price.append(fill.price)
+        quantity.append(fill.quantity)
+        buy_id.append(fill.buy_order_id)
+        sell_id.append(fill.sell_order_id)
+
+    def submit_limit(self, side, price, quantity):
+        order = self.order_book.create_order(side, price, quantity)
+        self.order_book.submit(order)
+        if order.status == "resting":
+            self.live.append(order.order_id)
+        return order
+
+    def submit_market(self, side, quantity):
+        return self.order_book.submit(self.order_book.create_order(side, None, quantity))
+
+    def cancel(self, order_id):
+        return self.order_book.cancel_order(order_id)
+
+    def sample(self):
+        order_book = self.order_book
+        bid, ask = order_book.bids.best_level(), order_book.asks.best_level()
+        time_ns, best_bid, best_ask, bid_quantity, ask_quantity, resting = self.metrics
+        time_ns.append(self.now_ns)
+        best_bid.append(bid.price if bid else np.nan)
+        best_ask.append(ask.price if ask else np.nan)
+        bid_quantity.append(bid.quantity if bid else 0)
+        ask_quantity.append(ask.quantity if ask else 0)
+        resting.append(len(order_book.orders))
+        if self.on_sample is not None:
+            self.on_sample(self, self.now_ns)
+
+    def run(self, events):
+        """
+        Simulate `events` events of order flow.
+        Returns:
+            SimulationResult: fills and metrics of the whole run so far
+        """
+        flow = self.flow
+        tick_size = flow.tick_size
+        order_book = self.order_book
+        create_order, submit, cancel_order = order_book.create_order, order_book.submit, order_book.cancel_order
+        orders = order_book.orders
+        live = self.live
+        counts = self.counts
+        next_sample_ns = self.now_ns + self.sample_interval_ns
+        start = time.perf_counter()
+
+        remaining = events
+        while remaining:
+            count = min(remaining, self.batch_size)
+            remaining -= count
+            batch = generate_batch(self.rng, flow, count, self.now_ns)
+            counts["submitted_quantity"] += int(batch[4][batch[1] != CANCEL].sum())
+            for time_ns, kind, is_buy, offset, quantity, pick in zip(*(column.tolist() for column in batch)):
+                while time_ns >= next_sample_ns:
+                    self.sample()
+                    next_sample_ns += self.sample_interval_ns
+                self.now_ns = time_ns
+                side = "buy" if is_buy else "sell"
+
+                if kind == LIMIT:
+                    counts["limit"] += 1
+                    mid = round((order_book.best_avg_price or order_book.last_trade_price or flow.initial_mid) / tick_size)
+                    ticks = mid - offset if is_buy else mid + offset
+                    if ticks < 1:
+                        ticks = 1
+                    order = create_order(side, ticks * tick_size, quantity)
+                    submit(order)
+                    if order.status == "resting":
+                        live.append(order.order_id)
+                elif kind == MARKET:
+                    counts["market"] += 1
+                    submit(create_order(side, None, quantity))
+                else:
+                    counts["cancel"] += 1
+                    # Swap-remove random ids until one is still resting, dropping those that filled meanwhile
+                    while live:
+                        index = int(pick * len(live))
+                        order_id = live[index]
+                        live[index] = live[-1]
+                        live.pop()
+                        if order_id in orders:
+                            cancel_order(order_id)
+                            break
+                    else:
+                        counts["cancel_misses"] += 1
+        self.sample()
+        return self.result(events, time.perf_counter() - start)
+
+    def result(self, events, wall_seconds):
+        fills = {name: np.array(values, dtype) for (name, dtype), values in zip(FILL_COLUMNS, self.fills)}
+        metrics = {name: np.array(values, dtype) for (name, dtype), values in zip(METRIC_COLUMNS, self.metrics)}
+        return SimulationResult(fills, metrics, events, wall_seconds, dict(self.counts))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Simulate order flow against the matching engine")
+    parser.add_argument("--orders", type=int, default=1000000, help="Events to simulate (orders and cancels)")
+    parser.add_argument("--rate", type=float, default=1000, help="Mean events per simulated second")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="poisson")
+    parser.add_argument("--burstiness", type=float, default=0.2, help="Gamma shape of bursty arrivals, lower is more clustered")
+    parser.add_argument("--market-ratio", type=float, default=0.05, help="Share of market orders")
+    parser.add_argument("--cancel-ratio", type=float, default=0.3, help="Share of cancels of random resting orders")
+    parser.add_argument("--buy-ratio", type=float, default=0.5)
+    parser.add_argument("--price-distribution", choices=PRICE_DISTRIBUTIONS, default="normal")
+    parser.add_argument("--price-offset", type=float, default=2, help="Mean limit price distance from mid (ticks), positive is passive")
+    parser.add_argument("--price-scale", type=float, default=4, help="Spread of limit price offsets (ticks)")
+    parser.add_argument("--mean-quantity", type=float, default=50)
+    parser.add_argument("--tick-size", type=float, default=0.01)
+    parser.add_argument("--mid", type=float, default=100, help="Initial mid price")
+    parser.add_argument("--batch-size", type=int, default=65536, help="Events generated per NumPy batch")
+    parser.add_argument("--sample-interval", type=float, default=1000, help="Book metrics sampling interval (simulated ms)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="", help="Save fills and metrics to this .npz file")
+    args = parser.parse_args()
+
+    flow = FlowParameters(args.rate, args.arrival, args.burstiness, args.market_ratio, args.cancel_ratio,
+                          args.buy_ratio, args.price_distribution, args.price_offset, args.price_scale,
+                          args.mean_quantity, args.tick_size, args.mid)
+    simulator = MarketSimulator(flow, args.seed, args.batch_size, int(args.sample_interval * 1e6))
+    result = simulator.run(args.orders)
+    print(result.summary())
+    if args.output:
+        result.save(args.output)
+        print(f"Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,924 @@
+import asyncio
+import bisect
+import collections
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from latency_stats import NULL_TIMER
+
+
+TIME_IN_FORCE = ("GTC", "IOC", "FOK", "GTT", "DAY")
+RESTING_TIME_IN_FORCE = ("GTC", "GTT", "DAY")  # Remainders of these rest in the book
+
+
+class Order:
+    def __init__(self, order_id, order_type, price, symbol, name, quantity,
+                 received_ns=0, received_wall_ns=0, client_send_time_ns=0, client_id="",
+                 time_in_force="GTC", stop_price=None, expire_ns=0):
+        self.order_id = order_id
+        self.order_type = order_type  # 'buy' or 'sell'
+        self.price = price  # Limit price, None for market orders
+        self.symbol = symbol
+        self.name = name
+        self.quantity = quantity  # Remaining quantity
+        self.client_id = client_id  # Owner of the order
+        self.time_in_force = time_in_force  # 'GTC', 'IOC', 'FOK', 'GTT' or 'DAY'
+        self.expire_ns = expire_ns  # Monotonic deadline of GTT and DAY orders, 0 for none
+        self.stop_price = stop_price  # Held until a trade at or through this price, None for regular orders
+        self.filled_quantity = 0
+        self.cancelled_quantity = 0
+        self.executed_notional = 0.0  # Sum of price * quantity over the fills of this order
+        self.levels_swept = 0  # Price levels this order traded against when it arrived
+        self.status = "new"  # new, pending (stop), resting, filled, cancelled, expired
+        # Timestamps: monotonic ns for latency math, wall clock ns for correlation across hosts
+        self.received_ns = received_ns or time.monotonic_ns()
+        self.received_wall_ns = received_wall_ns or time.time_ns()
+        self.client_send_time_ns = client_send_time_ns  # Optional, supplied by the client
+        self.match_ns = 0  # Time of the latest fill of this order
+        self.match_wall_ns = 0
+
+    def __repr__(self):
+        return f"Order({self.order_id}, {self.order_type}, {self.price}, {self.quantity})"
+
+    @property
+    def average_price(self):
+        """Average fill price, 0 if the order did not trade."""
+        return self.executed_notional / self.filled_quantity if self.filled_quantity else 0.0
+
+
+class Fill:
+    def __init__(self, quantity, price, buy_order_id, sell_order_id, match_ns, match_wall_ns):
+        self.quantity = quantity
+        self.price = price
+        self.buy_order_id = buy_order_id
+        self.sell_order_id = sell_order_id
+        self.match_ns = match_ns
+        self.match_wall_ns = match_wall_ns
+
+    def __repr__(self):
+        return f"Fill({self.quantity}, {self.price}, {self.buy_order_id}, {self.sell_order_id})"
+
+
+class PriceLevel:
+    """
+    All resting orders at one price, in time priority, with their aggregate quantity.
+    Cancelled orders are left in the queue with zero quantity and skipped when matching.
+    """
+    __slots__ = ("price", "orders", "quantity", "count")
+
+    def __init__(self, price):
+        self.price = price
+        self.orders = collections.deque()
+        self.quantity = 0  # Total remaining quantity of live orders
+        self.count = 0  # Number of live orders
+
+    def __repr__(self):
+        return f"PriceLevel({self.price}, {self.quantity}, {self.count})"
+
+
+SNAPSHOT_PAGE_SIZE = 32  # Target levels per page of a DepthSnapshot side
+
+
+class DepthSnapshot:
+    """
+    Immutable view of the aggregated depth of a book at one version.
+
+    The OrderBook publishes a new snapshot after every mutation batch, so any
+    number of readers can use the latest one without taking the book's lock.
+    Each side is a tuple of pages of around SNAPSHOT_PAGE_SIZE levels, each page a
+    pair of tuples (level keys as in BookSide, quantities), best level last,
+    plus a tuple with the first key of every page. A new snapshot copies only
+    the pages with changed levels and shares the rest with the previous one.
+    """
+    __slots__ = ("symbol", "version", "bid_pages", "bid_first_keys", "ask_pages", "ask_first_keys",
+                 "last_trade_price", "published_ns")
+
+    def __init__(self, symbol, version=0, bid_side=((), ()), ask_side=((), ()), last_trade_price=None, published_ns=0):
+        self.symbol = symbol
+        self.version = version  # Incremented with every published change of the book's depth
+        self.bid_pages, self.bid_first_keys = bid_side
+        self.ask_pages, self.ask_first_keys = ask_side
+        self.last_trade_price = last_trade_price
+        self.published_ns = published_ns  # Monotonic time of publication
+
+    def __repr__(self):
+        return f"DepthSnapshot({self.symbol}, v{self.version}, bids={self.bids(3)}, asks={self.asks(3)})"
+
+    def bids(self, n=None):
+        """Get up to n (price, quantity) bid levels, best first."""
+        return self._levels(self.bid_pages, n, 1)
+
+    def asks(self, n=None):
+        """Get up to n (price, quantity) ask levels, best first."""
+        return self._levels(self.ask_pages, n, -1)
+
+    def columns(self, n):
+        """
+        Get the top n levels of both sides as columns, best first.
+        Returns:
+            tuple: (bid_prices, bid_quantities, ask_prices, ask_quantities) lists
+        """
+        return self._columns(self.bid_pages, n, 1) + self._columns(self.ask_pages, n, -1)
+
+    @staticmethod
+    def _columns(pages, n, sign):
+        keys = []
+        quantities = []
+        for page_keys, page_quantities in reversed(pages):
+            take = n - len(keys)
+            if take <= 0:
+                break
+            stop = -take - 1 if take < len(page_keys) else None
+            keys.extend(page_keys[:stop:-1])
+            quantities.extend(page_quantities[:stop:-1])
+        return (keys if sign > 0 else [-key for key in keys]), quantities
+
+    @staticmethod
+    def _levels(pages, n, sign):
+        levels = []
+        for keys, quantities in reversed(pages):
+            for i in range(len(keys) - 1, -1, -1):
+                if len(levels) == n:
+                    return levels
+                levels.append((sign * keys[i], quantities[i]))
+        return levels
+
+
+class BookSide:
+    """
+    One side of the book: price levels by price plus a sorted list of level keys.
+    Keys are the price for bids and the negated price for asks, so on both sides
+    the best level is at the end of the list and is removed with a plain pop().
+    """
+
+    def __init__(self, is_buy):
+        self.is_buy = is_buy
+        self.levels = {}  # price -> PriceLevel
+        self.keys = []  # Sorted level keys, best level last
+        self.dirty = set()  # Prices of levels changed since the last snapshot
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _key(self, price):
+        return price if self.is_buy else -price
+
+    def best_price(self):
+        if not self.keys:
+            return None
+        return self.keys[-1] if self.is_buy else -self.keys[-1]
+
+    def best_level(self):
+        return self.levels[self.best_price()] if self.keys else None
+
+    def add(self, order):
+        self.dirty.add(order.price)
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = PriceLevel(order.price)
+            bisect.insort(self.keys, self._key(order.price))
+        level.orders.append(order)
+        level.quantity += order.quantity
+        level.count += 1
+        return level
+
+    def remove_level(self, price):
+        self.dirty.add(price)
+        del self.levels[price]
+        key = self._key(price)
+        if self.keys[-1] == key:
+            self.keys.pop()
+        else:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def iter_levels(self):
+        """Iterate over the price levels, best first."""
+        levels = self.levels
+        if self.is_buy:
+            for key in reversed(self.keys):
+                yield levels[key]
+        else:
+            for key in reversed(self.keys):
+                yield levels[-key]
+
+    def depth(self, n):
+        """Get up to n (price, quantity) pairs, best first."""
+        return [(level.price, level.quantity) for level in itertools.islice(self.iter_levels(), n)]
+
+    def snapshot_pages(self):
+        """
+        Build the DepthSnapshot pages of this side from scratch.
+        Returns:
+            tuple: (pages, first_keys)
+        """
+        self.dirty.clear()
+        keys = self.keys
+        levels = self.levels
+        sign = 1 if self.is_buy else -1
+        pages = []
+        for start in range(0, len(keys), SNAPSHOT_PAGE_SIZE):
+            page_keys = tuple(keys[start:start + SNAPSHOT_PAGE_SIZE])
+            pages.append((page_keys, tuple(levels[sign * key].quantity for key in page_keys)))
+        return tuple(pages), tuple(page[0][0] for page in pages)
+
+    def patch_snapshot(self, pages, first_keys):
+        """
+        Apply the levels changed since the last snapshot to its pages. Only the
+        pages holding changed levels are copied; an unchanged side is returned as-is.
+        Returns:
+            tuple: (pages, first_keys)
+        """
+        dirty = self.dirty
+        if not dirty:
+            return pages, first_keys
+        if not pages or len(dirty) * 4 > len(self.keys) or len(pages) > 2 * len(self.keys) // SNAPSHOT_PAGE_SIZE + 4:
+            # Most of the side changed, or removals left many small pages: rebuilding is cheaper
+            return self.snapshot_pages()
+
+        levels = self.levels
+        if len(dirty) == 1:
+            # Common case of one changed level: splice the tuples of its page directly
+            price = dirty.pop()
+            key = self._key(price)
+            page_index = max(bisect.bisect_right(first_keys, key) - 1, 0)
+            page_keys, page_quantities = pages[page_index]
+            index = bisect.bisect_left(page_keys, key)
+            present = index < len(page_keys) and page_keys[index] == key
+            level = levels.get(price)
+            if level is not None and present:
+                page = (page_keys, page_quantities[:index] + (level.quantity,) + page_quantities[index + 1:])
+                return pages[:page_index] + (page,) + pages[page_index + 1:], first_keys
+            if level is not None and len(page_keys) < 2 * SNAPSHOT_PAGE_SIZE:
+                page = (page_keys[:index] + (key,) + page_keys[index:],
+                        page_quantities[:index] + (level.quantity,) + page_quantities[index:])
+                if index == 0:
+                    first_keys = first_keys[:page_index] + (key,) + first_keys[page_index + 1:]
+                return pages[:page_index] + (page,) + pages[page_index + 1:], first_keys
+            dirty.add(price)
+
+        # Patch copies of the pages the changed levels fall into
+        changed = {}  # page index -> (keys, quantities) lists
+        for price in dirty:
+            key = self._key(price)
+            page_index = max(bisect.bisect_right(first_keys, key) - 1, 0)
+            page = changed.get(page_index)
+            if page is None:
+                page = changed[page_index] = (list(pages[page_index][0]), list(pages[page_index][1]))
+            page_keys, page_quantities = page
+            index = bisect.bisect_left(page_keys, key)
+            present = index < len(page_keys) and page_keys[index] == key
+            level = levels.get(price)
+            if level is None:
+                if present:
+                    del page_keys[index]
+                    del page_quantities[index]
+            elif present:
+                page_quantities[index] = level.quantity
+            else:
+                page_keys.insert(index, key)
+                page_quantities.insert(index, level.quantity)
+        dirty.clear()
+
+        # Swap them in from the back, so splits and removals do not shift the pages still to do
+        new_pages = list(pages)
+        new_first_keys = list(first_keys)
+        for page_index in sorted(changed, reverse=True):
+            page_keys, page_quantities = changed[page_index]
+            if not page_keys:
+                del new_pages[page_index]
+                del new_first_keys[page_index]
+            elif len(page_keys) <= 2 * SNAPSHOT_PAGE_SIZE:
+                new_pages[page_index] = (tuple(page_keys), tuple(page_quantities))
+                new_first_keys[page_index] = page_keys[0]
+            else:
+                # Split pages that grew too large into equal halves
+                half = len(page_keys) // 2
+                new_pages[page_index:page_index + 1] = [(tuple(page_keys[:half]), tuple(page_quantities[:half])),
+                                                       (tuple(page_keys[half:]), tuple(page_quantities[half:]))]
+                new_first_keys[page_index:page_index + 1] = [page_keys[0], page_keys[half]]
+        return tuple(new_pages), tuple(new_first_keys)
+
+
+class OrderBook:
+    """
+    Price-time priority limit order book for one ticker.
+
+    Incoming orders match against the opposite side first, at the resting
+    orders' prices, and only the remainder of a GTC limit order rests. IOC
+    remainders are cancelled and FOK orders are checked against the aggregate
+    level quantities before anything is touched. Stop orders wait in per-side
+    heaps keyed by trigger price, so after each trade only the stops whose
+    trigger price was actually crossed are looked at.
+
+    In auction mode orders are only collected, and uncross() executes the
+    crossed part of the book at a single clearing price.
+
+    The synchronous submit() does the work; the async methods wrap it in the
+    book's lock for use from the server.
+    """
+
+    def __init__(self, symbol, name, order_id_counter=None):
+        self.symbol = symbol
+        self.name = name
+        self.bids = BookSide(is_buy=True)
+        self.asks = BookSide(is_buy=False)
+        self.orders = {}  # order_id -> live Order (resting or pending stop)
+        self.buy_stops = []  # Heap of (stop_price, order_id, order), triggered when a trade is at or above
+        self.sell_stops = []  # Heap of (-stop_price, order_id, order), triggered when a trade is at or below
+        self.last_trade_price = None
+        # Lowest and highest trade price of the current submit or uncross: a sweep through several levels crosses
+        # every stop price between them, not only the last one
+        self.trade_low = None
+        self.trade_high = None
+        self.held_stops = []  # Stops triggered during an auction that cannot rest, executed when continuous trading resumes
+        self.best_avg_price = None  # Store average price between best buy and sell orders
+        self.matched_trades = collections.deque(maxlen=5)  # Store latest matched trades (Fill objects)
+        self.market_data_sequence = 0  # Sequence number of the latest published market data update
+        self.last_market_data = None  # Latest market data message published by the server
+        self.order_id_counter = order_id_counter or itertools.count(1)  # Automatic order ID generator
+        self.last_activity_ns = time.monotonic_ns()  # Time of the latest order, used to reclaim idle books
+        self.fill_listeners = []  # Called as listener(fill, buy_order, sell_order) for every fill
+        self.cancel_listeners = []  # Called as listener(order, quantity) when unfilled quantity is removed
+        self.auction_mode = False  # Collect orders without matching until uncross() is called
+        self.snapshot = DepthSnapshot(symbol)  # Latest published depth, read without the lock
+        self.snapshot_listeners = []  # Called as listener(snapshot) for every published DepthSnapshot
+        # Off for offline users that read the book directly; changed levels are kept and go into the next snapshot
+        self.snapshots_enabled = True
+        # Called as listener(sequence, event, order, quantity, price) for every change of a resting order:
+        # "add", "execute" (price is the trade price) or "delete". Events are only generated while there is a listener
+        self.book_event_listeners = []
+        self.book_event_sequence = 0  # Sequence number of the latest book event
+
+        self.lock = asyncio.Lock()  # Lock for synchronization
+
+    def is_empty(self):
+        return not self.orders
+
+    def sequence_state(self):
+        """
+        What an empty book must not forget when it is reclaimed: stop triggers and auctions are anchored on the
+        last trade price, and subscribers expect market data, depth and book event sequences to keep increasing.
+        Returns:
+            tuple: (last_trade_price, market_data_sequence, snapshot_version, book_event_sequence)
+        """
+        return self.last_trade_price, self.market_data_sequence, self.snapshot.version, self.book_event_sequence
+
+    def restore_sequence_state(self, state):
+        """
+        Continue from the sequence_state() of a reclaimed book of the same symbol.
+        """
+        self.last_trade_price, self.market_data_sequence, snapshot_version, self.book_event_sequence = state
+        self.snapshot = DepthSnapshot(self.symbol, snapshot_version, last_trade_price=self.last_trade_price,
+                                      published_ns=time.monotonic_ns())
+
+    def create_order(self, order_type, price, quantity, received_ns=0, received_wall_ns=0,
+                     client_send_time_ns=0, client_id="", time_in_force="GTC", stop_price=None, expire_ns=0):
+        if order_type not in ['buy', 'sell']:
+            raise ValueError(f"Unknown order type: {order_type}")
+        if time_in_force not in TIME_IN_FORCE:
+            raise ValueError(f"Unknown time in force: {time_in_force}")
+        if self.auction_mode and (price is None or time_in_force not in RESTING_TIME_IN_FORCE):
+            raise ValueError("Only resting limit orders are accepted during an auction")
+
+        order_id = next(self.order_id_counter)
+        self.last_activity_ns = time.monotonic_ns()
+        return Order(order_id, order_type, price, self.symbol, self.name, quantity, received_ns,
+                     received_wall_ns, client_send_time_ns, client_id, time_in_force, stop_price, expire_ns)
+
+    async def get_top_orders(self, n=3):
+        """
+        Get the top N buy and sell orders for display.
+        Returns:
+            tuple: (top_buy_orders, top_sell_orders) as lists of (price, order)
+        """
+        async with self.lock:
+            return self._top_orders(self.bids, n), self._top_orders(self.asks, n)
+
+    @staticmethod
+    def _top_orders(side, n):
+        top_orders = []
+        for level in side.iter_levels():
+            for order in level.orders:
+                if order.quantity:
+                    top_orders.append((level.price, order))
+                    if len(top_orders) == n:
+                        return top_orders
+        return top_orders
+
+    async def get_depth(self, n=1):
+        """
+        Get the aggregated quantity of the top N price levels from the latest snapshot.
+        Returns:
+            tuple: (bid_levels, ask_levels) as lists of (price, quantity)
+        """
+        snapshot = self.snapshot
+        return snapshot.bids(n), snapshot.asks(n)
+
+    def publish_snapshot(self):
+        """
+        Publish a new DepthSnapshot if the depth changed since the last one.
+        Called at the end of every mutation batch.
+        Returns:
+            DepthSnapshot: the latest snapshot
+        """
+        if not self.snapshots_enabled:
+            return self.snapshot
+        bids = self.bids
+        asks = self.asks
+        previous = self.snapshot
+        if not bids.dirty and not asks.dirty and previous.last_trade_price == self.last_trade_price:
+            return previous
+        self.snapshot = DepthSnapshot(
+            self.symbol, previous.version + 1,
+            bids.patch_snapshot(previous.bid_pages, previous.bid_first_keys),
+            asks.patch_snapshot(previous.ask_pages, previous.ask_first_keys),
+            self.last_trade_price, time.monotonic_ns())
+        for listener in self.snapshot_listeners:
+            listener(self.snapshot)
+        return self.snapshot
+
+    async def add_limit_order(self, order_type, price, quantity, timer=NULL_TIMER,
+                              received_ns=0, received_wall_ns=0, client_send_time_ns=0, client_id="",
+                              time_in_force="GTC", stop_price=None, expire_ns=0):
+        """
+        Match a new limit order against the book and rest what is left (GTC, GTT and DAY).
+        Returns:
+            Order: the new order, with its status, fills and timestamps updated
+        """
+        async with self.lock:
+            timer.mark("lock_wait")
+            order = self.create_order(order_type, price, quantity, received_ns, received_wall_ns,
+                                      client_send_time_ns, client_id, time_in_force, stop_price, expire_ns)
+            return self.submit(order, timer)
+
+    async def add_market_order(self, order_type, quantity, timer=NULL_TIMER,
+                               received_ns=0, received_wall_ns=0, client_send_time_ns=0, client_id="",
+                               time_in_force="IOC", stop_price=None):
+        """
+        Execute a market order against the resting orders of the opposite side.
+        Returns:
+            Order: the market order, any unfilled remainder is cancelled
+        """
+        async with self.lock:
+            timer.mark("lock_wait")
+            order = self.create_order(order_type, None, quantity, received_ns, received_wall_ns,
+                                      client_send_time_ns, client_id, time_in_force, stop_price)
+            return self.submit(order, timer)
+
+    def submit(self, order, timer=NULL_TIMER):
+        """
+        Process a new order: hold it if it is a stop order that has not triggered
+        yet, otherwise execute it and then any stop orders its trades triggered.
+        """
+        if order.stop_price is not None and not self._stop_is_triggered(order):
+            self._add_stop(order)
+            timer.mark("insert")
+            return order
+
+        self._execute(order, timer)
+        if self.buy_stops or self.sell_stops:
+            self._execute_triggered_stops()
+            timer.mark("stop_triggers")
+        self.trade_low = self.trade_high = None
+        self.update_best_avg_price()
+        self.publish_snapshot()
+        return order
+
+    def _execute(self, order, timer=NULL_TIMER):
+        if self.auction_mode:
+            pass  # Crossing orders rest until the next uncross()
+        elif order.time_in_force == "FOK" and \
+                self.available_quantity(order.order_type, order.price, order.quantity) < order.quantity:
+            self._cancel_remainder(order)
+            timer.mark("match")
+            return
+        else:
+            self._match(order)
+        timer.mark("match")
+
+        if order.quantity == 0:
+            order.status = "filled"
+        elif order.price is None or order.time_in_force not in RESTING_TIME_IN_FORCE:
+            self._cancel_remainder(order)
+        else:
+            (self.bids if order.order_type == 'buy' else self.asks).add(order)
+            self.orders[order.order_id] = order
+            order.status = "resting"
+            if self.book_event_listeners:
+                self._book_event("add", order, order.quantity, order.price)
+            timer.mark("insert")
+
+    def available_quantity(self, order_type, price=None, needed=None):
+        """
+        Quantity on the opposite side that an order at `price` (None for market)
+        could trade against, from the aggregate level quantities. Stops counting
+        once `needed` is reached. Does not modify the book.
+        """
+        is_buy = order_type == 'buy'
+        available = 0
+        for level in (self.asks if is_buy else self.bids).iter_levels():
+            if price is not None and (level.price > price if is_buy else level.price < price):
+                break
+            available += level.quantity
+            if needed is not None and available >= needed:
+                break
+        return available
+
+    def _match(self, order):
+        is_buy = order.order_type == 'buy'
+        opposite = self.asks if is_buy else self.bids
+        limit_price = order.price
+        orders = self.orders
+        record_fill = self._record_fill
+        match_ns = time.monotonic_ns()  # One timestamp for the whole sweep
+        match_wall_ns = time.time_ns()
+        first_price = last_price = None
+
+        while order.quantity > 0 and opposite:
+            level = opposite.best_level()
+            price = level.price
+            if limit_price is not None and (price > limit_price if is_buy else price < limit_price):
+                break
+            order.levels_swept += 1
+            if first_price is None:
+                first_price = price
+            last_price = price
+
+            if level.quantity <= order.quantity:
+                # The whole level trades: drop it at once from the aggregate, only the fills are per order
+                traded_quantity = level.quantity
+                opposite.remove_level(price)
+                order.quantity -= traded_quantity
+                order.filled_quantity += traded_quantity
+                order.executed_notional += traded_quantity * price
+                for resting in level.orders:
+                    quantity = resting.quantity
+                    if quantity:
+                        resting.quantity = 0
+                        resting.filled_quantity += quantity
+                        resting.executed_notional += quantity * price
+                        resting.status = "filled"
+                        del orders[resting.order_id]
+                        if is_buy:
+                            record_fill(quantity, price, order, resting, match_ns, match_wall_ns)
+                        else:
+                            record_fill(quantity, price, resting, order, match_ns, match_wall_ns)
+                continue
+
+            # Partially filled tail: the order completes inside this level
+            opposite.dirty.add(price)
+            resting_orders = level.orders
+            while order.quantity > 0:
+                resting = resting_orders[0]
+                if resting.quantity == 0:
+                    resting_orders.popleft()  # Cancelled order left in the queue
+                    continue
+
+                traded_quantity = min(order.quantity, resting.quantity)
+                order.quantity -= traded_quantity
+                resting.quantity -= traded_quantity
+                order.filled_quantity += traded_quantity
+                resting.filled_quantity += traded_quantity
+                order.executed_notional += traded_quantity * price
+                resting.executed_notional += traded_quantity * price
+                level.quantity -= traded_quantity
+                if resting.quantity == 0:
+                    resting_orders.popleft()
+                    level.count -= 1
+                    resting.status = "filled"
+                    del orders[resting.order_id]
+
+                if is_buy:
+                    record_fill(traded_quantity, price, order, resting, match_ns, match_wall_ns)
+                else:
+                    record_fill(traded_quantity, price, resting, order, match_ns, match_wall_ns)
+
+        if first_price is not None:
+            # Levels are swept from the best price outwards, so the first and last are the extremes
+            self._extend_trade_range(*((first_price, last_price) if is_buy else (last_price, first_price)))
+
+    def _extend_trade_range(self, low, high):
+        if self.trade_low is None or low < self.trade_low:
+            self.trade_low = low
+        if self.trade_high is None or high > self.trade_high:
+            self.trade_high = high
+
+    def cancel_orders(self, order_ids, status="cancelled"):
+        """
+        Cancel several orders with a single snapshot publication.
+        Returns:
+            list: the orders that were removed
+        """
+        cancelled = [order for order in map(self._cancel, order_ids, itertools.repeat(status)) if order is not None]
+        self.update_best_avg_price()
+        self.publish_snapshot()
+        return cancelled
+
+    def cancel_order(self, order_id, status="cancelled"):
+        """
+        Remove a resting order or pending stop from the book. The order is left in
+        its level's queue with zero quantity and dropped there when reached.
+        Returns:
+            Order: the removed order, or None if it is no longer live
+        """
+        order = self._cancel(order_id, status)
+        if order is not None:
+            self.update_best_avg_price()
+            self.publish_snapshot()
+        return order
+
+    def _cancel(self, order_id, status):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        quantity = order.quantity
+        if order.status == "resting":
+            side = self.bids if order.order_type == 'buy' else self.asks
+            level = side.levels[order.price]
+            side.dirty.add(order.price)
+            level.quantity -= quantity
+            level.count -= 1
+            if level.count == 0:
+                side.remove_level(order.price)
+            elif len(level.orders) > 2 * level.count + 16:
+                # Mostly cancelled orders, compact the queue (amortized O(1) per cancel)
+                level.orders = collections.deque(o for o in level.orders if o.quantity)
+        # Pending stops stay in their heap and are skipped once they are no longer pending
+        was_resting = order.status == "resting"
+        order.quantity = 0
+        order.cancelled_quantity += quantity
+        order.status = status
+        for listener in self.cancel_listeners:
+            listener(order, quantity)
+        if was_resting and self.book_event_listeners:
+            self._book_event("delete", order, quantity, order.price)
+        return order
+
+    def clearing_price(self):
+        """
+        Price at which an uncross would execute the most volume. Ties go to the
+        smallest imbalance between demand and supply, then to the price closest
+        to the last trade. Cumulative demand and supply are computed with NumPy
+        over the price levels, without touching the orders.
+        Returns:
+            tuple: (price, volume), (None, 0) if the book does not cross
+        """
+        if not self.bids or not self.asks or self.bids.best_price() < self.asks.best_price():
+            return None, 0
+
+        bid_prices = np.fromiter(self.bids.levels.keys(), dtype=np.float64, count=len(self.bids))
+        bid_quantities = np.fromiter((level.quantity for level in self.bids.levels.values()),
+                                     dtype=np.int64, count=len(self.bids))
+        ask_prices = np.fromiter(self.asks.levels.keys(), dtype=np.float64, count=len(self.asks))
+        ask_quantities = np.fromiter((level.quantity for level in self.asks.levels.values()),
+                                     dtype=np.int64, count=len(self.asks))
+
+        # Quantity per candidate price, then demand (bids at or above) and supply (asks at or below)
+        prices = np.union1d(bid_prices, ask_prices)
+        bid_at = np.zeros(len(prices), dtype=np.int64)
+        ask_at = np.zeros(len(prices), dtype=np.int64)
+        np.add.at(bid_at, np.searchsorted(prices, bid_prices), bid_quantities)
+        np.add.at(ask_at, np.searchsorted(prices, ask_prices), ask_quantities)
+        demand = np.cumsum(bid_at[::-1])[::-1]
+        supply = np.cumsum(ask_at)
+        volume = np.minimum(demand, supply)
+
+        best_volume = volume.max()
+        if best_volume <= 0:
+            return None, 0
+        reference = self.last_trade_price
+        if reference is None:
+            reference = (self.bids.best_price() + self.asks.best_price()) / 2
+        # lexsort sorts by the last key first
+        best = np.lexsort((np.abs(prices - reference), np.abs(demand - supply), -volume))[0]
+        return float(prices[best]), int(best_volume)
+
+    def uncross(self):
+        """
+        Execute the crossed part of the book at a single clearing price, in
+        price-time priority on both sides, then process any triggered stops.
+        In auction mode, triggered stops that cannot rest (market, IOC or FOK)
+        stay pending until continuous trading resumes.
+        Returns:
+            tuple: (price, volume), (None, 0) if nothing traded
+        """
+        price, volume = self.clearing_price()
+        if not volume:
+            return None, 0
+
+        # Pair the allocations of both sides into fills as they are produced, all at the
+        # clearing price and time; nothing per order is kept, which keeps the GC quiet
+        match_ns = time.monotonic_ns()
+        match_wall_ns = time.time_ns()
+        buys = self._allocate(self.bids, volume, price, match_ns, match_wall_ns)
+        sells = self._allocate(self.asks, volume, price, match_ns, match_wall_ns)
+        if self.book_event_listeners:
+            buys = self._execute_events(buys, price)
+            sells = self._execute_events(sells, price)
+        fill_listeners = self.fill_listeners
+        recent_fills = self.matched_trades
+        buy_order, buy_quantity = next(buys)
+        sell_order, sell_quantity = next(sells)
+        while True:
+            traded_quantity = min(buy_quantity, sell_quantity)
+            fill = Fill(traded_quantity, price, buy_order.order_id, sell_order.order_id, match_ns, match_wall_ns)
+            recent_fills.append(fill)
+            for listener in fill_listeners:
+                listener(fill, buy_order, sell_order)
+            buy_quantity -= traded_quantity
+            sell_quantity -= traded_quantity
+            if buy_quantity == 0:
+                allocation = next(buys, None)
+                if allocation is None:
+                    break  # Both sides allocated the same volume, so they run out together
+                buy_order, buy_quantity = allocation
+            if sell_quantity == 0:
+                sell_order, sell_quantity = next(sells)
+        self.last_trade_price = price
+        self._extend_trade_range(price, price)
+
+        if self.buy_stops or self.sell_stops:
+            self._execute_triggered_stops()
+        self.trade_low = self.trade_high = None
+        self.update_best_avg_price()
+        self.publish_snapshot()
+        return price, volume
+
+    def set_auction_mode(self, enabled):
+        """
+        Switch between continuous matching and call auction. Leaving auction mode
+        uncrosses the collected orders first, as in an opening auction; stops it
+        triggers then already match continuously, and so do the market and
+        IOC/FOK stops triggered during the auction, which stayed pending.
+        Returns:
+            tuple: (price, volume) of that uncross
+        """
+        self.auction_mode = enabled
+        if enabled:
+            return None, 0
+        price, volume = self.uncross()
+        if self.held_stops:
+            held, self.held_stops = self.held_stops, []
+            for order in held:
+                if order.status == "pending":  # Not cancelled or expired while held
+                    del self.orders[order.order_id]
+                    order.status = "new"
+                    self._execute(order)
+            if self.buy_stops or self.sell_stops:
+                self._execute_triggered_stops()
+            self.trade_low = self.trade_high = None
+            self.update_best_avg_price()
+            self.publish_snapshot()
+        return price, volume
+
+    def _allocate(self, side, volume, price, match_ns, match_wall_ns):
+        """
+        Take `volume` from the best levels of one side in price-time priority,
+        yielding (order, quantity) allocations. Levels that are used up
+        completely are dropped as a whole.
+        """
+        orders = self.orders
+        remaining = volume
+        while remaining:
+            level = side.best_level()
+            if level.quantity <= remaining:
+                remaining -= level.quantity
+                side.remove_level(level.price)
+                for order in level.orders:
+                    quantity = order.quantity
+                    if quantity:
+                        order.filled_quantity += quantity
+                        order.executed_notional += quantity * price
+                        order.quantity = 0
+                        order.status = "filled"
+                        order.match_ns = match_ns
+                        order.match_wall_ns = match_wall_ns
+                        del orders[order.order_id]
+                        yield order, quantity
+                continue
+
+            side.dirty.add(level.price)
+            level_orders = level.orders
+            while remaining:
+                order = level_orders[0]
+                if order.quantity == 0:
+                    level_orders.popleft()  # Cancelled order left in the queue
+                    continue
+                quantity = min(order.quantity, remaining)
+                order.quantity -= quantity
+                order.filled_quantity += quantity
+                order.executed_notional += quantity * price
+                order.match_ns = match_ns
+                order.match_wall_ns = match_wall_ns
+                level.quantity -= quantity
+                remaining -= quantity
+                if order.quantity == 0:
+                    level_orders.popleft()
+                    level.count -= 1
+                    order.status = "filled"
+                    del orders[order.order_id]
+                yield order, quantity
+
+    def _execute_events(self, allocations, price):
+        """
+        Pass allocations through, generating an execute book event for each.
+        """
+        for order, quantity in allocations:
+            self._book_event("execute", order, quantity, price)
+            yield order, quantity
+
+    def _book_event(self, event, order, quantity, price):
+        self.book_event_sequence += 1
+        for listener in self.book_event_listeners:
+            listener(self.book_event_sequence, event, order, quantity, price)
+
+    def _cancel_remainder(self, order):
+        """
+        Cancel the unfilled quantity of an order that is not resting in the book.
+        """
+        quantity = order.quantity
+        order.quantity = 0
+        order.cancelled_quantity += quantity
+        order.status = "cancelled"  # Possibly after partial fills, see filled_quantity
+        if quantity:
+            for listener in self.cancel_listeners:
+                listener(order, quantity)
+
+    def _stop_is_triggered(self, order):
+        last_trade_price = self.last_trade_price
+        if last_trade_price is None:
+            return False
+        if order.order_type == 'buy':
+            return last_trade_price >= order.stop_price
+        return last_trade_price <= order.stop_price
+
+    def _add_stop(self, order):
+        order.status = "pending"
+        self.orders[order.order_id] = order
+        if order.order_type == 'buy':
+            heapq.heappush(self.buy_stops, (order.stop_price, order.order_id, order))
+        else:
+            heapq.heappush(self.sell_stops, (-order.stop_price, order.order_id, order))
+
+    def _pop_triggered_stop(self):
+        """
+        Pop the next stop order crossed by the trades of the current submit or
+        uncross, or None: buy stops at or below their highest price, sell stops
+        at or above their lowest. Only heap entries whose trigger price was
+        reached are inspected.
+        """
+        trade_high = self.trade_high
+        if trade_high is None:
+            return None
+        buy_stops = self.buy_stops
+        while buy_stops and buy_stops[0][0] <= trade_high:
+            order = heapq.heappop(buy_stops)[2]
+            if order.status == "pending":
+                return order
+        trade_low = self.trade_low
+        sell_stops = self.sell_stops
+        while sell_stops and -sell_stops[0][0] >= trade_low:
+            order = heapq.heappop(sell_stops)[2]
+            if order.status == "pending":
+                return order
+        return None
+
+    def _execute_triggered_stops(self):
+        # Triggered orders can trade and trigger further stops, keep going until none are crossed
+        order = self._pop_triggered_stop()
+        while order is not None:
+            if self.auction_mode and (order.price is None or order.time_in_force not in RESTING_TIME_IN_FORCE):
+                self.held_stops.append(order)  # Stays pending (and cancellable) in self.orders
+            else:
+                del self.orders[order.order_id]
+                order.status = "new"
+                self._execute(order)
+            order = self._pop_triggered_stop()
+
+    def _record_fill(self, quantity, price, buy_order, sell_order, match_ns, match_wall_ns):
+        """
+        Store a fill and stamp the match time on both orders.
+        """
+        buy_order.match_ns = sell_order.match_ns = match_ns
+        buy_order.match_wall_ns = sell_order.match_wall_ns = match_wall_ns
+        self.last_trade_price = price
+        fill = Fill(quantity, price, buy_order.order_id, sell_order.order_id, match_ns, match_wall_ns)
+        self.matched_trades.append(fill)
+        for listener in self.fill_listeners:
+            listener(fill, buy_order, sell_order)
+        if self.book_event_listeners:
+            # The resting side is already marked filled or still resting, the incoming order is neither yet
+            resting = sell_order if sell_order.status in ("resting", "filled") else buy_order
+            self._book_event("execute", resting, quantity, price)
+
+    def update_best_avg_price(self):
+        if self.bids and self.asks:
+            self.best_avg_price = (self.bids.best_price() + self.asks.best_price()) / 2
+        else:
+            self.best_avg_price = None
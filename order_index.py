@@ -0,0 +1,72 @@
+class ClientOrderIndex:
+    """
+    Live orders (resting or pending stops) of every client, grouped by
+    (symbol, side), across all order books.
+
+    The order books report fills and cancels through their listeners, so the
+    index stays current without scanning, and selecting a client's orders for a
+    mass cancel costs O(k) in the number of orders selected.
+    """
+
+    def __init__(self):
+        self.orders = {}  # client_id -> {(symbol, side): {order_id: Order}}
+
+    def __len__(self):
+        return sum(len(group) for groups in self.orders.values() for group in groups.values())
+
+    def add(self, order):
+        groups = self.orders.get(order.client_id)
+        if groups is None:
+            groups = self.orders[order.client_id] = {}
+        group = groups.get((order.symbol, order.order_type))
+        if group is None:
+            group = groups[(order.symbol, order.order_type)] = {}
+        group[order.order_id] = order
+
+    def remove(self, order):
+        groups = self.orders.get(order.client_id)
+        if groups is None:
+            return
+        key = (order.symbol, order.order_type)
+        group = groups.get(key)
+        if group is None or group.pop(order.order_id, None) is None:
+            return
+        if not group:
+            del groups[key]
+            if not groups:
+                del self.orders[order.client_id]
+
+    def on_fill(self, fill, buy_order, sell_order):
+        """
+        Order book fill listener: drop orders that are completely filled.
+        """
+        if buy_order.quantity == 0:
+            self.remove(buy_order)
+        if sell_order.quantity == 0:
+            self.remove(sell_order)
+
+    def on_cancel(self, order, quantity):
+        """
+        Order book cancel listener.
+        """
+        self.remove(order)
+
+    def select(self, client_id, symbol="", side=""):
+        """
+        Get the live orders of a client, optionally only for one symbol and/or side.
+        Returns:
+            list: the matching orders
+        """
+        groups = self.orders.get(client_id)
+        if not groups:
+            return []
+        if symbol and side:
+            keys = [(symbol, side)]
+        else:
+            keys = [key for key in groups if (not symbol or key[0] == symbol) and (not side or key[1] == side)]
+        selected = []
+        for key in keys:
+            group = groups.get(key)
+            if group:
+                selected.extend(group.values())
+        return selected
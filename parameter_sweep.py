@@ -0,0 +1,179 @@
+"""
+Parameter sweep of market simulations over a process pool.
+
+Every combination of the --param values, times --seeds replicates, is one
+independent market_simulator run. Runs are spread over one worker process per
+core and each finished run appends one row of summary statistics to the
+output CSV. Rerunning the same command after an interruption skips the runs
+already in the file:
+
+    python parameter_sweep.py --param rate=1000,5000 --param price_scale=2,4,8 \\
+        --param mean_quantity=20,50 --seeds 3 --orders 200000 --output sweep.csv
+
+Parameters are the FlowParameters arguments: rate, arrival, burstiness,
+market_ratio, cancel_ratio, buy_ratio, price_distribution, price_offset,
+price_scale, mean_quantity, tick_size and initial_mid.
+"""
+import argparse
+import concurrent.futures
+import csv
+import inspect
+import itertools
+import os
+import time
+
+import numpy as np
+
+from market_simulator import FlowParameters, MarketSimulator
+
+FLOW_PARAMETERS = [name for name in inspect.signature(FlowParameters).parameters]
+SUMMARY_COLUMNS = ("events", "wall_seconds", "events_per_second", "fills", "volume", "vwap", "fill_rate",
+                   "spread_mean", "spread_p50", "spread_p90", "spread_p99", "two_sided_share", "resting_orders",
+                   "cancel_misses")
+
+
+def parse_value(text):
+    for value_type in (int, float):
+        try:
+            return value_type(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(items):
+    """
+    Parse 'name=v1,v2,...' items.
+    Returns:
+        dict: parameter name -> list of values, in the order given
+    """
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if name not in FLOW_PARAMETERS:
+            raise ValueError(f"Unknown parameter {name!r}, expected one of: {', '.join(FLOW_PARAMETERS)}")
+        grid[name] = [parse_value(value) for value in values.split(",") if value]
+    return grid
+
+
+def run_id(params, seed, orders, sample_interval):
+    """Stable key of a run, used to skip finished runs when resuming."""
+    return ";".join(f"{name}={params[name]}" for name in sorted(params)) + \
+        f";orders={orders};sample_interval={sample_interval};seed={seed}"
+
+
+def simulate(params, seed, orders, sample_interval_ns):
+    """
+    Worker: run one simulation.
+    Returns:
+        dict: summary statistics, see SUMMARY_COLUMNS
+    """
+    simulator = MarketSimulator(FlowParameters(**params), seed, sample_interval_ns=sample_interval_ns)
+    result = simulator.run(orders)
+    fills, metrics, counts = result.fills, result.metrics, result.counts
+    volume = int(fills["quantity"].sum())
+    two_sided = ~np.isnan(metrics["best_bid"]) & ~np.isnan(metrics["best_ask"])
+    spread = (metrics["best_ask"] - metrics["best_bid"])[two_sided] / simulator.flow.tick_size  # In ticks
+    spread_stats = [float(spread.mean())] + np.percentile(spread, [50, 90, 99]).tolist() if len(spread) else [0.0] * 4
+    return dict(zip(SUMMARY_COLUMNS, (
+        result.events,
+        round(result.wall_seconds, 3),
+        round(result.events / result.wall_seconds) if result.wall_seconds else 0,
+        len(fills["quantity"]),
+        volume,
+        round(float((fills["price"] * fills["quantity"]).sum()) / volume, 6) if volume else 0.0,
+        # Both sides of every fill count as filled quantity
+        round(2 * volume / counts["submitted_quantity"], 4) if counts["submitted_quantity"] else 0.0,
+        *(round(value, 3) for value in spread_stats),
+        round(float(two_sided.mean()), 4) if len(two_sided) else 0.0,
+        int(metrics["resting_orders"][-1]) if len(metrics["resting_orders"]) else 0,
+        counts["cancel_misses"],
+    )))
+
+
+def finished_runs(path, header):
+    """
+    Read the run ids already in an output file.
+    Returns:
+        set: run ids
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        existing_header = next(reader, None)
+        if existing_header != header:
+            raise ValueError(f"{path} has different columns, was it written by a sweep over other parameters?")
+        # A row cut short by a kill is not finished, its run is done again
+        return {row[0] for row in reader if len(row) == len(header)}
+
+
+def ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Run market simulations over a parameter grid in parallel")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="Values of a FlowParameters argument to sweep, repeat for more parameters")
+    parser.add_argument("--seeds", type=int, default=1, help="Replicates of every configuration, with seeds 1..N")
+    parser.add_argument("--orders", type=int, default=200000, help="Events per run")
+    parser.add_argument("--sample-interval", type=float, default=100, help="Book metrics sampling interval (simulated ms)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: one per core)")
+    parser.add_argument("--output", default="sweep.csv", help="CSV file of per-run statistics, appended to when resuming")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.param)
+    names = list(grid)
+    # Runs with other --orders or --sample-interval values are other runs, not finished ones
+    header = ["run_id", *names, "orders", "sample_interval", "seed", *SUMMARY_COLUMNS]
+    done = finished_runs(args.output, header)
+    runs = []
+    skipped = 0
+    for values in itertools.product(*grid.values()):
+        params = dict(zip(names, values))
+        for seed in range(1, args.seeds + 1):
+            if run_id(params, seed, args.orders, args.sample_interval) in done:
+                skipped += 1
+            else:
+                runs.append((params, seed))
+    total = len(runs) + skipped
+    print(f"{total} runs, {skipped} already in {args.output}, {len(runs)} to do on {args.workers} workers")
+    if not runs:
+        return
+
+    start = time.perf_counter()
+    completed = 0
+    with open(args.output, "a", newline="") as f, \
+            concurrent.futures.ProcessPoolExecutor(args.workers) as pool:
+        writer = csv.writer(f)
+        if f.tell() == 0:
+            writer.writerow(header)
+        elif not ends_with_newline(args.output):
+            f.write("\n")  # Terminate a row cut short by a kill
+        futures = {pool.submit(simulate, params, seed, args.orders, int(args.sample_interval * 1e6)): (params, seed)
+                   for params, seed in runs}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                params, seed = futures[future]
+                summary = future.result()
+                # Written as soon as a run finishes, so an interruption only loses the runs in progress
+                key = run_id(params, seed, args.orders, args.sample_interval)
+                writer.writerow([key, *params.values(), args.orders, args.sample_interval, seed, *summary.values()])
+                f.flush()
+                completed += 1
+                print(f"[{skipped + completed}/{total}] {key}: "
+                      f"{summary['events_per_second']:,} events/s, volume {summary['volume']}, "
+                      f"spread {summary['spread_mean']} ticks")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print(f"Interrupted, {completed} runs saved; rerun the same command to resume")
+            raise
+    elapsed = time.perf_counter() - start
+    print(f"{completed} runs in {elapsed:.1f}s, {completed * args.orders / elapsed:,.0f} events/s over all workers")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,51 @@
+import argparse
+
+import grpc
+import ticker_service_pb2
+import ticker_service_pb2_grpc
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Profile the running market server")
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--mode", choices=["cprofile", "sampling"], default="cprofile")
+    parser.add_argument("--duration", type=float, default=5, help="Profiling duration in seconds")
+    parser.add_argument("--sample-interval", type=int, default=1000, help="Sampling interval in microseconds")
+    parser.add_argument("--tracemalloc-top", type=int, default=0, help="Also report the top N allocating lines")
+    parser.add_argument("--top", type=int, default=30, help="Number of functions in the summary")
+    parser.add_argument("--output", default="", help="Save pstats (cprofile) or collapsed stacks (sampling) to this file")
+    parser.add_argument("--stop", action="store_true", help="Stop the running session instead of starting one")
+    args = parser.parse_args()
+
+    with grpc.insecure_channel(args.target) as channel:
+        stub = ticker_service_pb2_grpc.TickerServiceStub(channel)
+        if args.stop:
+            response = stub.StopProfile(ticker_service_pb2.StopProfileRequest())
+            print("Profiling session stopped" if response.stopped else "No profiling session running")
+            return
+
+        request = ticker_service_pb2.ProfileRequest(
+            mode=args.mode,
+            duration_ms=int(args.duration * 1000),
+            sample_interval_us=args.sample_interval,
+            tracemalloc_top=args.tracemalloc_top,
+            top_functions=args.top,
+        )
+        response = stub.Profile(request, timeout=args.duration + 120)
+
+        print(f"Profiled for {response.duration_ns / 1e9:.2f}s")
+        if response.sample_count:
+            print(f"Samples: {response.sample_count}")
+        print(response.summary)
+        if response.tracemalloc_top:
+            print("Top allocations:")
+            print(response.tracemalloc_top)
+
+        if args.output:
+            with open(args.output, "wb") as f:
+                f.write(response.pstats if args.mode == "cprofile" else response.collapsed_stacks)
+            print(f"Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    run()
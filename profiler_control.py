@@ -0,0 +1,160 @@
+import asyncio
+import collections
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+
+MAX_PROFILE_DURATION = 60.0  # Hard limit for any profiling session (in seconds)
+
+
+class ProfileResult:
+    def __init__(self):
+        self.pstats_data = b""
+        self.collapsed_stacks = b""
+        self.summary = ""
+        self.tracemalloc_top = ""
+        self.duration_ns = 0
+        self.sample_count = 0
+
+
+class StackSampler:
+    """
+    Low overhead sampling profiler. A background thread periodically grabs the
+    current stack of the target thread and counts identical stacks, producing
+    collapsed-stack output ("outer;inner;leaf count") for flame graph tools.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = collections.Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+            self.counts[";".join(stack)] += 1
+            self.sample_count += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common()).encode()
+
+
+class ProfilerControl:
+    """
+    Runs on-demand profiling sessions inside the live server process.
+
+    Only one session can run at a time and every session ends after at most
+    MAX_PROFILE_DURATION seconds, or earlier when stop() is called. Profilers are
+    always disabled in a finally block, so a cancelled RPC cannot leave one running.
+    Report formatting is done in a worker thread to keep it off the event loop.
+    """
+
+    def __init__(self, max_duration=MAX_PROFILE_DURATION):
+        self.max_duration = max_duration
+        self.active = False
+        self._stop_event = None
+
+    def stop(self):
+        """End the running session early. Returns False if none is running."""
+        if not self.active:
+            return False
+        self._stop_event.set()
+        return True
+
+    async def run(self, mode="cprofile", duration=1.0, sample_interval=0.001, tracemalloc_top=0, top_functions=30):
+        if self.active:
+            raise RuntimeError("A profiling session is already running")
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+
+        duration = min(max(duration, 0.0), self.max_duration)
+        self.active = True
+        self._stop_event = asyncio.Event()
+        result = ProfileResult()
+        profiler = None
+        sampler = None
+        started_tracemalloc = False
+        snapshot = None
+        start = time.perf_counter_ns()
+        try:
+            if tracemalloc_top > 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                sampler = StackSampler(threading.get_ident(), max(sample_interval, 0.0001))
+                sampler.start()
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=duration)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+            if tracemalloc_top > 0 and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            result.duration_ns = time.perf_counter_ns() - start
+            self.active = False
+
+        loop = asyncio.get_running_loop()
+        if profiler is not None:
+            result.pstats_data, result.summary = await loop.run_in_executor(
+                None, self._format_pstats, profiler, top_functions)
+        if sampler is not None:
+            result.sample_count = sampler.sample_count
+            result.collapsed_stacks = sampler.collapsed()
+            result.summary = "".join(
+                f"{count:>8} {stack.rsplit(';', 1)[-1]}\n" for stack, count in sampler.counts.most_common(top_functions))
+        if snapshot is not None:
+            result.tracemalloc_top = await loop.run_in_executor(
+                None, self._format_tracemalloc, snapshot, tracemalloc_top)
+        return result
+
+    @staticmethod
+    def _format_pstats(profiler, top_functions):
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_functions)
+        # Same format pstats.Stats.dump_stats writes, so the bytes can be saved and loaded with pstats
+        return marshal.dumps(stats.stats), stream.getvalue()
+
+    @staticmethod
+    def _format_tracemalloc(snapshot, top):
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines = []
+        for statistic in snapshot.statistics("lineno")[:top]:
+            lines.append(str(statistic))
+        return "\n".join(lines)
@@ -0,0 +1,82 @@
+import collections
+import time
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per client: tokens refill at `rate` per second up to `burst`,
+    each request takes one. Checks are O(1).
+
+    Buckets are kept in least-recently-used order, so idle clients are evicted
+    from the front without scanning, and the number of tracked clients is capped
+    at max_clients. A bucket idle for burst / rate seconds would be full again,
+    so dropping it never lets a client exceed its limit.
+    """
+
+    def __init__(self, rate, burst, idle_timeout=60.0, max_clients=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.idle_timeout_ns = int(max(idle_timeout, burst / rate) * 1e9)
+        self.buckets = collections.OrderedDict()  # client_id -> [tokens, last_refill_ns]
+        self.rejected = 0
+
+    def allow(self, client_id, now_ns=None):
+        """Take a token for the client. Returns False if the client is over its limit."""
+        now = now_ns if now_ns is not None else time.monotonic_ns()
+        buckets = self.buckets
+
+        bucket = buckets.get(client_id)
+        if bucket is None:
+            self._evict_idle(now)
+            bucket = buckets[client_id] = [self.burst, now]
+            if len(buckets) > self.max_clients:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(client_id)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate / 1e9)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        self.rejected += 1
+        return False
+
+    def _evict_idle(self, now):
+        buckets = self.buckets
+        cutoff = now - self.idle_timeout_ns
+        while buckets:
+            client_id, bucket = next(iter(buckets.items()))
+            if bucket[1] >= cutoff:
+                break
+            del buckets[client_id]
+
+
+class RateLimiter:
+    """
+    Token bucket limiters per RPC, configured as {rpc: (rate, burst)}.
+    RPCs without a limit, or with a rate <= 0, are not limited.
+    """
+
+    def __init__(self, limits, idle_timeout=60.0, max_clients=100000):
+        self.limiters = {
+            rpc: TokenBucketLimiter(rate, burst, idle_timeout, max_clients)
+            for rpc, (rate, burst) in limits.items() if rate > 0
+        }
+
+    def allow(self, rpc, client_id):
+        limiter = self.limiters.get(rpc)
+        return limiter is None or limiter.allow(client_id)
+
+
+def parse_rate_limits(items, defaults):
+    """
+    Merge 'RPC=rate:burst' strings into a copy of the default limits.
+    """
+    limits = dict(defaults)
+    for item in items:
+        rpc, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[rpc] = (float(rate), float(burst) if burst else float(rate))
+    return limits
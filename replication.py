@@ -0,0 +1,317 @@
+"""
+Hot-standby replication of the server's order books.
+
+The primary appends every command that changes its books (accepted orders,
+cancels and expiries, trading mode switches, auction uncrosses, ticker
+changes) to a ReplicationLog, in the order it applied them. Standbys stream
+the log with the Replicate RPC and apply the commands to their own books in
+the same order, so they generate the same order ids, fills and resting
+orders. A standby serves market data but refuses orders until it is promoted:
+
+    python server.py --port 50051 --replication primary
+    python server.py --port 50052 --replication standby --primary localhost:50051
+    python replication_client.py --target localhost:50052 --promote
+
+Replication is asynchronous: appending to the log only queues the command,
+and the primary answers the client without waiting for the standby. With
+--replication-sync, order responses wait until a standby has acknowledged
+the command, or until --replication-ack-timeout passes. The primary only
+keeps the latest --replication-log-size commands, a standby further behind
+has to start over.
+"""
+import asyncio
+import collections
+import time
+
+import grpc
+import ticker_service_pb2
+import ticker_service_pb2_grpc
+
+MAX_BATCH_COMMANDS = 1000  # Commands per ReplicationBatch
+
+
+class ReplicationDivergence(Exception):
+    """
+    Raised when a standby's books can no longer match the primary's. The
+    standby stops replicating, it has to be started again from scratch.
+    """
+
+
+class ReplicationLog:
+    """
+    Sequenced command log of a primary. The latest max_commands commands are
+    kept in memory, so a standby can start or reconnect at any time and catch
+    up from its position as long as that is still in the window. A standby
+    further behind is refused with FAILED_PRECONDITION.
+    """
+
+    def __init__(self, sync=False, ack_timeout=1.0, first_sequence=1, max_commands=1_000_000):
+        self.sync = sync  # Wait for a standby acknowledgement before answering orders
+        self.ack_timeout = ack_timeout
+        self.first_sequence = first_sequence  # Sequence of commands[0]; a promoted standby continues its primary's
+        self.max_commands = max_commands
+        self.trim_step = max(max_commands // 8, 1)  # Commands dropped at once, so trimming is amortized
+        self.commands = []
+        self.sequence = first_sequence - 1  # Latest command appended
+        self.standbys = set()  # asyncio.Event of each connected standby stream, set on new commands
+        self.acked_sequence = first_sequence - 1  # Latest command acknowledged by any standby
+        self.ack_waiters = collections.deque()  # (sequence, future) in sequence order
+        self.ack_timeouts = 0
+
+    def append(self, **command):
+        """
+        Append a command, given as the field of the ReplicationCommand oneof.
+        Returns:
+            int: its sequence number
+        """
+        self.sequence += 1
+        self.commands.append(ticker_service_pb2.ReplicationCommand(
+            sequence=self.sequence, time_ns=time.time_ns(), **command))
+        if len(self.commands) >= self.max_commands + self.trim_step:
+            dropped = len(self.commands) - self.max_commands
+            del self.commands[:dropped]
+            self.first_sequence += dropped
+        for ready in self.standbys:
+            ready.set()
+        return self.sequence
+
+    async def wait_for_ack(self, sequence):
+        """
+        With sync replication, wait until a standby acknowledged the command, if
+        any standby is connected.
+        """
+        if not self.sync or not self.standbys or self.acked_sequence >= sequence:
+            return
+        acked = asyncio.get_running_loop().create_future()
+        self.ack_waiters.append((sequence, acked))
+        try:
+            await asyncio.wait_for(asyncio.shield(acked), self.ack_timeout)
+        except asyncio.TimeoutError:
+            self.ack_timeouts += 1
+
+    def _ack(self, sequence):
+        if sequence > self.acked_sequence:
+            self.acked_sequence = sequence
+        waiters = self.ack_waiters
+        while waiters and (waiters[0][0] <= sequence or not self.standbys):
+            acked = waiters.popleft()[1]
+            if not acked.done():
+                acked.set_result(None)
+
+    async def stream(self, request_iterator, context):
+        """
+        Serve a Replicate stream: the commands after the standby's first
+        acknowledgement, then new commands as they are appended.
+        """
+        hello = await request_iterator.__anext__()
+        next_sequence = hello.applied_sequence + 1
+        if next_sequence < self.first_sequence:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, self._behind_window(hello.applied_sequence))
+        if next_sequence > self.sequence + 1:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                                f"The standby is at command {hello.applied_sequence}, ahead of the primary at {self.sequence}")
+
+        async def read_acks():
+            async for ack in request_iterator:
+                self._ack(ack.applied_sequence)
+
+        ready = asyncio.Event()
+        self.standbys.add(ready)
+        acks_task = asyncio.create_task(read_acks())
+        print(f"Standby connected at command {hello.applied_sequence}, primary at {self.sequence}")
+        try:
+            while True:
+                if next_sequence > self.sequence:
+                    await ready.wait()
+                    ready.clear()
+                    continue
+                if next_sequence < self.first_sequence:
+                    # Fell so far behind that the commands it needs next were trimmed
+                    await context.abort(grpc.StatusCode.FAILED_PRECONDITION, self._behind_window(next_sequence - 1))
+                start = next_sequence - self.first_sequence
+                commands = self.commands[start:start + MAX_BATCH_COMMANDS]
+                next_sequence += len(commands)
+                yield ticker_service_pb2.ReplicationBatch(commands=commands, primary_sequence=self.sequence)
+        finally:
+            acks_task.cancel()
+            self.standbys.discard(ready)
+            self._ack(self.acked_sequence)  # Without standbys, nobody waits for acknowledgements any more
+            print("Standby disconnected")
+
+    def _behind_window(self, applied_sequence):
+        return (f"The log starts at command {self.first_sequence}, the standby is at {applied_sequence}; "
+                f"restart it from scratch or raise --replication-log-size")
+
+    def status(self):
+        unacked = self.sequence - self.acked_sequence
+        lag_us = 0
+        if unacked and self.standbys:
+            oldest = self.commands[max(self.acked_sequence + 1 - self.first_sequence, 0)]
+            lag_us = (time.time_ns() - oldest.time_ns) // 1000
+        return ticker_service_pb2.ReplicationStatus(
+            role="primary", sequence=self.sequence, events_behind=unacked, lag_us=lag_us,
+            standbys=len(self.standbys), ack_timeouts=self.ack_timeouts)
+
+
+class Standby:
+    """
+    Streams the command log of a primary and applies it to the books of a
+    TickerServiceServicer, reconnecting after a delay whenever the stream fails.
+    """
+
+    def __init__(self, servicer, primary, reconnect_delay=1.0, sync=False, ack_timeout=1.0, log_size=1_000_000):
+        self.servicer = servicer
+        self.primary = primary
+        self.reconnect_delay = reconnect_delay
+        self.sync = sync  # Settings of the replication log once promoted
+        self.ack_timeout = ack_timeout
+        self.log_size = log_size
+        self.applied_sequence = 0
+        self.primary_sequence = 0
+        self.lag_ns = 0  # Age of the latest command when it was applied
+        self.connected = False
+        self.diverged = ""  # Why replication stopped for good, see ReplicationDivergence
+        self.acks = asyncio.Queue()  # ReplicationAck to send upstream
+        self.expired = []  # Orders past their deadline here, expired by the primary or on promotion
+        self.auction_intervals = {}  # symbol -> periodic auction interval in seconds, restarted on promotion
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        async with grpc.aio.insecure_channel(self.primary) as channel:
+            stub = ticker_service_pb2_grpc.TickerServiceStub(channel)
+            while True:
+                call = stub.Replicate(self._send_acks())
+                try:
+                    async for batch in call:
+                        self.connected = True
+                        await self.apply_batch(batch)
+                    print("Replication stream ended")
+                except grpc.aio.AioRpcError as e:
+                    print(f"Replication stream failed: {e.code().name} {e.details()}")
+                except ReplicationDivergence as e:
+                    self.diverged = str(e)
+                    print(f"Replication stopped, the books diverged from the primary's: {e}")
+                    return
+                finally:
+                    self.connected = False
+                    call.cancel()
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _send_acks(self):
+        # A new stream starts with the position to resume from; acks queued for the previous one are stale
+        while not self.acks.empty():
+            self.acks.get_nowait()
+        yield ticker_service_pb2.ReplicationAck(applied_sequence=self.applied_sequence)
+        while True:
+            yield await self.acks.get()
+
+    async def apply_batch(self, batch):
+        """
+        Apply the commands of a batch, then publish one market data update per
+        ticker they touched and acknowledge them.
+        """
+        touched = set()
+        for command in batch.commands:
+            if command.sequence <= self.applied_sequence:
+                continue  # Already applied before a reconnect
+            if command.sequence != self.applied_sequence + 1:
+                raise ReplicationDivergence(f"Replication gap: command {command.sequence} after {self.applied_sequence}")
+            symbol = self.apply(command)
+            if symbol:
+                touched.add(symbol)
+            self.applied_sequence = command.sequence
+            self.lag_ns = time.time_ns() - command.time_ns
+        self.primary_sequence = max(self.primary_sequence, batch.primary_sequence)
+        for symbol in touched:
+            if symbol in self.servicer.registry.order_books:
+                await self.servicer.broadcast_market_data(symbol)
+        self.acks.put_nowait(ticker_service_pb2.ReplicationAck(applied_sequence=self.applied_sequence))
+
+    def apply(self, command):
+        """
+        Apply one command to the books, like the primary did.
+        Returns:
+            str: the ticker whose book changed, if any
+        """
+        servicer = self.servicer
+        kind = command.WhichOneof("command")
+        if kind == "order":
+            return self._apply_order(command.order)
+        if kind == "cancel":
+            cancel = command.cancel
+            order_book = servicer.registry.order_books.get(cancel.ticker_symbol)
+            if order_book is not None:
+                for order in order_book.cancel_orders(cancel.order_ids, cancel.status):
+                    servicer.publish_order_update(order, order.cancelled_quantity)
+            return cancel.ticker_symbol
+        if kind == "trading_mode":
+            request = command.trading_mode
+            order_book = servicer.registry.get_order_book(request.ticker_symbol)
+            order_book.set_auction_mode(request.mode == "auction")
+            if request.mode == "auction" and request.interval_ms > 0:
+                self.auction_intervals[request.ticker_symbol] = request.interval_ms / 1000
+            else:
+                self.auction_intervals.pop(request.ticker_symbol, None)
+            return request.ticker_symbol
+        if kind == "uncross":
+            servicer.registry.get_order_book(command.uncross.ticker_symbol).uncross()
+            return command.uncross.ticker_symbol
+        if kind == "add_tickers":
+            servicer.add_tickers(command.add_tickers)
+        elif kind == "retire_tickers":
+            servicer.retire_tickers(command.retire_tickers)
+        return None
+
+    def _apply_order(self, replicated):
+        servicer = self.servicer
+        order_book = servicer.registry.get_order_book(replicated.ticker_symbol)
+        price = replicated.price or None
+        # Reserve the exposure like the primary's check did; it accepted the order, so should this one.
+        # If not, the exposure was never reserved and later releases would corrupt the accounting
+        reject_reason = servicer.risk_gate.check_order(
+            replicated.client_id, replicated.ticker_symbol, replicated.side, replicated.quantity, price,
+            order_book.best_avg_price)
+        if reject_reason:
+            raise ReplicationDivergence(
+                f"Risk check rejected order {replicated.order_id} that the primary accepted: {reject_reason}")
+        expire_ns = 0
+        if replicated.expire_time_ns:
+            expire_ns = time.monotonic_ns() + replicated.expire_time_ns - time.time_ns()
+        now_ns = time.monotonic_ns()
+        order = order_book.create_order(
+            replicated.side, price, replicated.quantity, now_ns, replicated.receive_time_ns,
+            replicated.client_send_time_ns, replicated.client_id, replicated.time_in_force,
+            replicated.stop_price or None, expire_ns)
+        if order.order_id != replicated.order_id:
+            raise ReplicationDivergence(f"Order id {order.order_id} differs from the primary's {replicated.order_id}")
+        order_book.submit(order)
+        if order.status in ("resting", "pending"):
+            servicer.order_index.add(order)
+            if expire_ns:
+                servicer.expiry_wheel.schedule(expire_ns, order)
+        return replicated.ticker_symbol
+
+    def status(self):
+        return ticker_service_pb2.ReplicationStatus(
+            role="standby", sequence=self.applied_sequence, primary_sequence=self.primary_sequence,
+            events_behind=max(self.primary_sequence - self.applied_sequence, 0), lag_us=self.lag_ns // 1000,
+            connected=self.connected, diverged=self.diverged)
+
+    async def promote(self):
+        """
+        Stop replicating and take over the primary's duties: expire the orders
+        whose deadline passed and restart periodic auctions.
+        """
+        self.task.cancel()
+        print(f"Promoted at command {self.applied_sequence}")
+        servicer = self.servicer
+        for symbol, interval in self.auction_intervals.items():
+            order_book = servicer.registry.order_books.get(symbol)
+            if order_book is not None and order_book.auction_mode:
+                servicer.auction_tasks[symbol] = asyncio.create_task(
+                    servicer.run_auctions_periodically(order_book, interval))
+        expired, self.expired = self.expired, []
+        await servicer.cancel_orders(expired, "expired")
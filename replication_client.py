@@ -0,0 +1,43 @@
+import argparse
+import time
+
+import grpc
+import ticker_service_pb2
+import ticker_service_pb2_grpc
+
+
+def print_status(status):
+    """Print a ReplicationStatus on one line."""
+    if not status.role:
+        print("Replication off")
+    elif status.role == "primary":
+        print(f"primary  sequence {status.sequence}  standbys {status.standbys}  "
+              f"unacknowledged {status.events_behind}  lag {status.lag_us}us  ack timeouts {status.ack_timeouts}")
+    else:
+        print(f"standby  applied {status.sequence}  primary {status.primary_sequence}  "
+              f"behind {status.events_behind}  lag {status.lag_us}us  {'connected' if status.connected else 'disconnected'}")
+        if status.diverged:
+            print(f"diverged, replication stopped: {status.diverged}")
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Show the replication status of a server or promote a standby")
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--promote", action="store_true", help="Promote the standby to primary")
+    parser.add_argument("--watch", type=float, default=0, help="Print the status every N seconds (0 = once)")
+    args = parser.parse_args()
+
+    with grpc.insecure_channel(args.target) as channel:
+        stub = ticker_service_pb2_grpc.TickerServiceStub(channel)
+        if args.promote:
+            print_status(stub.Promote(ticker_service_pb2.PromoteRequest()))
+            return
+        while True:
+            print_status(stub.GetReplicationStatus(ticker_service_pb2.ReplicationStatusRequest()))
+            if args.watch <= 0:
+                return
+            time.sleep(args.watch)
+
+
+if __name__ == '__main__':
+    run()
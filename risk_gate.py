@@ -0,0 +1,137 @@
+import math
+
+
+class RiskLimits:
+    """
+    Pre-trade limits applied per client. A limit of 0 disables that check.
+    """
+
+    def __init__(self, max_order_quantity=100000, max_order_notional=10000000, max_open_quantity=1000000,
+                 max_open_notional=100000000, max_position=1000000, price_collar=0.2):
+        self.max_order_quantity = max_order_quantity
+        self.max_order_notional = max_order_notional
+        self.max_open_quantity = max_open_quantity  # Resting quantity over all tickers
+        self.max_open_notional = max_open_notional  # Resting price * quantity over all tickers
+        self.max_position = max_position  # Worst case absolute position per ticker if all open orders fill
+        self.price_collar = price_collar  # Max distance of a limit price from the mid price, as a fraction
+
+
+class RiskGate:
+    """
+    Pre-trade risk checks in front of the order books.
+
+    Exposure is maintained incrementally: an accepted limit order reserves its
+    quantity and notional, and fills and cancels release them and move the
+    position. Every check and update is a few dict lookups, independent of how
+    many orders are resting in the books.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = limits or RiskLimits()
+        self.open_exposure = {}  # client_id -> [open_quantity, open_notional]
+        self.positions = {}  # (client_id, symbol) -> [position, open_buy_quantity, open_sell_quantity]
+        self.rejected = 0
+
+    def _reject(self, reason):
+        self.rejected += 1
+        return reason
+
+    def check_order(self, client_id, symbol, side, quantity, price=None, reference_price=None):
+        """
+        Check a new order against the limits. Limit orders (price given) that pass
+        are reserved right away, so concurrent orders see each other's exposure.
+        Returns:
+            str: the reason for rejecting the order, or None if it is accepted
+        """
+        limits = self.limits
+        if side not in ("buy", "sell"):
+            return self._reject(f"Unknown order side: {side}")
+        if quantity <= 0:
+            return self._reject("Quantity must be positive")
+        if limits.max_order_quantity and quantity > limits.max_order_quantity:
+            return self._reject(f"Quantity {quantity} exceeds the maximum order quantity {limits.max_order_quantity}")
+
+        if price is not None:
+            if not math.isfinite(price) or price <= 0:
+                return self._reject("Price must be positive")
+            if limits.price_collar and reference_price:
+                if abs(price - reference_price) > reference_price * limits.price_collar:
+                    return self._reject(f"Price {price} is outside the {limits.price_collar:.0%} collar around {reference_price}")
+            notional = price * quantity
+        else:
+            notional = reference_price * quantity if reference_price else 0.0
+
+        if limits.max_order_notional and notional > limits.max_order_notional:
+            return self._reject(f"Notional {notional:.2f} exceeds the maximum order notional {limits.max_order_notional}")
+
+        position = self.positions.get((client_id, symbol))
+        if limits.max_position:
+            current, open_buy, open_sell = position or (0, 0, 0)
+            if side == "buy" and current + open_buy + quantity > limits.max_position:
+                return self._reject(f"Order could take the position above {limits.max_position}")
+            if side == "sell" and current - open_sell - quantity < -limits.max_position:
+                return self._reject(f"Order could take the position below -{limits.max_position}")
+
+        if price is None:
+            return None  # Market orders execute immediately, only their fills count
+
+        # Entries are only created for accepted orders, so rejected clients leave nothing behind
+        exposure = self.open_exposure.get(client_id)
+        open_quantity, open_notional = exposure or (0, 0.0)
+        if limits.max_open_quantity and open_quantity + quantity > limits.max_open_quantity:
+            return self._reject(f"Open quantity would exceed {limits.max_open_quantity}")
+        if limits.max_open_notional and open_notional + notional > limits.max_open_notional:
+            return self._reject(f"Open notional would exceed {limits.max_open_notional}")
+
+        # Reserve the exposure of the new resting order
+        if exposure is None:
+            exposure = self.open_exposure[client_id] = [0, 0.0]
+        exposure[0] += quantity
+        exposure[1] += notional
+        if position is None:
+            position = self.positions[(client_id, symbol)] = [0, 0, 0]
+        position[1 if side == "buy" else 2] += quantity
+        return None
+
+    def release(self, order, quantity):
+        """
+        Release the reservation of `quantity` of a resting limit order (cancelled,
+        expired or rejected by the engine).
+        """
+        if order.price is None:
+            return
+        exposure = self.open_exposure.get(order.client_id)
+        if exposure is not None:
+            exposure[0] -= quantity
+            exposure[1] -= order.price * quantity
+            if exposure[0] <= 0:
+                del self.open_exposure[order.client_id]
+        position = self.positions.get((order.client_id, order.symbol))
+        if position is not None:
+            position[1 if order.order_type == "buy" else 2] -= quantity
+            if not any(position):
+                del self.positions[(order.client_id, order.symbol)]
+
+    def on_fill(self, fill, buy_order, sell_order):
+        """
+        Order book fill listener: release the filled quantity and move both positions.
+        """
+        for order, direction in ((buy_order, 1), (sell_order, -1)):
+            self.release(order, fill.quantity)
+            key = (order.client_id, order.symbol)
+            position = self.positions.get(key)
+            if position is None:
+                position = self.positions[key] = [0, 0, 0]
+            position[0] += direction * fill.quantity
+            if not any(position):
+                del self.positions[key]
+
+    def get_exposure(self, client_id, symbol=None):
+        """
+        Get a client's exposure.
+        Returns:
+            tuple: (open_quantity, open_notional, position) with position for `symbol` if given
+        """
+        open_quantity, open_notional = self.open_exposure.get(client_id, (0, 0.0))
+        position = self.positions.get((client_id, symbol), (0, 0, 0))[0] if symbol else 0
+        return open_quantity, open_notional, position
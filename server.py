@@ -1,15 +1,30 @@
+import argparse
 import asyncio
-import heapq
-import itertools
+import datetime
 import grpc
-from concurrent import futures
+import signal
 import time
 
 import ticker_service_pb2
 import ticker_service_pb2_grpc
+from latency_stats import LatencyStats, NULL_TIMER
+from loop_monitor import LoopMonitor, current_request
+from market_data_subscriptions import DepthSubscription, MarketDataSubscription, OrderBookEventSubscription, \
+    OrderUpdateSubscription, SubscriptionIndex
+from market_depth import encode_depth
+from matching_engine import OrderBook, TIME_IN_FORCE
+from order_index import ClientOrderIndex
+from profiler_control import ProfilerControl
+from rate_limiter import RateLimiter, parse_rate_limits
+from replication import ReplicationLog, Standby
+from risk_gate import RiskGate, RiskLimits
+from shm_feed import SharedMemoryFeed
+from tick_archive import TickArchive
+from ticker_registry import TickerRegistry
+from timer_wheel import TimerWheel
 
 
-# Hardcoded tickers and market data for simplicity
+# Default tickers, more can be loaded at startup or added at runtime through the registry
 TICKERS = [
     ticker_service_pb2.TickerInfo(symbol="AAPL", name="Apple Inc."),
     ticker_service_pb2.TickerInfo(symbol="GOOGL", name="Alphabet Inc."),
@@ -17,271 +32,1095 @@ TICKERS = [
 ]
 
 
-class Order:
-    def __init__(self, order_id, order_type, price, symbol, name, quantity):
-        self.order_id = order_id
-        self.order_type = order_type
-        self.price = price
-        self.symbol = symbol
-        self.name = name
-        self.quantity = quantity
+MAX_TICKERS_PAGE_SIZE = 10000
+DEFAULT_DEPTH_LEVELS = 10
+MAX_DEPTH_LEVELS = 5000
+DEPTH_COMPRESSION = {"": None, "gzip": grpc.Compression.Gzip, "deflate": grpc.Compression.Deflate}
+MAX_PENDING_BOOK_EVENTS = 100000  # Book events queued for a client before it is disconnected
+MAX_PENDING_ORDER_UPDATES = 100000  # Order updates queued for a client before it is disconnected
+DEFAULT_TRADE_BATCH = 10000
+MAX_TRADE_BATCH = 100000
+UNKNOWN_SYMBOL = "<unknown>"  # Stats key of requests for tickers not in the registry
+LOCAL_ADMINS = ("ipv4:127.0.0.1", "ipv6:[::1]", "ipv6:%5B::1%5D")  # Default clients allowed to call admin RPCs
 
-    def __repr__(self):
-        return f"Order({self.order_id}, {self.order_type}, {self.price}, {self.quantity})"
+# Default per-client limits as {rpc: (orders per second, burst)}
+DEFAULT_RATE_LIMITS = {
+    "SubmitLimitOrder": (1000, 2000),
+    "SubmitMarketOrder": (200, 400),
+}
 
-    # Add comparison based on price
-    def __lt__(self, other):
-        # Orders are compared based on price
-        if not isinstance(other, Order):
-            return NotImplemented
-        return self.price < other.price
 
-    def __eq__(self, other):
-        if not isinstance(other, Order):
-            return NotImplemented
-        return self.price == other.price
+def client_identity(context, trust_client_id=False, per_connection=True):
+    """
+    Identify the client of a request by something it cannot pick per request:
+    its TLS certificate identity if it presented one, otherwise its connection,
+    i.e. its address with the port, so that unauthenticated clients sharing a
+    host cannot cancel or stream each other's orders. The 'client-id' metadata
+    is only used with trust_client_id, for servers behind a proxy that
+    authenticates clients and sets it.
+    per_connection=False drops the (ephemeral) port, for rate limits and admin
+    rights, which a client must not renew by reconnecting.
+    """
+    if trust_client_id:
+        for key, value in context.invocation_metadata() or ():
+            if key == "client-id":
+                return value
+    identities = context.peer_identities()
+    if identities:
+        return identities[0].decode()
+    peer = context.peer()
+    if per_connection:
+        return peer
+    return peer.rsplit(":", 1)[0] if peer.count(":") > 1 else peer
 
 
-class OrderBook:
-    def __init__(self, symbol, name):
-        self.symbol = symbol
-        self.name = name
-        self.buy_orders = []  # Max heap for buy orders (store negative prices for max-heap behavior)
-        self.sell_orders = []  # Min heap for sell orders
-        self.best_avg_price = None  # Store average price between best buy and sell orders
-        self.matched_trades = []  # Store latest matched trades
-        self.order_id_counter = itertools.count(1)  # Automatic order ID generator
+def next_session_end_ns(session_end):
+    """
+    Monotonic time of the next occurrence of the local wall clock time 'HH:MM'.
+    """
+    now = datetime.datetime.now()
+    hour, minute = (int(part) for part in session_end.split(":"))
+    end = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if end <= now:
+        end += datetime.timedelta(days=1)
+    return time.monotonic_ns() + int((end - now).total_seconds() * 1e9)
 
-        self.lock = asyncio.Lock()  # Lock for synchronization
 
-    async def get_top_orders(self, n=3):
+class TickerServiceServicer(ticker_service_pb2_grpc.TickerServiceServicer):
+    def __init__(self, stats_enabled=True, loop_monitor_interval=0.01, slow_callback_threshold=0.005, tickers=TICKERS,
+                 rate_limits=DEFAULT_RATE_LIMITS, risk_limits=None, expiry_tick=0.01, session_end="", shm_feed=None,
+                 tick_size=0.01, replication_log=None, tick_archive=None, trust_client_id=False, admins=LOCAL_ADMINS):
+        self.trust_client_id = trust_client_id  # Take the 'client-id' metadata as the client's identity
+        self.admins = set(admins)  # Client identities allowed to call the admin RPCs
+        self.tick_archive = tick_archive  # Optional TickArchive of trades and top-of-book changes
+        self.replication_log = replication_log  # Command log streamed to standbys, if this is a primary
+        self.standby = None  # Standby applying a primary's log, set until promoted
+        self.shm_feed = shm_feed  # Optional SharedMemoryFeed for readers on the same host
+        self.tick_size = tick_size  # Price unit of MarketDepth messages
+        self.risk_gate = RiskGate(risk_limits)  # Pre-trade checks and per-client exposure
+        self.registry = TickerRegistry(self._create_order_book, tickers)  # Tickers and their lazily created order books
+        self.subscriptions = SubscriptionIndex()  # Market data streams by subscribed ticker
+        self.order_update_streams = {}  # client_id -> list of OrderUpdateSubscription of connected streams
+        self.order_index = ClientOrderIndex()  # Live orders per client, for mass cancels
+        self.disconnect_tasks = set()  # Running cancel-on-disconnect tasks
+        self.auction_tasks = {}  # symbol -> task uncrossing the book of a ticker in periodic auction mode
+        self.expiry_wheel = TimerWheel(tick_ns=int(expiry_tick * 1e9))  # Deadlines of GTT and DAY orders
+        self.session_end = session_end  # 'HH:MM' local time at which DAY orders expire
+        self.rate_limiter = RateLimiter(rate_limits)  # Token buckets per rpc and client
+        self.stats = LatencyStats(enabled=stats_enabled)  # Per-stage latency histograms
+        self.loop_monitor = LoopMonitor(self.stats, loop_monitor_interval, slow_callback_threshold)
+        self.profiler = ProfilerControl()
+
+    def _create_order_book(self, symbol, name, order_id_counter):
+        order_book = OrderBook(symbol, name, order_id_counter)
+        order_book.fill_listeners.append(self.risk_gate.on_fill)
+        order_book.fill_listeners.append(self.order_index.on_fill)
+        order_book.cancel_listeners.append(self.risk_gate.release)
+        order_book.cancel_listeners.append(self.order_index.on_cancel)
+        if self.shm_feed is not None:
+            order_book.snapshot_listeners.append(self.shm_feed.publish)
+        if self.tick_archive is not None:
+            order_book.fill_listeners.append(self.tick_archive.on_fill)
+        if symbol in self.subscriptions.events_by_symbol:
+            # Book recreated while its events are streamed
+            order_book.book_event_listeners.append(self.publish_book_event)
+        return order_book
+
+    def _tag_request(self, rpc, ticker_symbol):
         """
-        Get the top N buy and sell orders for display.
+        Tag the current task with the request being served, for the loop monitor.
+        Tickers not in the registry share one "<unknown>" key, so requests for
+        made-up symbols cannot grow the stats histograms.
         Returns:
-            tuple: (top_buy_orders, top_sell_orders)
-        """
-        async with self.lock:
-            # Get the top N buy orders (remember to negate the price for correct max-heap behavior)
-            top_buy_orders = [(abs(price), order) for price, order in heapq.nsmallest(n, self.buy_orders, key=lambda x: x[0])]
-            
-            # Get the top N sell orders (min-heap)
-            top_sell_orders = [(price, order) for price, order in heapq.nsmallest(n, self.sell_orders, key=lambda x: x[0])]
-
-            return top_buy_orders, top_sell_orders
-
-    async def add_limit_order(self, order_type, price, quantity):
-        async with self.lock:
-            if order_type not in ['buy', 'sell']:
-                raise ValueError(f"Unknown order type: {order_type}")
-            
-            order_id = next(self.order_id_counter)
-            order = Order(order_id, order_type, price, self.symbol, self.name, quantity)
-
-            if order_type == 'buy':
-                heapq.heappush(self.buy_orders, (-order.price, order))  # Max heap (negative prices)
-            else:
-                heapq.heappush(self.sell_orders, (order.price, order))  # Min heap
-
-            self.update_best_avg_price()
-            return order_id
-
-    async def add_market_order(self, order_type, quantity):
-        async with self.lock:
-            if order_type not in ['buy', 'sell']:
-                raise ValueError(f"Unknown order type: {order_type}")
-        
-            order_id = next(self.order_id_counter)
-            order = Order(order_id, order_type, None, self.symbol, self.name, quantity)
-
-            if order_type == 'buy':
-                await self._execute_market_buy_order(order)
-            else:
-                await self._execute_market_sell_order(order)
-
-            return order_id
-
-    async def _execute_market_buy_order(self, order):
-        while self.sell_orders and order.quantity > 0:
-            best_sell = self.sell_orders[0][1]  # Get the best sell order (lowest price)
-            if best_sell.quantity <= order.quantity:
-                traded_quantity = best_sell.quantity
-                heapq.heappop(self.sell_orders)  # Remove the sell order
-                order.quantity -= traded_quantity
-            else:
-                traded_quantity = order.quantity
-                best_sell.quantity -= traded_quantity
-                order.quantity = 0
-
-            self.matched_trades.append((traded_quantity, best_sell.price))
-            if len(self.matched_trades) > 5:
-                self.matched_trades.pop(0)
-
-    async def _execute_market_sell_order(self, order):
-        while self.buy_orders and order.quantity > 0:
-            best_buy = self.buy_orders[0][1]  # Get the best buy order (highest price)
-            if best_buy.quantity <= order.quantity:
-                traded_quantity = best_buy.quantity
-                heapq.heappop(self.buy_orders)  # Remove the buy order
-                order.quantity -= traded_quantity
-            else:
-                traded_quantity = order.quantity
-                best_buy.quantity -= traded_quantity
-                order.quantity = 0
-
-            self.matched_trades.append((traded_quantity, best_buy.price))
-            if len(self.matched_trades) > 5:
-                self.matched_trades.pop(0)
-
-    def update_best_avg_price(self):
-        if self.buy_orders and self.sell_orders:
-            best_buy = -self.buy_orders[0][0]  # Remember the price is negated in the buy heap
-            best_sell = self.sell_orders[0][0]
-            self.best_avg_price = (best_buy + best_sell) / 2
-        else:
-            self.best_avg_price = None
-
-    async def match_orders(self):
-        async with self.lock:
-            while self.buy_orders and self.sell_orders:
-                highest_buy = heapq.heappop(self.buy_orders)[1]
-                lowest_sell = heapq.heappop(self.sell_orders)[1]
-
-                if highest_buy.price >= lowest_sell.price:
-                    traded_quantity = min(highest_buy.quantity, lowest_sell.quantity)
-                    highest_buy.quantity -= traded_quantity
-                    lowest_sell.quantity -= traded_quantity
-                    self.matched_trades.append((traded_quantity, lowest_sell.price))
-                    if len(self.matched_trades) > 5:
-                        self.matched_trades.pop(0)
-
-                    if highest_buy.quantity > 0:
-                        heapq.heappush(self.buy_orders, (-highest_buy.price, highest_buy))
-                    if lowest_sell.quantity > 0:
-                        heapq.heappush(self.sell_orders, (lowest_sell.price, lowest_sell))
-                else:
-                    heapq.heappush(self.buy_orders, (-highest_buy.price, highest_buy))
-                    heapq.heappush(self.sell_orders, (lowest_sell.price, lowest_sell))
-                    break
-
-            self.update_best_avg_price()
-
+            str: the ticker symbol the request is tagged with
+        """
+        if ticker_symbol and ticker_symbol not in self.registry:
+            ticker_symbol = UNKNOWN_SYMBOL
+        current_request.set((rpc, ticker_symbol))
+        return ticker_symbol
 
+    def _start_request(self, rpc, ticker_symbol):
+        """
+        Tag the current task with the request being served and start its stage timer.
+        """
+        return self.stats.timer(rpc, self._tag_request(rpc, ticker_symbol))
 
-class TickerServiceServicer(ticker_service_pb2_grpc.TickerServiceServicer):
-    def __init__(self):
-        self.order_books = {ticker.symbol: OrderBook(ticker.symbol, ticker.name) for ticker in TICKERS}
-        self.clients = []  # Store tuples of (queue, ticker_symbol) for each connected client
-        self.submission_locks = {}  # To track rate-limiting by client
-        self.rate_limit_duration = 0.5  # Time limit between submissions (in seconds)
+    async def _get_order_book(self, ticker_symbol, context):
+        try:
+            return self.registry.get_order_book(ticker_symbol)
+        except KeyError:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown ticker: {ticker_symbol}")
 
     async def GetTickers(self, request, context):
-        response = ticker_service_pb2.TickerResponse()
-        if request.ticker_symbol:
-            filtered_tickers = [ticker for ticker in TICKERS if ticker.symbol == request.ticker_symbol]
-            response.tickers.extend(filtered_tickers)
-        else:
-            response.tickers.extend(TICKERS)
-        return response
+        return ticker_service_pb2.TickerResponse.FromString(await self.get_tickers_serialized(request, context))
+
+    async def get_tickers_serialized(self, request, context):
+        """
+        GetTickers returning the registry's cached, already serialized response.
+        serve() registers this in place of GetTickers to skip building and
+        serializing the message on every call.
+        """
+        self._tag_request("GetTickers", request.ticker_symbol)
+        if request.page_size < 0 or request.page_size > MAX_TICKERS_PAGE_SIZE:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"page_size must be between 0 and {MAX_TICKERS_PAGE_SIZE}")
+        return self.registry.get_tickers_response(
+            request.ticker_symbol, request.prefix, request.page_size, request.page_token)
+
+    async def _check_admin(self, context):
+        """
+        Admin RPCs change the server for every client, so they are only served to the identities given with --admin
+        (by default the local host).
+        """
+        identity = client_identity(context, self.trust_client_id, per_connection=False)
+        if identity not in self.admins:
+            await context.abort(grpc.StatusCode.PERMISSION_DENIED, f"{identity} is not an admin client")
+
+    async def _check_accepting(self, context):
+        if self.standby is not None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Standby server, it accepts no changes until promoted")
+
+    def _replicate(self, **command):
+        """
+        Append a command to the replication log, if this is a primary.
+        Returns:
+            int: its sequence number, 0 without replication
+        """
+        if self.replication_log is None:
+            return 0
+        return self.replication_log.append(**command)
+
+    async def _wait_for_standby(self, sequence):
+        if sequence:
+            await self.replication_log.wait_for_ack(sequence)
+
+    def _replicate_order(self, order, quantity):
+        if self.replication_log is None:
+            return 0
+        return self.replication_log.append(order=ticker_service_pb2.ReplicatedOrder(
+            order_id=order.order_id,
+            ticker_symbol=order.symbol,
+            client_id=order.client_id,
+            side=order.order_type,
+            price=order.price or 0,
+            quantity=quantity,
+            time_in_force=order.time_in_force,
+            stop_price=order.stop_price or 0,
+            expire_time_ns=order.received_wall_ns + order.expire_ns - order.received_ns if order.expire_ns else 0,
+            receive_time_ns=order.received_wall_ns,
+            client_send_time_ns=order.client_send_time_ns,
+        ))
+
+    async def AddTickers(self, request, context):
+        await self._check_admin(context)
+        await self._check_accepting(context)
+        if self.shm_feed is not None:
+            unpublishable = self.shm_feed.check_symbols(ticker.symbol for ticker in request.tickers)
+            if unpublishable:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                    f"The shared memory feed cannot publish: {', '.join(unpublishable)}")
+        added, updated = self.add_tickers(request)
+        sequence = self._replicate(add_tickers=request)
+        await self._wait_for_standby(sequence)
+        return ticker_service_pb2.TickerAdminResponse(added=added, updated=updated, total=len(self.registry))
+
+    def add_tickers(self, request):
+        added, updated = self.registry.add_tickers(request.tickers)
+        print(f"Tickers added: {added}, updated: {updated}, total: {len(self.registry)}")
+        if self.shm_feed is not None and len(self.registry) > self.shm_feed.max_symbols:
+            print(f"Warning: {len(self.registry)} tickers, the shared memory feed only has room for "
+                  f"{self.shm_feed.max_symbols} (--shm-max-symbols)")
+        return added, updated
+
+    async def RetireTickers(self, request, context):
+        await self._check_admin(context)
+        await self._check_accepting(context)
+        retired, refused = self.retire_tickers(request)
+        sequence = self._replicate(retire_tickers=request)
+        await self._wait_for_standby(sequence)
+        return ticker_service_pb2.TickerAdminResponse(
+            retired=retired, refused=refused, total=len(self.registry))
+
+    def retire_tickers(self, request):
+        if request.force:
+            # Cancel the live orders of the books first, like any cancel: their owners get an order update,
+            # exposure is released and subscribers see the deletes and a last, empty market data update
+            for symbol in request.symbols:
+                order_book = self.registry.order_books.get(symbol)
+                if order_book is None or order_book.is_empty():
+                    continue
+                for order in order_book.cancel_orders(list(order_book.orders)):
+                    self.publish_order_update(order, order.cancelled_quantity)
+                self.publish_market_data(order_book)
+        retired, refused = self.registry.retire_tickers(request.symbols, request.force)
+        print(f"Tickers retired: {len(retired)}, refused: {len(refused)}, total: {len(self.registry)}")
+        return retired, refused
 
     async def ConnectToMarketData(self, request, context):
         """
         Handles client connection for a specific ticker's market data.
-        The client subscribes to updates for the requested ticker_symbol.
+        The client subscribes to updates for the requested ticker_symbol,
+        filtered by the request's options.
         """
         ticker_symbol = request.ticker_symbol
+        self._tag_request("ConnectToMarketData", ticker_symbol)
+        if ticker_symbol not in self.registry:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown ticker: {ticker_symbol}")
         print(f"Subscriber connected for ticker: {ticker_symbol}")
 
-        queue = asyncio.Queue()
-        self.clients.append((queue, ticker_symbol))  # Store both the queue and the subscribed ticker symbol
+        subscription = MarketDataSubscription(request.options)
+        self.subscriptions.subscribe(subscription, [ticker_symbol])
+        try:
+            while True:
+                for market_data in await subscription.next_updates():
+                    yield market_data
+        finally:
+            self.subscriptions.unsubscribe(subscription, [ticker_symbol])
 
+    async def SubscribeMarketData(self, request, context):
+        """
+        Streams the market data of several tickers over one stream, in batches
+        of the updates published since the previous batch.
+        """
+        current_request.set(("SubscribeMarketData", ""))
+        subscription = MarketDataSubscription(request.options)
         try:
+            await self._subscribe(subscription, request.ticker_symbols, context)
             while True:
-                market_data = await queue.get()
-                yield market_data
-        except asyncio.CancelledError:
-            self.clients.remove((queue, ticker_symbol))
-            raise
+                yield await subscription.next_batch()
+        finally:
+            self.subscriptions.unsubscribe(subscription, list(subscription.symbols))
 
-    async def broadcast_market_data(self, ticker_symbol):
+    async def ManageMarketDataSubscription(self, request_iterator, context):
         """
-        Broadcasts market data updates to clients subscribed to the specific ticker_symbol.
+        Like SubscribeMarketData, with tickers added and removed by the client's
+        SubscriptionChange messages while the stream is open.
+        """
+        current_request.set(("ManageMarketDataSubscription", ""))
+        subscription = MarketDataSubscription()
+
+        async def apply_changes():
+            try:
+                async for change in request_iterator:
+                    unknown = [symbol for symbol in change.subscribe if symbol not in self.registry]
+                    if unknown:
+                        subscription.close(grpc.StatusCode.NOT_FOUND, f"Unknown tickers: {', '.join(unknown)}")
+                        return
+                    if change.HasField("options"):
+                        subscription.set_options(change.options)
+                    self.subscriptions.unsubscribe(subscription, change.unsubscribe)
+                    self._send_latest(subscription, self.subscriptions.subscribe(subscription, change.subscribe))
+            except Exception as e:
+                # The task is never awaited, so its failure ends the stream instead of being lost
+                print(f"Subscription changes failed: {e!r}")
+                subscription.close(grpc.StatusCode.INTERNAL, f"Subscription change failed: {e}")
+
+        changes_task = asyncio.create_task(apply_changes())
+        try:
+            while True:
+                batch = await subscription.next_batch()
+                if batch is None:
+                    await context.abort(*subscription.error)
+                yield batch
+        finally:
+            changes_task.cancel()
+            self.subscriptions.unsubscribe(subscription, list(subscription.symbols))
+
+    async def _subscribe(self, subscription, symbols, context):
+        unknown = [symbol for symbol in symbols if symbol not in self.registry]
+        if unknown:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown tickers: {', '.join(unknown)}")
+        self._send_latest(subscription, self.subscriptions.subscribe(subscription, symbols))
+
+    def _send_latest(self, subscription, symbols):
+        """
+        Queue the latest update of newly subscribed tickers, so the client starts from the current state.
+        """
+        for symbol in symbols:
+            order_book = self.registry.order_books.get(symbol)
+            if order_book is not None and order_book.last_market_data is not None:
+                subscription.push(order_book.last_market_data)
+
+    async def GetMarketData(self, request, context):
+        """
+        Returns the latest market data update published for a ticker, or an empty
+        one (sequence 0) if nothing was published since its book was created.
+        """
+        order_book = await self._get_order_book(request.ticker_symbol, context)
+        if order_book.last_market_data is None:
+            return ticker_service_pb2.MarketData(ticker_symbol=request.ticker_symbol)
+        return order_book.last_market_data
+
+    async def _depth_request(self, request, context):
+        """
+        Validate a DepthRequest and apply its compression to the responses.
+        Returns:
+            tuple: (order_book, levels)
+        """
+        levels = request.levels or DEFAULT_DEPTH_LEVELS
+        if not 0 < levels <= MAX_DEPTH_LEVELS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"levels must be between 1 and {MAX_DEPTH_LEVELS}")
+        if request.compression not in DEPTH_COMPRESSION:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unsupported compression: {request.compression}")
+        order_book = await self._get_order_book(request.ticker_symbol, context)
+        if DEPTH_COMPRESSION[request.compression] is not None:
+            context.set_compression(DEPTH_COMPRESSION[request.compression])
+        return order_book, levels
+
+    async def GetMarketDepth(self, request, context):
+        """
+        Returns the top levels of a ticker's book from its latest depth snapshot.
+        """
+        order_book, levels = await self._depth_request(request, context)
+        return encode_depth(order_book.snapshot, levels, self.tick_size, time.time_ns())
+
+    async def ConnectToMarketDepth(self, request, context):
+        """
+        Streams the depth of a ticker's book, starting with the current depth and
+        then after every market data update. Depth messages are full snapshots,
+        so a client that falls behind skips straight to the latest one.
+        """
+        self._tag_request("ConnectToMarketDepth", request.ticker_symbol)
+        order_book, levels = await self._depth_request(request, context)
+        subscription = DepthSubscription(request.ticker_symbol, levels)
+        subscription.push(encode_depth(order_book.snapshot, levels, self.tick_size, time.time_ns()))
+        self.subscriptions.add_depth(subscription)
+        try:
+            while True:
+                yield await subscription.next_depth()
+        finally:
+            self.subscriptions.remove_depth(subscription)
+
+    def publish_depth(self, ticker_symbol, snapshot):
+        """
+        Sends the depth to the depth streams of a ticker, encoding it once per number of levels requested.
+        """
+        subscriptions = self.subscriptions.depth_by_symbol.get(ticker_symbol)
+        if not subscriptions:
+            return
+        encoded = {}  # levels -> MarketDepth
+        publish_time_ns = time.time_ns()
+        for subscription in subscriptions:
+            depth = encoded.get(subscription.levels)
+            if depth is None:
+                depth = encoded[subscription.levels] = encode_depth(
+                    snapshot, subscription.levels, self.tick_size, publish_time_ns)
+            subscription.push(depth)
+
+    async def ConnectToOrderBookEvents(self, request, context):
+        """
+        Streams every change of the orders resting in a ticker's book. The book
+        only generates events while it has subscribers. To build the book, open
+        the stream first, then apply the events that follow the sequence of a
+        GetOrderBookSnapshot.
+        """
+        ticker_symbol = request.ticker_symbol
+        self._tag_request("ConnectToOrderBookEvents", ticker_symbol)
+        order_book = await self._get_order_book(ticker_symbol, context)
+        subscription = OrderBookEventSubscription(ticker_symbol, MAX_PENDING_BOOK_EVENTS)
+        if self.subscriptions.add_events(subscription):
+            order_book.book_event_listeners.append(self.publish_book_event)
+        try:
+            while True:
+                batch = await subscription.next_batch()
+                if batch is None:
+                    await context.abort(*subscription.error)
+                yield batch
+        finally:
+            if self.subscriptions.remove_events(subscription):
+                order_book = self.registry.order_books.get(ticker_symbol)
+                if order_book is not None and self.publish_book_event in order_book.book_event_listeners:
+                    order_book.book_event_listeners.remove(self.publish_book_event)
+
+    def publish_book_event(self, sequence, event, order, quantity, price):
+        """
+        Sends a book event to the book event streams of the order's ticker.
+        """
+        subscriptions = self.subscriptions.events_by_symbol.get(order.symbol)
+        if not subscriptions:
+            return
+        book_event = ticker_service_pb2.OrderBookEvent(
+            sequence=sequence,
+            type=event,
+            order_id=str(order.order_id),
+            side=order.order_type,
+            price=order.price,
+            quantity=quantity,
+            remaining_quantity=order.quantity,
+            trade_price=price if event == "execute" else 0,
+        )
+        for subscription in subscriptions:
+            subscription.push(book_event)
+
+    async def GetOrderBookSnapshot(self, request, context):
+        """
+        Returns the orders resting in a ticker's book, with the sequence number of
+        the latest book event they include. Built without yielding to the event
+        loop, so no event can slip in between.
+        """
+        order_book = await self._get_order_book(request.ticker_symbol, context)
+        return ticker_service_pb2.OrderBookSnapshot(
+            ticker_symbol=request.ticker_symbol,
+            sequence=order_book.book_event_sequence,
+            bids=self._resting_orders(order_book.bids),
+            asks=self._resting_orders(order_book.asks),
+        )
+
+    @staticmethod
+    def _resting_orders(side):
+        return [ticker_service_pb2.RestingOrder(order_id=str(order.order_id), price=order.price, quantity=order.quantity)
+                for level in side.iter_levels() for order in level.orders if order.quantity]
+
+    async def ConnectToOrderUpdates(self, request, context):
+        """
+        Streams cancels and expiries of the orders of the calling client.
+        With cancel_on_disconnect, all of the client's orders are cancelled when the stream ends.
         """
-        order_book = self.order_books[ticker_symbol]
-        bidOrders, askOrders = await order_book.get_top_orders(1)
+        client_id = client_identity(context, self.trust_client_id)
+        current_request.set(("ConnectToOrderUpdates", ""))
+        print(f"Order update stream connected for client: {client_id}")
+
+        subscription = OrderUpdateSubscription(client_id, MAX_PENDING_ORDER_UPDATES)
+        self.order_update_streams.setdefault(client_id, []).append(subscription)
+        try:
+            while True:
+                order_updates = await subscription.next_updates()
+                if order_updates is None:
+                    await context.abort(*subscription.error)
+                for order_update in order_updates:
+                    yield order_update
+        finally:
+            subscriptions = self.order_update_streams[client_id]
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self.order_update_streams[client_id]
+            if request.cancel_on_disconnect and self.standby is not None:
+                print(f"Order update stream of {client_id} disconnected, its orders stay: standby")
+            elif request.cancel_on_disconnect:
+                print(f"Order update stream of {client_id} disconnected, cancelling its orders")
+                task = asyncio.create_task(self.cancel_orders(self.order_index.select(client_id)))
+                self.disconnect_tasks.add(task)
+                task.add_done_callback(self.disconnect_tasks.discard)
 
-        if len(bidOrders) == 0 or len(askOrders) == 0:
+    def publish_order_update(self, order, quantity):
+        """
+        Sends an OrderUpdate to the order update streams of the order's owner, if any.
+        """
+        subscriptions = self.order_update_streams.get(order.client_id)
+        if not subscriptions:
             return
+        order_update = ticker_service_pb2.OrderUpdate(
+            order_id=str(order.order_id),
+            ticker_symbol=order.symbol,
+            side=order.order_type,
+            price=order.price or 0,
+            status=order.status,
+            cancelled_quantity=quantity,
+            filled_quantity=order.filled_quantity,
+            time_ns=time.time_ns(),
+        )
+        for subscription in subscriptions:
+            subscription.push(order_update)
 
+    async def broadcast_market_data(self, ticker_symbol, timer=NULL_TIMER, order=None):
+        """
+        Broadcasts market data updates to clients subscribed to the specific ticker_symbol.
+        The update carries the timestamps of the order that triggered it, if given.
+        """
+        self.publish_market_data(self.registry.get_order_book(ticker_symbol), timer, order)
+
+    def publish_market_data(self, order_book, timer=NULL_TIMER, order=None):
+        """
+        broadcast_market_data for a given book, also one that is no longer in the registry.
+        """
+        ticker_symbol = order_book.symbol
+        # The latest published snapshot is immutable, so it is read without the book's lock
+        snapshot = order_book.snapshot
+        bid_levels, ask_levels = snapshot.bids(1), snapshot.asks(1)
+        timer.mark("top_of_book")
+
+        # Quantities are aggregated over all orders at the best price, an empty side is sent as 0
         market_data = ticker_service_pb2.MarketData(
             ticker_symbol=ticker_symbol,
-            best_bid_price=bidOrders[0][1].price if bidOrders else 0,
-            best_ask_price=askOrders[0][1].price if askOrders else 0,
-            best_bid_quantity=bidOrders[0][1].quantity if bidOrders else 0,
-            best_ask_quantity=askOrders[0][1].quantity if askOrders else 0,
+            best_bid_price=bid_levels[0][0] if bid_levels else 0,
+            best_ask_price=ask_levels[0][0] if ask_levels else 0,
+            best_bid_quantity=bid_levels[0][1] if bid_levels else 0,
+            best_ask_quantity=ask_levels[0][1] if ask_levels else 0,
         )
+        if order is not None:
+            market_data.order_receive_time_ns = order.received_wall_ns
+            market_data.order_receive_monotonic_ns = order.received_ns
+            market_data.match_time_ns = order.match_wall_ns
+            market_data.match_monotonic_ns = order.match_ns
+            market_data.client_send_time_ns = order.client_send_time_ns
+        order_book.market_data_sequence += 1
+        market_data.sequence = order_book.market_data_sequence
+        market_data.snapshot_version = snapshot.version
+        market_data.publish_time_ns = time.time_ns()
+        market_data.publish_monotonic_ns = time.monotonic_ns()
+        order_book.last_market_data = market_data
+        if self.tick_archive is not None:
+            self.tick_archive.record_quote(market_data)
 
-        # Only broadcast to clients who subscribed to this specific ticker symbol
-        for client_queue, subscribed_ticker_symbol in self.clients:
-            if subscribed_ticker_symbol == ticker_symbol:
-                try:
-                    await client_queue.put(market_data)
-                except asyncio.QueueFull:
-                    # Handle clients unable to keep up with updates
-                    self.clients.remove((client_queue, subscribed_ticker_symbol))
+        # Only to the streams subscribed to this ticker, filtered by their options
+        self.subscriptions.publish(market_data)
+        self.publish_depth(ticker_symbol, snapshot)
+        timer.mark("broadcast")
+
+    @staticmethod
+    def _order_response(order):
+        return ticker_service_pb2.OrderResponse(
+            order_id=str(order.order_id),
+            receive_time_ns=order.received_wall_ns,
+            receive_monotonic_ns=order.received_ns,
+            match_time_ns=order.match_wall_ns,
+            match_monotonic_ns=order.match_ns,
+            response_time_ns=time.time_ns(),
+            response_monotonic_ns=time.monotonic_ns(),
+            client_send_time_ns=order.client_send_time_ns,
+            status=order.status,
+            filled_quantity=order.filled_quantity,
+            average_price=order.average_price,
+            levels_swept=order.levels_swept,
+            remaining_quantity=order.quantity,
+            cancelled_quantity=order.cancelled_quantity,
+        )
 
     async def SubmitLimitOrder(self, request, context):
-        # Rate limiting for client requests
-        client_id = str(context.peer())
-        last_submission = self.submission_locks.get(client_id, 0)
-        current_time = time.time()
+        received_ns = time.monotonic_ns()
+        received_wall_ns = time.time_ns()
+        timer = self._start_request("SubmitLimitOrder", request.ticker_symbol)
+        await self._check_accepting(context)
 
-        if current_time - last_submission < self.rate_limit_duration:
-            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Rate limit exceeded")
+        # Rate limiting for client requests, per host for clients without an identity; their orders belong to the connection
+        client_id = client_identity(context, self.trust_client_id)
+        if not self.rate_limiter.allow("SubmitLimitOrder", client_identity(context, self.trust_client_id, False)):
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Rate limit exceeded")
+        timer.mark("rate_limit")
 
-        self.submission_locks[client_id] = current_time
+        time_in_force = request.time_in_force or "GTC"
+        if time_in_force not in TIME_IN_FORCE:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown time in force: {time_in_force}")
+        expire_ns = await self._expire_ns(request, received_ns, received_wall_ns, context)
 
-        order_id_code = await self.order_books[request.ticker_symbol].add_limit_order(
-            request.side, request.price, request.quantity)
+        order_book = await self._get_order_book(request.ticker_symbol, context)
+        if order_book.auction_mode and time_in_force in ("IOC", "FOK"):
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "IOC and FOK orders are not accepted during an auction")
+        reject_reason = self.risk_gate.check_order(
+            client_id, request.ticker_symbol, request.side, request.quantity, request.price, order_book.best_avg_price)
+        if reject_reason:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, reject_reason)
+        timer.mark("risk_check")
 
-        await self.order_books[request.ticker_symbol].match_orders()
-     
-        # Trigger market data broadcast upon a new order
-        await self.broadcast_market_data(request.ticker_symbol)
+        # Matching happens as part of adding the order, only a GTC, GTT or DAY remainder rests
+        order = await order_book.add_limit_order(
+            request.side, request.price, request.quantity, timer,
+            received_ns, received_wall_ns, request.client_send_time_ns, client_id,
+            time_in_force, request.stop_price or None, expire_ns)
+        sequence = self._replicate_order(order, request.quantity)
+        if order.status in ("resting", "pending"):
+            self.order_index.add(order)
+            if expire_ns:
+                self.expiry_wheel.schedule(expire_ns, order)
+
+        # Trigger market data broadcast upon a new order; during an auction only the uncross publishes
+        if not order_book.auction_mode:
+            await self.broadcast_market_data(request.ticker_symbol, timer, order)
+        await self._wait_for_standby(sequence)
+        timer.finish()
 
-        return ticker_service_pb2.OrderResponse(order_id=str(order_id_code))
+        return self._order_response(order)
 
     async def SubmitMarketOrder(self, request, context):
-        client_id = str(context.peer())
-        last_submission = self.submission_locks.get(client_id, 0)
-        current_time = time.time()
+        received_ns = time.monotonic_ns()
+        received_wall_ns = time.time_ns()
+        timer = self._start_request("SubmitMarketOrder", request.ticker_symbol)
+        await self._check_accepting(context)
 
-        if current_time - last_submission < self.rate_limit_duration:
-            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Rate limit exceeded")
+        client_id = client_identity(context, self.trust_client_id)
+        if not self.rate_limiter.allow("SubmitMarketOrder", client_identity(context, self.trust_client_id, False)):
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Rate limit exceeded")
+        timer.mark("rate_limit")
 
-        self.submission_locks[client_id] = current_time
+        time_in_force = request.time_in_force or "IOC"
+        if time_in_force not in ("IOC", "FOK"):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Market orders must be IOC or FOK")
 
-        order_id_code = await self.order_books[request.ticker_symbol].add_market_order(
-            request.side, request.quantity)
-        await self.order_books[request.ticker_symbol].match_orders()
+        order_book = await self._get_order_book(request.ticker_symbol, context)
+        if order_book.auction_mode:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Market orders are not accepted during an auction")
+        reject_reason = self.risk_gate.check_order(
+            client_id, request.ticker_symbol, request.side, request.quantity, None, order_book.best_avg_price)
+        if reject_reason:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, reject_reason)
+        timer.mark("risk_check")
+
+        order = await order_book.add_market_order(
+            request.side, request.quantity, timer,
+            received_ns, received_wall_ns, request.client_send_time_ns, client_id,
+            time_in_force, request.stop_price or None)
+        sequence = self._replicate_order(order, request.quantity)
+        if order.status == "pending":
+            self.order_index.add(order)  # Stop order waiting for its trigger
 
         # Trigger market data broadcast upon a new order
-        await self.broadcast_market_data(request.ticker_symbol)
+        await self.broadcast_market_data(request.ticker_symbol, timer, order)
+        await self._wait_for_standby(sequence)
+        timer.finish()
+
+        return self._order_response(order)
+
+    async def _expire_ns(self, request, received_ns, received_wall_ns, context):
+        """
+        Monotonic expiry deadline of a GTT or DAY limit order, 0 for other orders.
+        """
+        if request.time_in_force == "DAY":
+            if not self.session_end:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "DAY orders need a session end (--session-end)")
+            return next_session_end_ns(self.session_end)
+        if request.time_in_force != "GTT":
+            return 0
+        if request.ttl_ms > 0:
+            return received_ns + request.ttl_ms * 1_000_000
+        if request.expire_time_ns > received_wall_ns:
+            return received_ns + (request.expire_time_ns - received_wall_ns)
+        await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "GTT orders need a future expire_time_ns or a ttl_ms")
+
+    async def expire_orders_periodically(self):
+        """
+        Advances the expiry timer wheel every tick and removes the orders whose
+        deadline has passed, with one market data update per affected ticker.
+        """
+        tick = self.expiry_wheel.tick_ns / 1e9
+        while True:
+            await asyncio.sleep(tick)
+            expired = self.expiry_wheel.advance()
+            if not expired:
+                continue
+            if self.standby is not None:
+                # The primary expires orders through the log, the standby only those still live once promoted
+                self.standby.expired = [order for order in self.standby.expired + expired
+                                        if order.status in ("resting", "pending")]
+                continue
+
+            # Orders that filled or were cancelled before their deadline are skipped
+            await self.cancel_orders(expired, "expired")
+
+    async def cancel_orders(self, orders, status="cancelled"):
+        """
+        Cancels the given orders if they are still live, notifying their owners,
+        with one lock acquisition and one market data update per affected ticker.
+        Returns:
+            tuple: (cancelled_count, cancelled_quantity)
+        """
+        if self.standby is not None:
+            return 0, 0  # A standby's books only change through the primary's log
+        by_symbol = {}
+        for order in orders:
+            if order.status in ("resting", "pending"):
+                by_symbol.setdefault(order.symbol, []).append(order)
+
+        cancelled = cancelled_quantity = 0
+        for symbol, symbol_orders in by_symbol.items():
+            order_book = self.registry.order_books.get(symbol)
+            if order_book is None:
+                continue  # Retired with force, the orders are gone already
+            async with order_book.lock:
+                cancelled_ids = []
+                for order in order_book.cancel_orders([order.order_id for order in symbol_orders], status):
+                    cancelled += 1
+                    cancelled_quantity += order.cancelled_quantity
+                    cancelled_ids.append(order.order_id)
+                    self.publish_order_update(order, order.cancelled_quantity)
+                if cancelled_ids:
+                    self._replicate(cancel=ticker_service_pb2.ReplicatedCancel(
+                        ticker_symbol=symbol, order_ids=cancelled_ids, status=status))
+            await self.broadcast_market_data(symbol)
+        return cancelled, cancelled_quantity
+
+    async def MassCancel(self, request, context):
+        client_id = client_identity(context, self.trust_client_id)
+        self._tag_request("MassCancel", request.ticker_symbol)
+        await self._check_accepting(context)
+        if request.side not in ("", "buy", "sell"):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown order side: {request.side}")
+        cancelled, cancelled_quantity = await self.cancel_orders(
+            self.order_index.select(client_id, request.ticker_symbol, request.side))
+        await self._wait_for_standby(self.replication_log.sequence if self.replication_log else 0)
+        return ticker_service_pb2.MassCancelResponse(cancelled=cancelled, cancelled_quantity=cancelled_quantity)
+
+    async def SetTradingMode(self, request, context):
+        await self._check_admin(context)
+        await self._check_accepting(context)
+        if request.mode not in ("continuous", "auction"):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Unknown trading mode: {request.mode}")
+        if request.interval_ms < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "interval_ms must not be negative")
+        order_book = await self._get_order_book(request.ticker_symbol, context)
+        price, volume = await self.set_trading_mode(order_book, request.mode, request.interval_ms / 1000)
+        await self._wait_for_standby(self.replication_log.sequence if self.replication_log else 0)
+        return ticker_service_pb2.TradingModeResponse(mode=request.mode, clearing_price=price or 0, volume=volume)
+
+    async def set_trading_mode(self, order_book, mode, interval=0):
+        """
+        Switches a book between continuous matching and call auctions, uncrossed
+        every `interval` seconds (0 = only when switching back to continuous).
+        Returns:
+            tuple: (price, volume) of the uncross when leaving auction mode
+        """
+        symbol = order_book.symbol
+        task = self.auction_tasks.pop(symbol, None)
+        if task is not None:
+            task.cancel()
+        async with order_book.lock:
+            price, volume = order_book.set_auction_mode(mode == "auction")
+            self._replicate(trading_mode=ticker_service_pb2.TradingModeRequest(
+                ticker_symbol=symbol, mode=mode, interval_ms=int(interval * 1000)))
+        print(f"{symbol} switched to {mode} trading" + (f", uncrossed {volume} at {price}" if volume else ""))
+        if volume or mode == "continuous":  # Stops held back by the auction may have traded even without an uncross
+            await self.broadcast_market_data(symbol)
+        if mode == "auction" and interval > 0:
+            self.auction_tasks[symbol] = asyncio.create_task(self.run_auctions_periodically(order_book, interval))
+        return price, volume
+
+    async def run_auctions_periodically(self, order_book, interval):
+        """
+        Uncrosses the orders collected by a book in auction mode every `interval` seconds.
+        """
+        symbol = order_book.symbol
+        while True:
+            await asyncio.sleep(interval)
+            if self.registry.order_books.get(symbol) is not order_book:
+                self.auction_tasks.pop(symbol, None)
+                return  # Ticker retired
+            timer = self.stats.timer("Auction", symbol)
+            async with order_book.lock:
+                timer.mark("lock_wait")
+                price, volume = order_book.uncross()
+                if volume:
+                    self._replicate(uncross=ticker_service_pb2.TickerRequest(ticker_symbol=symbol))
+                timer.mark("uncross")
+            if volume:
+                await self.broadcast_market_data(symbol, timer)
+            timer.finish()
+
+    async def QueryTrades(self, request, context):
+        """
+        Streams the archived trades of a ticker in a time range, including the
+        ones not written to disk yet, in batches of packed columns.
+        """
+        self._tag_request("QueryTrades", request.ticker_symbol)
+        if self.tick_archive is None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "The server runs without a trade archive (--archive-dir)")
+        batch_size = request.batch_size or DEFAULT_TRADE_BATCH
+        if not 0 < batch_size <= MAX_TRADE_BATCH:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"batch_size must be between 1 and {MAX_TRADE_BATCH}")
+        end_ns = request.end_time_ns or 2**63 - 1
+
+        # The rows are fixed here, on the event loop; the batches are read and built in the archive's thread
+        batches = self._trade_batches(
+            request.ticker_symbol, self.tick_archive.query(request.ticker_symbol, "trades", request.start_time_ns, end_ns),
+            batch_size)
+        while True:
+            batch = await self.tick_archive.next_in_executor(batches)
+            if batch is None:
+                return
+            yield batch
+
+    @staticmethod
+    def _trade_batches(ticker_symbol, chunks, batch_size):
+        """
+        Pack the archived trade columns into TradeBatch messages of batch_size trades.
+        """
+        batch = ticker_service_pb2.TradeBatch(ticker_symbol=ticker_symbol)
+        for columns in chunks:
+            rows = len(columns["time_ns"])
+            start = 0
+            while start < rows:
+                end = min(start + batch_size - len(batch.time_ns), rows)
+                for name in ("time_ns", "price", "quantity", "buy_order_id", "sell_order_id"):
+                    getattr(batch, name).extend(columns[name][start:end].tolist())
+                start = end
+                if len(batch.time_ns) == batch_size:
+                    yield batch
+                    batch = ticker_service_pb2.TradeBatch(ticker_symbol=ticker_symbol)
+        if batch.time_ns:
+            yield batch
+
+    async def Replicate(self, request_iterator, context):
+        """
+        Streams the command log to a standby, see replication.py.
+        """
+        current_request.set(("Replicate", ""))
+        if self.replication_log is None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Not a replication primary")
+        async for batch in self.replication_log.stream(request_iterator, context):
+            yield batch
+
+    async def GetReplicationStatus(self, request, context):
+        if self.standby is not None:
+            return self.standby.status()
+        if self.replication_log is not None:
+            return self.replication_log.status()
+        return ticker_service_pb2.ReplicationStatus()
+
+    async def Promote(self, request, context):
+        """
+        Turns a standby into a primary: it stops following its primary and
+        accepts orders, with a replication log of its own that continues the
+        primary's sequence.
+        """
+        await self._check_admin(context)
+        if self.standby is None:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Not a standby")
+        if self.standby.diverged:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                                f"The standby's books diverged from the primary's: {self.standby.diverged}")
+        standby, self.standby = self.standby, None
+        self.replication_log = ReplicationLog(
+            standby.sync, standby.ack_timeout, first_sequence=standby.applied_sequence + 1, max_commands=standby.log_size)
+        await standby.promote()
+        return self.replication_log.status()
+
+    async def GetStats(self, request, context):
+        response = ticker_service_pb2.StatsResponse(
+            enabled=self.stats.enabled,
+            collection_duration_ns=time.monotonic_ns() - self.stats.started_ns,
+        )
+        for rpc, symbol, stage, histogram in self.stats.collect(request.rpc, request.ticker_symbol):
+            summary = histogram.summary()
+            percentiles = summary["percentiles"]
+            response.stages.add(
+                rpc=rpc,
+                ticker_symbol=symbol,
+                stage=stage,
+                count=summary["count"],
+                min_ns=summary["min"],
+                mean_ns=summary["mean"],
+                p50_ns=percentiles[50],
+                p90_ns=percentiles[90],
+                p99_ns=percentiles[99],
+                p999_ns=percentiles[99.9],
+                max_ns=summary["max"],
+            )
+        for slow_callback in self.loop_monitor.slow_callbacks:
+            response.slow_callbacks.add(
+                timestamp_ns=slow_callback.timestamp_ns,
+                duration_ns=slow_callback.duration_ns,
+                rpc=slow_callback.rpc,
+                ticker_symbol=slow_callback.ticker_symbol,
+                callback=slow_callback.callback,
+            )
+        if request.reset:
+            self.stats.reset()
+            self.loop_monitor.clear()
+        return response
+
+    async def Profile(self, request, context):
+        await self._check_admin(context)
+        if self.profiler.active:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "A profiling session is already running")
+        try:
+            result = await self.profiler.run(
+                mode=request.mode or "cprofile",
+                duration=(request.duration_ms or 1000) / 1000,
+                sample_interval=(request.sample_interval_us or 1000) / 1e6,
+                tracemalloc_top=request.tracemalloc_top,
+                top_functions=request.top_functions or 30,
+            )
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        return ticker_service_pb2.ProfileResponse(
+            pstats=result.pstats_data,
+            collapsed_stacks=result.collapsed_stacks,
+            summary=result.summary,
+            tracemalloc_top=result.tracemalloc_top,
+            duration_ns=result.duration_ns,
+            sample_count=result.sample_count,
+        )
 
-        return ticker_service_pb2.OrderResponse(order_id=str(order_id_code))
+    async def StopProfile(self, request, context):
+        await self._check_admin(context)
+        return ticker_service_pb2.StopProfileResponse(stopped=self.profiler.stop())
 
+    async def reclaim_idle_books_periodically(self, idle_seconds):
+        """
+        Frees the order books of tickers that have been empty and idle for `idle_seconds`.
+        """
+        while True:
+            await asyncio.sleep(max(idle_seconds / 4, 1))
+            if self.standby is not None:
+                continue  # Reclaims are not replicated, a standby keeps its books until promoted
+            keep = set(self.subscriptions.subscribed_symbols())
+            keep.update(symbol for symbol, order_book in self.registry.order_books.items() if order_book.auction_mode)
+            reclaimed = self.registry.reclaim_idle_books(idle_seconds, keep=keep)
+            if reclaimed:
+                print(f"Reclaimed {reclaimed} idle order books, {len(self.registry.order_books)} remain")
 
-async def serve():
+    async def dump_stats_periodically(self, interval):
+        """
+        Prints the per-rpc stage latencies every `interval` seconds.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats.dump())
+
+
+def cached_get_tickers_handler(ticker_service):
+    """
+    Handler for GetTickers that sends the bytes returned by get_tickers_serialized as-is.
+    It must be added before the generated handlers so it takes precedence.
+    """
+    return grpc.method_handlers_generic_handler("ticker_service.TickerService", {
+        "GetTickers": grpc.unary_unary_rpc_method_handler(
+            ticker_service.get_tickers_serialized,
+            request_deserializer=ticker_service_pb2.TickerRequest.FromString,
+        ),
+    })
+
+
+async def serve(port=50051, stats_enabled=True, stats_dump_interval=0, loop_monitor_enabled=True,
+                loop_monitor_interval=0.01, slow_callback_threshold=0.005, tickers_file="", book_idle_timeout=300,
+                rate_limits=DEFAULT_RATE_LIMITS, risk_limits=None, expiry_tick=0.01, session_end="", auctions=(),
+                shm_feed_name="", shm_depth=10, shm_max_symbols=0, tick_size=0.01,
+                replication="", primary="localhost:50051", replication_sync=False, replication_ack_timeout=1.0,
+                replication_log_size=1_000_000,
+                archive_dir="", archive_chunk_rows=65536, archive_compression="", archive_flush_interval=1.0,
+                trust_client_id=False, admins=LOCAL_ADMINS):
     server = grpc.aio.server()
-    ticker_service = TickerServiceServicer()
+    replication_log = ReplicationLog(replication_sync, replication_ack_timeout,
+                                     max_commands=replication_log_size) if replication == "primary" else None
+    tick_archive = TickArchive(archive_dir, archive_chunk_rows, archive_compression,
+                               archive_flush_interval) if archive_dir else None
+    ticker_service = TickerServiceServicer(stats_enabled, loop_monitor_interval, slow_callback_threshold,
+                                           rate_limits=rate_limits, risk_limits=risk_limits,
+                                           expiry_tick=expiry_tick, session_end=session_end,
+                                           tick_size=tick_size, replication_log=replication_log,
+                                           tick_archive=tick_archive, trust_client_id=trust_client_id,
+                                           admins=admins)
+    if tickers_file:
+        added, updated = ticker_service.registry.load_csv(tickers_file)
+        print(f"Loaded {added} tickers from {tickers_file}")
+    shm_feed = None
+    if shm_feed_name:
+        # Sized once the tickers are loaded, with room for the universe to double
+        shm_max_symbols = shm_max_symbols or max(1024, 2 * len(ticker_service.registry))
+        shm_feed = ticker_service.shm_feed = SharedMemoryFeed(shm_feed_name, shm_depth, shm_max_symbols)
+        for problem in shm_feed.check_symbols(ticker_service.registry.tickers):
+            print(f"Warning: the shared memory feed cannot publish {problem}")
+    server.add_generic_rpc_handlers((cached_get_tickers_handler(ticker_service),))
     ticker_service_pb2_grpc.add_TickerServiceServicer_to_server(ticker_service, server)
     
-    server.add_insecure_port('[::]:50051')
+    server.add_insecure_port(f'[::]:{port}')
     
     await server.start()
-    print("Server started on port 50051")
-    
-    await server.wait_for_termination()
+    print(f"Server started on port {port}")
+    if shm_feed is not None:
+        print(f"Publishing {shm_depth} levels of up to {shm_feed.max_symbols} tickers to shared memory '{shm_feed_name}'")
+    periodic_tasks = []  # Cancelled on shutdown
+    if tick_archive is not None:
+        periodic_tasks.append(asyncio.create_task(tick_archive.flush_periodically()))
+        print(f"Archiving trades and quotes to {archive_dir}")
+
+    if loop_monitor_enabled:
+        ticker_service.loop_monitor.start()
+    periodic_tasks.append(asyncio.create_task(ticker_service.expire_orders_periodically()))
+    if replication == "standby":
+        # Trading modes, like everything else, come from the primary
+        ticker_service.standby = Standby(ticker_service, primary, sync=replication_sync,
+                                         ack_timeout=replication_ack_timeout, log_size=replication_log_size)
+        ticker_service.standby.start()
+        print(f"Standby of {primary}, not accepting orders until promoted")
+    else:
+        for symbol, interval in auctions:
+            await ticker_service.set_trading_mode(ticker_service.registry.get_order_book(symbol), "auction", interval)
+    if book_idle_timeout > 0:
+        periodic_tasks.append(asyncio.create_task(ticker_service.reclaim_idle_books_periodically(book_idle_timeout)))
+
+    if stats_enabled and stats_dump_interval > 0:
+        periodic_tasks.append(asyncio.create_task(ticker_service.dump_stats_periodically(stats_dump_interval)))
+
+    # Shut down cleanly on Ctrl-C or SIGTERM: a cancelled wait_for_termination() also cancels the server's own
+    # shutdown, so stop() could not be awaited after it
+    stop_requested = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop_requested.set)
+    try:
+        await stop_requested.wait()
+    finally:
+        # No more orders once the server stops, then the rows buffered since the last periodic flush are written
+        await server.stop(1)
+        for task in periodic_tasks:
+            task.cancel()
+        await asyncio.gather(*periodic_tasks, return_exceptions=True)
+        ticker_service.loop_monitor.stop()
+        if tick_archive is not None:
+            tick_archive.flush()
+            tick_archive.close()
+        if shm_feed is not None:
+            shm_feed.close()
 
 
 if __name__ == '__main__':
-    asyncio.run(serve())
+    parser = argparse.ArgumentParser(description="Ticker service market server")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--disable-stats", action="store_true", help="Turn off per-stage latency instrumentation")
+    parser.add_argument("--stats-dump-interval", type=float, default=0, help="Print latency stats every N seconds (0 = never)")
+    parser.add_argument("--disable-loop-monitor", action="store_true", help="Turn off event loop lag and slow callback monitoring")
+    parser.add_argument("--loop-monitor-interval", type=float, default=10, help="Event loop lag sampling interval (ms)")
+    parser.add_argument("--slow-callback-threshold", type=float, default=5, help="Record callbacks running longer than this (ms)")
+    parser.add_argument("--tickers-file", default="", help="CSV file of 'symbol,name' rows to load at startup")
+    parser.add_argument("--book-idle-timeout", type=float, default=300, help="Reclaim empty order books idle for N seconds (0 = never)")
+    parser.add_argument("--rate-limit", action="append", default=[], metavar="RPC=RATE:BURST",
+                        help="Per-client limit for an RPC, e.g. SubmitLimitOrder=500:1000 (rate 0 = unlimited)")
+    parser.add_argument("--trust-client-id", action="store_true",
+                        help="Identify clients by their 'client-id' metadata, only behind a proxy that authenticates them")
+    parser.add_argument("--admin", action="append", default=[], metavar="IDENTITY",
+                        help="Client identity allowed to call the admin RPCs (ticker changes, trading modes, promotion, "
+                             "profiling), e.g. a certificate name or 'ipv4:10.0.0.5'; default: the local host")
+    parser.add_argument("--max-order-quantity", type=int, default=100000, help="Risk limit per order (0 = off)")
+    parser.add_argument("--max-order-notional", type=float, default=10000000, help="Risk limit per order (0 = off)")
+    parser.add_argument("--max-open-quantity", type=int, default=1000000, help="Resting quantity per client (0 = off)")
+    parser.add_argument("--max-open-notional", type=float, default=100000000, help="Resting notional per client (0 = off)")
+    parser.add_argument("--max-position", type=int, default=1000000, help="Worst case position per client and ticker (0 = off)")
+    parser.add_argument("--price-collar", type=float, default=0.2, help="Max limit price distance from mid, as a fraction (0 = off)")
+    parser.add_argument("--expiry-tick", type=float, default=10, help="Resolution of GTT and DAY order expiry (ms)")
+    parser.add_argument("--session-end", default="", metavar="HH:MM", help="Local time at which DAY orders expire")
+    parser.add_argument("--auction", action="append", default=[], metavar="SYMBOL=INTERVAL",
+                        help="Run a ticker in call auction mode, uncrossed every INTERVAL ms (0 = until switched to continuous)")
+    parser.add_argument("--shm-feed", default="", metavar="NAME",
+                        help="Also publish depth to this shared memory region for readers on the same host (see shm_feed.py)")
+    parser.add_argument("--shm-depth", type=int, default=10, help="Levels per side in the shared memory feed")
+    parser.add_argument("--shm-max-symbols", type=int, default=0,
+                        help="Tickers the shared memory feed has room for (0 = twice the tickers at startup, at least 1024)")
+    parser.add_argument("--tick-size", type=float, default=0.01, help="Price unit of MarketDepth messages")
+    parser.add_argument("--replication", choices=["primary", "standby"], default="",
+                        help="Stream the command log to standbys, or follow a primary as a hot standby")
+    parser.add_argument("--primary", default="localhost:50051", help="Server a standby replicates")
+    parser.add_argument("--replication-sync", action="store_true",
+                        help="Answer orders only once a standby has applied them")
+    parser.add_argument("--replication-ack-timeout", type=float, default=1000,
+                        help="Longest wait for a standby acknowledgement before answering anyway (ms)")
+    parser.add_argument("--replication-log-size", type=int, default=1000000,
+                        help="Commands the primary keeps for standbys to catch up from")
+    parser.add_argument("--archive-dir", default="", help="Archive trades and top-of-book changes to this directory")
+    parser.add_argument("--archive-chunk-rows", type=int, default=65536, help="Rows per archive chunk")
+    parser.add_argument("--archive-compression", choices=["", "zlib"], default="", help="Compress archive chunks")
+    parser.add_argument("--archive-flush-interval", type=float, default=1000,
+                        help="Write buffered archive rows at least this often (ms)")
+    args = parser.parse_args()
+    risk_limits = RiskLimits(args.max_order_quantity, args.max_order_notional, args.max_open_quantity,
+                             args.max_open_notional, args.max_position, args.price_collar)
+
+    asyncio.run(serve(args.port, not args.disable_stats, args.stats_dump_interval, not args.disable_loop_monitor,
+                      args.loop_monitor_interval / 1000, args.slow_callback_threshold / 1000,
+                      args.tickers_file, args.book_idle_timeout,
+                      parse_rate_limits(args.rate_limit, DEFAULT_RATE_LIMITS), risk_limits,
+                      args.expiry_tick / 1000, args.session_end,
+                      [(symbol, float(interval or 0) / 1000) for symbol, _, interval in
+                       (item.partition("=") for item in args.auction)],
+                      args.shm_feed, args.shm_depth, args.shm_max_symbols, args.tick_size,
+                      args.replication, args.primary, args.replication_sync, args.replication_ack_timeout / 1000,
+                      args.replication_log_size,
+                      args.archive_dir, args.archive_chunk_rows, args.archive_compression,
+                      args.archive_flush_interval / 1000, args.trust_client_id, args.admin or LOCAL_ADMINS))
@@ -0,0 +1,306 @@
+"""
+Shared-memory market data feed for processes on the same host.
+
+The server writes the top N depth levels of every ticker into a
+multiprocessing.shared_memory region, so co-located readers see every update
+by polling plain memory: no protobuf, no HTTP/2 and no syscalls per tick.
+
+Layout (little endian):
+    header      64 bytes: magic, layout version, depth, max symbols, symbol count
+    directory   max_symbols * 16 bytes: ASCII symbol of each slot, in order of first publication;
+                longer or non-ASCII symbols are not published
+    slots       max_symbols records of slot_dtype(depth), each padded to whole cache lines
+
+Every slot is guarded by a seqlock: the writer makes its sequence odd, writes
+the levels and makes it even again. A reader copies the slot and retries if
+the sequence was odd or changed meanwhile. This relies on stores becoming
+visible in program order, as they do on x86.
+
+Run as a script to print the updates of a ticker:
+    python shm_feed.py --name ticker_feed --symbol AAPL
+"""
+import argparse
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+FEED_MAGIC = 0x3144454546424F54  # b'TOBFEED1' read as a little endian integer
+LAYOUT_VERSION = 1
+HEADER_SIZE = 64
+SYMBOL_SIZE = 16
+HEADER_DTYPE = np.dtype([("magic", "<u8"), ("layout_version", "<u8"), ("depth", "<u8"),
+                         ("max_symbols", "<u8"), ("symbol_count", "<u8")])
+
+
+def symbol_error(symbol):
+    """
+    Check that a ticker symbol fits the feed directory.
+    Returns:
+        str: why the symbol cannot be published, "" if it can
+    """
+    try:
+        encoded = symbol.encode("ascii")
+    except UnicodeEncodeError:
+        return "not ASCII"
+    if len(encoded) > SYMBOL_SIZE:
+        return f"longer than {SYMBOL_SIZE} bytes"
+    if b"\0" in encoded:
+        return "contains a NUL byte"
+    return ""
+
+
+def slot_dtype(depth):
+    """
+    Record of one ticker: a seqlock sequence, snapshot metadata and the top
+    `depth` levels of each side, best first. Prices beyond the level counts are stale.
+    """
+    fields = [
+        ("sequence", "<u8"),  # Odd while the writer is updating the slot
+        ("snapshot_version", "<i8"),  # Version of the order book's DepthSnapshot
+        ("publish_ns", "<i8"),  # Monotonic time the snapshot was published
+        ("last_trade_price", "<f8"),  # NaN before the first trade
+        ("bid_count", "<i8"),
+        ("ask_count", "<i8"),
+        ("bid_price", "<f8", (depth,)),
+        ("bid_quantity", "<i8", (depth,)),
+        ("ask_price", "<f8", (depth,)),
+        ("ask_quantity", "<i8", (depth,)),
+    ]
+    size = np.dtype(fields).itemsize
+    return np.dtype({"names": [field[0] for field in fields],
+                     "formats": [np.dtype(field[1:]) if len(field) == 3 else field[1] for field in fields],
+                     "itemsize": -(-size // 64) * 64})
+
+
+def slots_offset(max_symbols):
+    return HEADER_SIZE + -(-max_symbols * SYMBOL_SIZE // 64) * 64
+
+
+def region_size(depth, max_symbols):
+    return slots_offset(max_symbols) + max_symbols * slot_dtype(depth).itemsize
+
+
+def _map_region(buffer, depth, max_symbols):
+    """
+    Get NumPy views of the header, directory and slots of a feed region.
+    Returns:
+        tuple: (header, directory, slots)
+    """
+    header = np.ndarray((), HEADER_DTYPE, buffer, 0)
+    directory = np.ndarray((max_symbols,), f"S{SYMBOL_SIZE}", buffer, HEADER_SIZE)
+    slots = np.ndarray((max_symbols,), slot_dtype(depth), buffer, slots_offset(max_symbols))
+    return header, directory, slots
+
+
+class SharedMemoryFeed:
+    """
+    Writer side of the feed. publish() is an OrderBook snapshot listener.
+    """
+
+    def __init__(self, name, depth=10, max_symbols=1024):
+        self.name = name
+        self.depth = depth
+        self.max_symbols = max_symbols
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=region_size(depth, max_symbols))
+        self.header, self.directory, self.slots = _map_region(self.shm.buf, depth, max_symbols)
+        self.slots["last_trade_price"] = np.nan
+        # publish() packs the slot with struct, which is several times faster than NumPy item assignment
+        self.slots_offset = slots_offset(max_symbols)
+        self.slot_size = self.slots.dtype.itemsize
+        self.sequence_struct = struct.Struct("<Q")
+        self.body_struct = struct.Struct(f"<qqdqq{depth}d{depth}q{depth}d{depth}q")  # Fields after the sequence
+        self.padding = (0,) * depth
+        self.sequences = []  # Current sequence of each slot
+        self.slot_indexes = {}  # symbol -> slot index
+        self.unpublished = {}  # symbol -> why it has no slot: it does not fit the directory or all slots are taken
+        self.header["depth"] = depth
+        self.header["max_symbols"] = max_symbols
+        self.header["layout_version"] = LAYOUT_VERSION
+        self.header["magic"] = FEED_MAGIC  # Last, readers treat the region as ready once it is set
+
+    def check_symbols(self, symbols):
+        """
+        Find the symbols the feed cannot publish, to report them before their books exist.
+        Returns:
+            list: "symbol: reason" descriptions
+        """
+        return [f"{symbol!r}: {reason}" for symbol in symbols for reason in (symbol_error(symbol),) if reason]
+
+    def _slot_index(self, symbol):
+        index = self.slot_indexes.get(symbol)
+        if index is None:
+            if symbol in self.unpublished:
+                return None
+            index = len(self.slot_indexes)
+            # Runs in a snapshot listener, after the book changed, so a ticker that does not fit is skipped, not raised
+            reason = symbol_error(symbol) or (f"all {self.max_symbols} slots taken" if index == self.max_symbols else "")
+            if reason:
+                self.unpublished[symbol] = reason
+                print(f"Shared memory feed: not publishing {symbol!r}, {reason} "
+                      f"({len(self.unpublished)} tickers unpublished)")
+                return None
+            self.directory[index] = symbol.encode("ascii")
+            self.slot_indexes[symbol] = index
+            self.sequences.append(0)
+            self.header["symbol_count"] = index + 1  # After the name, so readers never see an empty entry
+        return index
+
+    def publish(self, snapshot):
+        """
+        Write the top levels of a DepthSnapshot into its ticker's slot.
+        Tickers beyond max_symbols or whose symbol does not fit the directory
+        are not published, see unpublished.
+        """
+        index = self._slot_index(snapshot.symbol)
+        if index is None:
+            return
+        bid_prices, bid_quantities, ask_prices, ask_quantities = snapshot.columns(self.depth)
+        bid_padding = self.padding[len(bid_prices):]
+        ask_padding = self.padding[len(ask_prices):]
+        last_trade_price = np.nan if snapshot.last_trade_price is None else snapshot.last_trade_price
+
+        buffer = self.shm.buf
+        offset = self.slots_offset + index * self.slot_size
+        sequence = self.sequences[index]
+        self.sequence_struct.pack_into(buffer, offset, sequence + 1)
+        self.body_struct.pack_into(
+            buffer, offset + 8, snapshot.version, snapshot.published_ns, last_trade_price,
+            len(bid_prices), len(ask_prices), *bid_prices, *bid_padding, *bid_quantities, *bid_padding,
+            *ask_prices, *ask_padding, *ask_quantities, *ask_padding)
+        self.sequence_struct.pack_into(buffer, offset, sequence + 2)
+        self.sequences[index] = sequence + 2
+
+    def close(self, unlink=True):
+        # Drop the views before closing, the mapping cannot be released while they exist
+        self.header = self.directory = self.slots = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class SharedMemoryReader:
+    """
+    Reader side of the feed, for any number of processes on the same host.
+
+    view() gives live zero-copy views of a ticker's slot; read() copies it
+    consistently, by default into one reusable buffer per ticker, so polling
+    allocates nothing:
+
+        reader = SharedMemoryReader("ticker_feed")
+        book = reader.read("AAPL")
+        book["bid_price"][:book["bid_count"]]
+    """
+
+    def __init__(self, name):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the region, and it would be unlinked when this process exits
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        header = np.ndarray((), HEADER_DTYPE, self.shm.buf, 0)
+        if header["magic"] != FEED_MAGIC or header["layout_version"] != LAYOUT_VERSION:
+            raise ValueError(f"{name} is not a market data feed of layout version {LAYOUT_VERSION}")
+        self.depth = int(header["depth"])
+        self.header, self.directory, self.slots = _map_region(self.shm.buf, self.depth, int(header["max_symbols"]))
+        self.sequences = self.slots["sequence"]
+        self.slot_indexes = {}  # symbol -> slot index
+        self.buffers = {}  # symbol -> reusable record for read()
+
+    def symbols(self):
+        return [symbol.decode("ascii") for symbol in self.directory[:int(self.header["symbol_count"])]]
+
+    def slot_index(self, symbol):
+        """
+        Get the slot of a ticker, looking it up in the directory the first time.
+        Raises:
+            KeyError: if the ticker was not published yet
+        """
+        index = self.slot_indexes.get(symbol)
+        if index is None:
+            self.slot_indexes = {symbol: index for index, symbol in enumerate(self.symbols())}
+            index = self.slot_indexes[symbol]
+        return index
+
+    def sequence(self, symbol):
+        """
+        Current seqlock sequence of a ticker, increases by two with every update.
+        Cheap enough to busy-poll for changes.
+        """
+        return int(self.sequences[self.slot_index(symbol)])
+
+    def view(self, symbol):
+        """
+        Get a zero-copy record view of a ticker's slot. The writer may change it
+        at any time: a value read from it is consistent only if the sequence was
+        even before the read and unchanged after it.
+        """
+        index = self.slot_index(symbol)
+        return self.slots[index:index + 1].reshape(())
+
+    def read(self, symbol, out=None, max_attempts=100000):
+        """
+        Copy a consistent version of a ticker's slot.
+        Returns:
+            numpy.ndarray: the record, `out` or the ticker's reusable buffer if not given
+        Raises:
+            TimeoutError: if the writer kept the slot busy for max_attempts attempts
+        """
+        index = self.slot_index(symbol)
+        if out is None:
+            out = self.buffers.get(symbol)
+            if out is None:
+                out = self.buffers[symbol] = np.zeros((), self.slots.dtype)
+        sequences = self.sequences
+        slots = self.slots
+        for _ in range(max_attempts):
+            sequence = sequences[index]
+            if sequence & 1:
+                continue
+            out[...] = slots[index]
+            if sequences[index] == sequence:
+                return out
+        raise TimeoutError(f"Slot of {symbol} stayed busy for {max_attempts} attempts")
+
+    def close(self):
+        self.header = self.directory = self.slots = self.sequences = None
+        self.buffers.clear()
+        self.shm.close()
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Print the updates of a ticker from the shared-memory feed")
+    parser.add_argument("--name", default="ticker_feed", help="Name of the shared memory region")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--levels", type=int, default=3)
+    args = parser.parse_args()
+
+    reader = SharedMemoryReader(args.name)
+    last_sequence = -1
+    try:
+        while True:
+            try:
+                sequence = reader.sequence(args.symbol)
+            except KeyError:
+                time.sleep(0.1)  # Not published yet
+                continue
+            if sequence == last_sequence or sequence & 1:
+                continue  # Busy poll
+            book = reader.read(args.symbol)
+            last_sequence = int(book["sequence"])
+            age_us = (time.monotonic_ns() - int(book["publish_ns"])) / 1e3
+            bids = list(zip(book["bid_price"][:min(book["bid_count"], args.levels)],
+                            book["bid_quantity"][:min(book["bid_count"], args.levels)]))
+            asks = list(zip(book["ask_price"][:min(book["ask_count"], args.levels)],
+                            book["ask_quantity"][:min(book["ask_count"], args.levels)]))
+            print(f"v{book['snapshot_version']} bids {bids} asks {asks} last {book['last_trade_price']} ({age_us:.1f} us old)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    run()
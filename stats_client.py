@@ -0,0 +1,43 @@
+import argparse
+
+import grpc
+import ticker_service_pb2
+import ticker_service_pb2_grpc
+
+
+def print_stats(response):
+    """Print the stage latencies of a StatsResponse, in microseconds."""
+    print(f"Stats enabled: {response.enabled}  collected over {response.collection_duration_ns / 1e9:.1f}s")
+    print(f"{'rpc':<20}{'symbol':<8}{'stage':<18}{'count':>9}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}")
+    for stage in response.stages:
+        print(
+            f"{stage.rpc:<20}{stage.ticker_symbol or '*':<8}{stage.stage:<18}{stage.count:>9}"
+            f"{stage.mean_ns / 1e3:>10.1f}{stage.p50_ns / 1e3:>10.1f}{stage.p90_ns / 1e3:>10.1f}"
+            f"{stage.p99_ns / 1e3:>10.1f}{stage.p999_ns / 1e3:>10.1f}{stage.max_ns / 1e3:>10.1f}"
+        )
+
+    if response.slow_callbacks:
+        print("\nRecent slow callbacks:")
+        for slow_callback in response.slow_callbacks:
+            print(
+                f"  {slow_callback.duration_ns / 1e6:8.2f}ms  {slow_callback.rpc or '-':<20}"
+                f"{slow_callback.ticker_symbol or '-':<8}{slow_callback.callback}"
+            )
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Query the server's latency statistics")
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--rpc", default="", help="Only show stages of this RPC")
+    parser.add_argument("--symbol", default="", help="Only show per-symbol stages of this ticker")
+    parser.add_argument("--reset", action="store_true", help="Reset the histograms after reading them")
+    args = parser.parse_args()
+
+    with grpc.insecure_channel(args.target) as channel:
+        stub = ticker_service_pb2_grpc.TickerServiceStub(channel)
+        request = ticker_service_pb2.StatsRequest(rpc=args.rpc, ticker_symbol=args.symbol, reset=args.reset)
+        print_stats(stub.GetStats(request))
+
+
+if __name__ == '__main__':
+    run()
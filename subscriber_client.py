@@ -2,6 +2,7 @@ import grpc
 import ticker_service_pb2
 import ticker_service_pb2_grpc
 import random # For random price generation
+import time
 
 
 def get_tickers(stub):
@@ -20,8 +21,22 @@ def stream_market_data(stub, ticker_symbol):
     print("subscriber connected")
     print(request)
 
+    last_sequence = 0
     for market_data in stub.ConnectToMarketData(request):
-        print(f"Market Data for {market_data.ticker_symbol}: Bid {market_data.best_bid_price} Ask {market_data.best_ask_price}")
+        received_ns = time.time_ns()
+        print(f"Market Data for {market_data.ticker_symbol}: Bid {market_data.best_bid_price} Ask {market_data.best_ask_price}"
+              f" (seq {market_data.sequence}, {(received_ns - market_data.publish_time_ns) / 1e3:.0f}us after publish)")
+        if last_sequence and market_data.sequence != last_sequence + 1:
+            print(f"Missed {market_data.sequence - last_sequence - 1} updates")
+        last_sequence = market_data.sequence
+
+def stream_market_data_batches(stub, ticker_symbols):
+    """Stream market data for several tickers over one multiplexed stream."""
+    request = ticker_service_pb2.MultiTickerRequest(ticker_symbols=ticker_symbols)
+    for batch in stub.SubscribeMarketData(request):
+        for market_data in batch.updates:
+            print(f"Market Data for {market_data.ticker_symbol}: Bid {market_data.best_bid_price} Ask {market_data.best_ask_price}"
+                  f" (seq {market_data.sequence}, {len(batch.updates)} updates in batch)")
 
 def submit_limit_order(stub, ticker_symbol, side, price, quantity):
     """Submit a limit order."""
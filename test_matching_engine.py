@@ -0,0 +1,157 @@
+import random
+
+from matching_engine import OrderBook, SNAPSHOT_PAGE_SIZE
+
+
+def limit(order_book, side, price, quantity, **kwargs):
+    return order_book.submit(order_book.create_order(side, price, quantity, **kwargs))
+
+
+def book_with_trade_at(price):
+    order_book = OrderBook("TEST", "Test")
+    limit(order_book, "buy", price, 1)
+    limit(order_book, "sell", price, 1)
+    assert order_book.last_trade_price == price
+    return order_book
+
+
+def test_sell_stop_triggers_inside_a_buy_sweep():
+    # The sweep trades at 100 then 102: it crossed the sell stop at 100.5 although the last trade is above it
+    order_book = book_with_trade_at(101)
+    stop = limit(order_book, "sell", None, 1, stop_price=100.5)
+    assert stop.status == "pending"
+    limit(order_book, "sell", 100, 2)
+    limit(order_book, "sell", 102, 2)
+    limit(order_book, "buy", 99, 5)
+
+    sweep = limit(order_book, "buy", 102, 4, time_in_force="IOC")
+
+    assert sweep.filled_quantity == 4 and sweep.levels_swept == 2
+    assert order_book.last_trade_price == 99  # The triggered market stop sold into the bid
+    assert stop.status == "filled" and stop.average_price == 99
+    assert not order_book.sell_stops
+
+
+def test_buy_stop_triggers_inside_a_sell_sweep():
+    order_book = book_with_trade_at(100)
+    stop = limit(order_book, "buy", 110, 1, stop_price=100.5)
+    limit(order_book, "buy", 101, 1)
+    limit(order_book, "buy", 99, 1)
+
+    limit(order_book, "sell", 99, 2)
+
+    assert order_book.last_trade_price == 99
+    assert stop.status == "resting" and stop.price == 110
+
+
+def test_stops_beyond_the_sweep_stay_pending():
+    order_book = book_with_trade_at(100)
+    buy_stop = limit(order_book, "buy", None, 1, stop_price=103)
+    sell_stop = limit(order_book, "sell", None, 1, stop_price=97)
+    limit(order_book, "sell", 101, 1)
+    limit(order_book, "sell", 102, 1)
+
+    limit(order_book, "buy", 102, 2)
+
+    assert buy_stop.status == "pending" and sell_stop.status == "pending"
+    # The range of that sweep is gone, a later trade at 100 does not trigger the buy stop
+    limit(order_book, "sell", 100, 1)
+    limit(order_book, "buy", 100, 1)
+    assert buy_stop.status == "pending"
+
+
+def test_uncross_triggers_stops():
+    order_book = book_with_trade_at(100)
+    stop = limit(order_book, "buy", 103, 1, stop_price=101)
+    order_book.set_auction_mode(True)
+    limit(order_book, "buy", 101, 2)
+    limit(order_book, "sell", 101, 2)
+    limit(order_book, "sell", 102, 1)
+
+    assert order_book.uncross() == (101, 2)
+    assert stop.status == "resting"  # A stop-limit can rest during the auction
+
+    order_book.set_auction_mode(False)
+    assert stop.status == "filled" and stop.average_price == 102
+
+
+def test_fok_that_cannot_fill_leaves_the_book_unchanged():
+    order_book = OrderBook("TEST", "Test")
+    limit(order_book, "sell", 100, 2)
+    limit(order_book, "sell", 101, 2)
+    snapshot = order_book.snapshot
+    cancelled = []
+    order_book.cancel_listeners.append(lambda order, quantity: cancelled.append((order.order_id, quantity)))
+
+    fok = limit(order_book, "buy", 101, 5, time_in_force="FOK")
+
+    assert fok.status == "cancelled" and fok.filled_quantity == 0 and fok.cancelled_quantity == 5
+    assert cancelled == [(fok.order_id, 5)]
+    assert order_book.asks.depth(10) == [(100, 2), (101, 2)]
+    assert order_book.snapshot is snapshot
+    assert not order_book.matched_trades and order_book.last_trade_price is None
+
+
+def test_fok_that_can_fill_trades_completely():
+    order_book = OrderBook("TEST", "Test")
+    limit(order_book, "sell", 100, 2)
+    limit(order_book, "sell", 101, 2)
+
+    fok = limit(order_book, "buy", 101, 3, time_in_force="FOK")
+
+    assert fok.status == "filled" and fok.filled_quantity == 3
+    assert order_book.asks.depth(10) == [(101, 1)]
+
+
+def test_ioc_leaves_no_remainder():
+    order_book = OrderBook("TEST", "Test")
+    limit(order_book, "sell", 100, 2)
+    limit(order_book, "sell", 105, 2)
+
+    ioc = limit(order_book, "buy", 101, 5, time_in_force="IOC")
+
+    assert ioc.status == "cancelled"
+    assert ioc.filled_quantity == 2 and ioc.cancelled_quantity == 3 and ioc.quantity == 0
+    assert ioc.order_id not in order_book.orders
+    assert not order_book.bids
+    assert order_book.snapshot.bids() == [] and order_book.snapshot.asks() == [(105, 2)]
+
+
+def assert_snapshot_matches(order_book):
+    snapshot = order_book.snapshot
+    assert snapshot.bids() == order_book.bids.depth(None)
+    assert snapshot.asks() == order_book.asks.depth(None)
+    bid_prices, bid_quantities, ask_prices, ask_quantities = snapshot.columns(SNAPSHOT_PAGE_SIZE + 5)
+    assert list(zip(bid_prices, bid_quantities)) == order_book.bids.depth(SNAPSHOT_PAGE_SIZE + 5)
+    assert list(zip(ask_prices, ask_quantities)) == order_book.asks.depth(SNAPSHOT_PAGE_SIZE + 5)
+
+
+def test_patched_snapshots_match_the_live_levels():
+    rng = random.Random(7)
+    order_book = OrderBook("TEST", "Test")
+    for price in range(1, 4 * SNAPSHOT_PAGE_SIZE):
+        limit(order_book, "buy", 1000 - price, rng.randint(1, 5))
+        limit(order_book, "sell", 1000 + price, rng.randint(1, 5))
+    assert_snapshot_matches(order_book)
+
+    history = []
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.5:
+            side = rng.choice(("buy", "sell"))
+            offset = rng.randint(0, 5 * SNAPSHOT_PAGE_SIZE)
+            limit(order_book, side, 1000 - offset if side == "buy" else 1000 + offset, rng.randint(1, 5))
+        elif action < 0.8 and order_book.orders:
+            order_book.cancel_order(rng.choice(list(order_book.orders)))
+        else:
+            # Sweep a few levels through the middle of the book
+            side = rng.choice(("buy", "sell"))
+            limit(order_book, side, None, rng.randint(1, 30))
+        assert_snapshot_matches(order_book)
+        history.append((order_book.snapshot, order_book.snapshot.bids(), order_book.snapshot.asks()))
+
+    # Copy-on-write: published snapshots never change afterwards
+    versions = [snapshot.version for snapshot, _, _ in history]
+    assert versions == sorted(versions)
+    for snapshot, bids, asks in history:
+        assert snapshot.bids() == bids and snapshot.asks() == asks
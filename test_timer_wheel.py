@@ -0,0 +1,87 @@
+import asyncio
+
+from server import TickerServiceServicer
+from timer_wheel import TimerWheel
+
+TICK_NS = 1_000_000
+
+
+def small_wheel():
+    # 4 slots per level: level 0 covers 4 ticks, level 1 16 and level 2 64, beyond that timers are parked
+    return TimerWheel(tick_ns=TICK_NS, wheel_size=4, levels=3, start_ns=0)
+
+
+def test_timers_expire_on_their_tick():
+    wheel = small_wheel()
+    wheel.schedule(2 * TICK_NS, "a")
+    wheel.schedule(3 * TICK_NS, "b")
+    assert wheel.advance(1 * TICK_NS) == []
+    assert wheel.advance(2 * TICK_NS) == ["a"]
+    assert wheel.advance(10 * TICK_NS) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_timers_cascade_from_higher_levels():
+    wheel = small_wheel()
+    deadlines = {f"t{tick}": tick for tick in (5, 17, 18, 40, 63, 70, 200)}  # Levels 1 and 2, and parked
+    for item, tick in deadlines.items():
+        wheel.schedule(tick * TICK_NS, item)
+
+    expired_at = {}
+    for tick in range(1, 260):
+        for item in wheel.advance(tick * TICK_NS):
+            expired_at[item] = tick
+
+    assert expired_at == deadlines
+    assert len(wheel) == 0
+
+
+def test_past_deadlines_expire_on_the_next_tick():
+    wheel = small_wheel()
+    wheel.advance(10 * TICK_NS)
+    wheel.schedule(3 * TICK_NS, "late")
+    assert wheel.advance(11 * TICK_NS) == ["late"]
+
+
+def servicer_with_orders():
+    servicer = TickerServiceServicer(stats_enabled=False)
+    servicer.expiry_wheel = small_wheel()
+    order_book = servicer.registry.get_order_book("AAPL")
+    orders = {}
+    for name, time_in_force, price, expire_tick in (("gtt", "GTT", 99, 3), ("day", "DAY", 98, 40), ("gtc", "GTC", 97, 0)):
+        order = order_book.create_order("buy", price, 10, client_id="client", time_in_force=time_in_force,
+                                        expire_ns=expire_tick * TICK_NS)
+        order_book.submit(order)
+        if order.expire_ns:
+            servicer.expiry_wheel.schedule(order.expire_ns, order)
+        orders[name] = order
+    return servicer, order_book, orders
+
+
+def test_gtt_and_day_orders_expire_through_the_wheel():
+    servicer, order_book, orders = servicer_with_orders()
+
+    async def expire_until(tick):
+        return await servicer.cancel_orders(servicer.expiry_wheel.advance(tick * TICK_NS), "expired")
+
+    assert asyncio.run(expire_until(2)) == (0, 0)
+    assert asyncio.run(expire_until(3)) == (1, 10)
+    assert orders["gtt"].status == "expired"
+    assert order_book.snapshot.bids() == [(98, 10), (97, 10)]
+
+    # The DAY order sat in level 2 of the wheel and cascaded down before expiring
+    assert asyncio.run(expire_until(39)) == (0, 0)
+    assert asyncio.run(expire_until(40)) == (1, 10)
+    assert orders["day"].status == "expired" and orders["gtc"].status == "resting"
+    assert order_book.snapshot.bids() == [(97, 10)]
+
+
+def test_filled_orders_are_skipped_at_expiry():
+    servicer, order_book, orders = servicer_with_orders()
+    order_book.submit(order_book.create_order("sell", 99, 10))
+    assert orders["gtt"].status == "filled"
+
+    expired = servicer.expiry_wheel.advance(3 * TICK_NS)
+    assert expired == [orders["gtt"]]
+    assert asyncio.run(servicer.cancel_orders(expired, "expired")) == (0, 0)
+    assert orders["gtt"].status == "filled"
@@ -0,0 +1,341 @@
+"""
+Columnar on-disk archive of trades and top-of-book changes.
+
+Rows are kept per ticker and kind ("trades" or "quotes") and written in
+chunks to one data file and one index file per UTC day:
+
+    ARCHIVE_DIR/2024-05-17/AAPL.trades.data
+    ARCHIVE_DIR/2024-05-17/AAPL.trades.index
+
+Symbols are percent-escaped in file names, so any symbol stays inside its day.
+
+A chunk stores each column as a fixed-width little-endian array, one column
+after the other, optionally compressed with zlib. The index has one
+INDEX_DTYPE record per chunk with its offset, size, row count and time range,
+so a range query only touches the chunks that overlap it. Both files are
+memory-mapped for reading, and uncompressed columns are read without copying.
+
+Chunks are written by a background thread, in order, when they are full, when
+the day changes and every flush interval. Print the trades of a ticker from
+the files of a stopped or running server with:
+
+    python tick_archive.py --dir archive --symbol AAPL --start 2024-05-17T10:00 --end 2024-05-17T10:05
+"""
+import argparse
+import asyncio
+import calendar
+import concurrent.futures
+import datetime
+import os
+import sys
+import time
+import urllib.parse
+import zlib
+
+import numpy as np
+
+COLUMNS = {
+    "trades": (("time_ns", "<i8"), ("price", "<f8"), ("quantity", "<i8"), ("buy_order_id", "<i8"), ("sell_order_id", "<i8")),
+    "quotes": (("time_ns", "<i8"), ("bid_price", "<f8"), ("bid_quantity", "<i8"), ("ask_price", "<f8"), ("ask_quantity", "<i8")),
+}
+INDEX_DTYPE = np.dtype([("offset", "<i8"), ("size", "<i8"), ("rows", "<i8"),
+                        ("first_time_ns", "<i8"), ("last_time_ns", "<i8"), ("compressed", "<i8")])
+DAY_NS = 86400 * 10**9
+
+
+def day_of(time_ns):
+    """UTC day of a wall clock time, as 'YYYY-MM-DD'."""
+    return time.strftime("%Y-%m-%d", time.gmtime(time_ns // 10**9))
+
+
+def day_start_ns(day):
+    return calendar.timegm(time.strptime(day, "%Y-%m-%d")) * 10**9
+
+
+def file_paths(root, day, symbol, kind):
+    # Symbols come from AddTickers unchecked, escaped they cannot name another directory ('/', '..')
+    base = os.path.join(root, day, f"{urllib.parse.quote(symbol, safe='')}.{kind}")
+    return base + ".data", base + ".index"
+
+
+def encode_chunk(columns, compress):
+    """
+    Returns:
+        bytes: the columns one after the other, zlib compressed if asked
+    """
+    payload = b"".join(column.tobytes() for column in columns)
+    return zlib.compress(payload) if compress else payload
+
+
+def decode_chunk(payload, rows, kind, compressed):
+    """
+    Returns:
+        dict: column name -> array, views of payload unless it was compressed
+    """
+    if compressed:
+        payload = zlib.decompress(payload)
+    columns = {}
+    offset = 0
+    for name, dtype in COLUMNS[kind]:
+        dtype = np.dtype(dtype)
+        columns[name] = np.frombuffer(payload, dtype, rows, offset)
+        offset += rows * dtype.itemsize
+    return columns
+
+
+def select_range(columns, start_ns, end_ns):
+    """Rows of a chunk with start_ns <= time_ns < end_ns."""
+    times = columns["time_ns"]
+    mask = (times >= start_ns) & (times < end_ns)
+    if mask.all():
+        return columns
+    return {name: column[mask] for name, column in columns.items()}
+
+
+def read_file(root, day, symbol, kind, start_ns, end_ns, chunks=None):
+    """
+    Read the rows of one day file in [start_ns, end_ns), one dict of column arrays per chunk.
+    Only the first `chunks` index records are used if given, later ones may still be being written.
+    """
+    data_path, index_path = file_paths(root, day, symbol, kind)
+    if not os.path.exists(index_path) or os.path.getsize(index_path) < INDEX_DTYPE.itemsize:
+        return
+    index = np.memmap(index_path, INDEX_DTYPE, mode="r", shape=(os.path.getsize(index_path) // INDEX_DTYPE.itemsize,))
+    if chunks is not None:
+        index = index[:chunks]
+    overlapping = index[(index["last_time_ns"] >= start_ns) & (index["first_time_ns"] < end_ns)]
+    if not len(overlapping):
+        return
+    data = np.memmap(data_path, np.uint8, mode="r")
+    for offset, size, rows, first_time_ns, last_time_ns, compressed in overlapping.tolist():
+        columns = select_range(decode_chunk(data[offset:offset + size], rows, kind, compressed), start_ns, end_ns)
+        if len(columns["time_ns"]):
+            yield columns
+
+
+def archived_days(root, start_ns, end_ns):
+    """Days with an archive directory that overlap [start_ns, end_ns), in order."""
+    if not os.path.isdir(root):
+        return []
+    days = []
+    for day in sorted(os.listdir(root)):
+        try:
+            start = day_start_ns(day)
+        except ValueError:
+            continue
+        if start < end_ns and start + DAY_NS > start_ns:
+            days.append(day)
+    return days
+
+
+def read_range(root, symbol, kind, start_ns=0, end_ns=2**63 - 1):
+    """
+    Read archived rows of a ticker in [start_ns, end_ns) straight from the files.
+    Returns:
+        generator: one dict of column arrays per chunk, in time order
+    """
+    for day in archived_days(root, start_ns, end_ns):
+        yield from read_file(root, day, symbol, kind, start_ns, end_ns)
+
+
+class ArchiveChunk:
+    def __init__(self, day, kind, columns):
+        self.day = day
+        self.kind = kind
+        self.columns = columns  # Arrays in COLUMNS order
+
+    def as_dict(self):
+        return {name: column for (name, _), column in zip(COLUMNS[self.kind], self.columns)}
+
+
+class ArchiveStream:
+    """
+    Rows of one ticker and kind not written yet: the rows buffered for the
+    current chunk and the chunks handed to the writer thread.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.day = None
+        self.day_start_ns = self.day_end_ns = 0
+        self.rows = tuple([] for _ in COLUMNS[kind])  # One list per column
+        self.writing = []  # ArchiveChunk being written, in order
+
+
+class TickArchive:
+    """
+    Spools trades and top-of-book changes of the server's books to the archive.
+    """
+
+    def __init__(self, root, chunk_rows=65536, compression="", flush_interval=1.0):
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.compress = compression == "zlib"
+        self.flush_interval = flush_interval
+        self.streams = {}  # (symbol, kind) -> ArchiveStream
+        self.chunks = {}  # (day, symbol, kind) -> index records committed, readers ignore any after them
+        self.last_quotes = {}  # symbol -> (bid_price, bid_quantity, ask_price, ask_quantity) last archived
+        self.writer = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="tick-archive")  # One thread keeps chunks in order
+        os.makedirs(root, exist_ok=True)
+
+    def on_fill(self, fill, buy_order, sell_order):
+        """
+        Order book fill listener.
+        """
+        self._append(buy_order.symbol, "trades", fill.match_wall_ns,
+                     (fill.match_wall_ns, fill.price, fill.quantity, fill.buy_order_id, fill.sell_order_id))
+
+    def record_quote(self, market_data):
+        """
+        Archive the top of book of a market data update if it differs from the last one archived.
+        """
+        quote = (market_data.best_bid_price, market_data.best_bid_quantity,
+                 market_data.best_ask_price, market_data.best_ask_quantity)
+        symbol = market_data.ticker_symbol
+        if self.last_quotes.get(symbol) == quote:
+            return
+        self.last_quotes[symbol] = quote
+        self._append(symbol, "quotes", market_data.publish_time_ns, (market_data.publish_time_ns,) + quote)
+
+    def _append(self, symbol, kind, time_ns, row):
+        stream = self.streams.get((symbol, kind))
+        if stream is None:
+            stream = self.streams[(symbol, kind)] = ArchiveStream(kind)
+        if not stream.day_start_ns <= time_ns < stream.day_end_ns:
+            self._seal(symbol, stream)
+            stream.day = day_of(time_ns)
+            stream.day_start_ns = day_start_ns(stream.day)
+            stream.day_end_ns = stream.day_start_ns + DAY_NS
+        for column, value in zip(stream.rows, row):
+            column.append(value)
+        if len(stream.rows[0]) >= self.chunk_rows:
+            self._seal(symbol, stream)
+
+    def _seal(self, symbol, stream):
+        """
+        Turn the buffered rows of a stream into a chunk and hand it to the writer thread.
+        """
+        if not stream.rows[0]:
+            return
+        columns = [np.array(rows, dtype) for rows, (_, dtype) in zip(stream.rows, COLUMNS[stream.kind])]
+        stream.rows = tuple([] for _ in columns)
+        chunk = ArchiveChunk(stream.day, stream.kind, columns)
+        key = (chunk.day, symbol, chunk.kind)
+        if key not in self.chunks:
+            index_path = file_paths(self.root, chunk.day, symbol, chunk.kind)[1]
+            self.chunks[key] = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        stream.writing.append(chunk)
+        future = asyncio.get_running_loop().run_in_executor(self.writer, self._write, symbol, chunk)
+        future.add_done_callback(lambda future: self._written(key, stream, chunk, future))
+
+    def _write(self, symbol, chunk):
+        # Runs in the writer thread. The index record goes last, so readers never see a partial chunk
+        data_path, index_path = file_paths(self.root, chunk.day, symbol, chunk.kind)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        payload = encode_chunk(chunk.columns, self.compress)
+        with open(data_path, "ab") as data:
+            offset = data.tell()
+            data.write(payload)
+        times = chunk.columns[0]
+        record = np.array([(offset, len(payload), len(times), times.min(), times.max(), self.compress)], INDEX_DTYPE)
+        with open(index_path, "ab") as index:
+            index.write(record.tobytes())
+
+    def _written(self, key, stream, chunk, future):
+        stream.writing.remove(chunk)
+        if future.exception() is not None:
+            print(f"Archiving {len(chunk.columns[0])} {chunk.kind} of {key[1]} failed: {future.exception()!r}")
+            return
+        self.chunks[key] += 1
+
+    def flush(self):
+        for (symbol, kind), stream in self.streams.items():
+            self._seal(symbol, stream)
+
+    async def flush_periodically(self):
+        """
+        Writes the buffered rows every flush interval, so files lag the books by at most that much.
+        """
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        """
+        Write everything buffered and wait for the writer thread.
+        """
+        self.flush()
+        self.writer.shutdown(wait=True)
+
+    def query(self, symbol, kind, start_ns=0, end_ns=2**63 - 1):
+        """
+        Rows of a ticker in [start_ns, end_ns): the committed chunks of the files,
+        then the chunks being written, then the buffered rows. The set of rows is
+        fixed when this is called, later rows are not included.
+        Returns:
+            generator: one dict of column arrays per chunk, in time order
+        """
+        files = [(day, self.chunks.get((day, symbol, kind))) for day in archived_days(self.root, start_ns, end_ns)]
+        stream = self.streams.get((symbol, kind))
+        chunks = []
+        if stream is not None:
+            chunks = list(stream.writing)
+            if stream.rows[0]:
+                chunks.append(ArchiveChunk(stream.day, kind, [np.array(rows, dtype) for rows, (_, dtype)
+                                                               in zip(stream.rows, COLUMNS[kind])]))
+        return self._read(symbol, kind, start_ns, end_ns, files, chunks)
+
+    async def next_in_executor(self, iterator):
+        """
+        Advance an iterator over query() results in the archive's thread, so
+        reading and decoding chunks does not hold up the event loop.
+        Returns:
+            the next item, None at the end
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.writer, next, iterator, None)
+
+    def _read(self, symbol, kind, start_ns, end_ns, files, chunks):
+        for day, committed in files:
+            yield from read_file(self.root, day, symbol, kind, start_ns, end_ns, committed)
+        for chunk in chunks:
+            columns = select_range(chunk.as_dict(), start_ns, end_ns)
+            if len(columns["time_ns"]):
+                yield columns
+
+
+def parse_time(value):
+    """Parse an ISO 8601 UTC time or nanoseconds since the epoch."""
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    moment = datetime.datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return calendar.timegm(moment.utctimetuple()) * 10**9 + moment.microsecond * 1000
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Print archived trades or quotes of a ticker as CSV")
+    parser.add_argument("--dir", default="archive", help="Archive directory of the server (--archive-dir)")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--quotes", action="store_true", help="Print top-of-book changes instead of trades")
+    parser.add_argument("--start", default="", help="UTC time (ISO 8601) or ns since the epoch, inclusive")
+    parser.add_argument("--end", default="", help="UTC time (ISO 8601) or ns since the epoch, exclusive")
+    args = parser.parse_args()
+
+    kind = "quotes" if args.quotes else "trades"
+    start_ns = parse_time(args.start) or 0
+    end_ns = parse_time(args.end) or 2**63 - 1
+    names = [name for name, _ in COLUMNS[kind]]
+    print(",".join(names))
+    rows = 0
+    for columns in read_range(args.dir, args.symbol, kind, start_ns, end_ns):
+        for row in zip(*(columns[name].tolist() for name in names)):
+            print(",".join(map(str, row)))
+        rows += len(columns["time_ns"])
+    print(f"{rows} {kind}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,50 @@
+import argparse
+import csv
+
+import grpc
+import ticker_service_pb2
+import ticker_service_pb2_grpc
+
+
+def read_tickers(path):
+    """Read 'symbol,name' rows from a CSV file, skipping an optional header row."""
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f) if row and row[0].strip()]
+    if rows and rows[0][0].strip().lower() == "symbol":
+        rows = rows[1:]
+    return [ticker_service_pb2.TickerInfo(symbol=row[0].strip(), name=row[1].strip() if len(row) > 1 else "")
+            for row in rows]
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Add or retire tickers on a running server")
+    parser.add_argument("--target", default="localhost:50051")
+    parser.add_argument("--load", default="", help="CSV file of 'symbol,name' rows to add")
+    parser.add_argument("--add", nargs="*", default=[], help="Tickers to add as SYMBOL or SYMBOL=Name")
+    parser.add_argument("--retire", nargs="*", default=[], help="Symbols to retire")
+    parser.add_argument("--force", action="store_true", help="Retire tickers even if they have resting orders")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Tickers per AddTickers call")
+    args = parser.parse_args()
+
+    tickers = read_tickers(args.load) if args.load else []
+    for item in args.add:
+        symbol, _, name = item.partition("=")
+        tickers.append(ticker_service_pb2.TickerInfo(symbol=symbol, name=name))
+
+    with grpc.insecure_channel(args.target) as channel:
+        stub = ticker_service_pb2_grpc.TickerServiceStub(channel)
+
+        for start in range(0, len(tickers), args.batch_size):
+            batch = tickers[start:start + args.batch_size]
+            response = stub.AddTickers(ticker_service_pb2.AddTickersRequest(tickers=batch))
+            print(f"Added {response.added}, updated {response.updated}, total {response.total}")
+
+        if args.retire:
+            response = stub.RetireTickers(ticker_service_pb2.RetireTickersRequest(symbols=args.retire, force=args.force))
+            print(f"Retired {len(response.retired)}, total {response.total}")
+            if response.refused:
+                print(f"Refused (resting orders, use --force): {', '.join(response.refused)}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,187 @@
+import bisect
+import collections
+import csv
+import itertools
+import time
+
+import ticker_service_pb2
+
+
+class TickerRegistry:
+    """
+    Registry of tradable tickers and their order books.
+
+    Tickers can be added and retired at runtime. An OrderBook is only built when
+    the first order for its ticker arrives, and books that are empty and idle can
+    be reclaimed, so a universe of thousands of mostly quiet symbols costs little
+    more than its TickerInfo entries. All books share one order id counter, which
+    keeps order ids unique even when a reclaimed book is created again.
+
+    GetTickers responses are served from a cache of serialized TickerResponse
+    messages that is cleared whenever the set of tickers changes.
+    """
+
+    def __init__(self, order_book_factory, tickers=(), response_cache_size=4096):
+        self.order_book_factory = order_book_factory  # Called as factory(symbol, name, order_id_counter)
+        self.tickers = {}  # symbol -> TickerInfo, in registration order
+        self.order_books = {}  # symbol -> OrderBook, only for tickers that have seen orders
+        self.reclaimed_state = {}  # symbol -> OrderBook.sequence_state() of a reclaimed book, restored when it is created again
+        self.order_id_counter = itertools.count(1)
+        self.response_cache_size = response_cache_size
+        self._response_cache = collections.OrderedDict()  # query -> serialized TickerResponse (LRU)
+        self._sorted_symbols = None  # Built on demand for prefix search and pagination
+        self.add_tickers(tickers)
+
+    def __contains__(self, symbol):
+        return symbol in self.tickers
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def add_tickers(self, tickers):
+        """
+        Register new tickers or rename existing ones.
+        Returns:
+            tuple: (added_count, updated_count)
+        """
+        added = updated = 0
+        for ticker in tickers:
+            existing = self.tickers.get(ticker.symbol)
+            if existing is None:
+                added += 1
+            elif existing.name != ticker.name:
+                updated += 1
+            else:
+                continue
+            self.tickers[ticker.symbol] = ticker_service_pb2.TickerInfo(symbol=ticker.symbol, name=ticker.name)
+            order_book = self.order_books.get(ticker.symbol)
+            if order_book is not None:
+                order_book.name = ticker.name
+        if added or updated:
+            self._invalidate()
+        return added, updated
+
+    def retire_tickers(self, symbols, force=False):
+        """
+        Remove tickers so they no longer accept orders. A ticker whose book still
+        holds resting orders is only retired with force=True, which discards them.
+        Returns:
+            tuple: (retired_symbols, refused_symbols)
+        """
+        retired = []
+        refused = []
+        for symbol in symbols:
+            if symbol not in self.tickers:
+                continue
+            order_book = self.order_books.get(symbol)
+            if order_book is not None and not order_book.is_empty() and not force:
+                refused.append(symbol)
+                continue
+            del self.tickers[symbol]
+            self.order_books.pop(symbol, None)
+            self.reclaimed_state.pop(symbol, None)
+            retired.append(symbol)
+        if retired:
+            self._invalidate()
+        return retired, refused
+
+    def load_csv(self, path):
+        """
+        Bulk load tickers from a CSV file with 'symbol,name' rows (an optional header row is skipped).
+        Returns:
+            tuple: (added_count, updated_count)
+        """
+        with open(path, newline="") as f:
+            rows = [row for row in csv.reader(f) if row and row[0].strip()]
+        if rows and rows[0][0].strip().lower() == "symbol":
+            rows = rows[1:]
+        return self.add_tickers(
+            ticker_service_pb2.TickerInfo(symbol=row[0].strip(), name=row[1].strip() if len(row) > 1 else "")
+            for row in rows
+        )
+
+    def _invalidate(self):
+        self._response_cache.clear()
+        self._sorted_symbols = None
+
+    def sorted_symbols(self):
+        if self._sorted_symbols is None:
+            self._sorted_symbols = sorted(self.tickers)
+        return self._sorted_symbols
+
+    def get_tickers_response(self, symbol="", prefix="", page_size=0, page_token=""):
+        """
+        Get the serialized TickerResponse for a query, from the cache when possible.
+        """
+        key = (symbol, prefix, page_size, page_token)
+        data = self._response_cache.get(key)
+        if data is not None:
+            self._response_cache.move_to_end(key)
+            return data
+
+        data = self._build_tickers_response(symbol, prefix, page_size, page_token).SerializeToString()
+        self._response_cache[key] = data
+        if len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+        return data
+
+    def _build_tickers_response(self, symbol, prefix, page_size, page_token):
+        response = ticker_service_pb2.TickerResponse()
+        if symbol:
+            ticker = self.tickers.get(symbol)
+            if ticker is not None:
+                response.tickers.append(ticker)
+            response.total_count = len(response.tickers)
+            return response
+
+        if not prefix and not page_size and not page_token:
+            # The full list keeps registration order
+            response.tickers.extend(self.tickers.values())
+            response.total_count = len(self.tickers)
+            return response
+
+        # Prefix queries and pages are in symbol order; the page token is the last symbol returned
+        symbols = self.sorted_symbols()
+        start = bisect.bisect_left(symbols, prefix)
+        end = bisect.bisect_left(symbols, prefix[:-1] + chr(ord(prefix[-1]) + 1)) if prefix else len(symbols)
+        response.total_count = end - start
+        if page_token:
+            start = max(start, bisect.bisect_right(symbols, page_token))
+        stop = min(end, start + page_size) if page_size else end
+        response.tickers.extend(self.tickers[ticker_symbol] for ticker_symbol in symbols[start:stop])
+        if stop < end:
+            response.next_page_token = symbols[stop - 1]
+        return response
+
+    def get_order_book(self, symbol):
+        """
+        Get the order book of a ticker, creating it on first use.
+        Raises KeyError for unknown or retired tickers.
+        """
+        order_book = self.order_books.get(symbol)
+        if order_book is None:
+            ticker = self.tickers[symbol]
+            order_book = self.order_books[symbol] = self.order_book_factory(
+                ticker.symbol, ticker.name, self.order_id_counter)
+            state = self.reclaimed_state.pop(symbol, None)
+            if state is not None:
+                order_book.restore_sequence_state(state)
+        return order_book
+
+    def reclaim_idle_books(self, idle_seconds, keep=()):
+        """
+        Drop books without resting orders that saw no activity for idle_seconds.
+        Books of symbols in `keep` (e.g. with live subscribers) are left alone.
+        Their last trade price and sequence numbers are kept for when the book is created again.
+        Returns:
+            int: number of books reclaimed
+        """
+        cutoff = time.monotonic_ns() - int(idle_seconds * 1e9)
+        idle = [
+            symbol for symbol, order_book in self.order_books.items()
+            if order_book.last_activity_ns < cutoff and order_book.is_empty()
+            and not order_book.lock.locked() and symbol not in keep
+        ]
+        for symbol in idle:
+            self.reclaimed_state[symbol] = self.order_books.pop(symbol).sequence_state()
+        return len(idle)
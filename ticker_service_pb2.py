@@ -13,28 +13,101 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14ticker_service.proto\x12\x0eticker_service\"&\n\rTickerRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\"=\n\x0eTickerResponse\x12+\n\x07tickers\x18\x01 \x03(\x0b\x32\x1a.ticker_service.TickerInfo\"*\n\nTickerInfo\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"\xea\x01\n\nMarketData\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x16\n\x0e\x62\x65st_bid_price\x18\x02 \x01(\x01\x12\x16\n\x0e\x62\x65st_ask_price\x18\x03 \x01(\x01\x12\x19\n\x11\x62\x65st_bid_quantity\x18\x04 \x01(\x03\x12\x19\n\x11\x62\x65st_ask_quantity\x18\x05 \x01(\x03\x12\x1f\n\x17order_book_variance_max\x18\x06 \x01(\x01\x12\x1f\n\x17order_book_variance_min\x18\x07 \x01(\x01\x12\x1d\n\x15total_volume_quantity\x18\x08 \x01(\x03\"Y\n\x11LimitOrderRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0c\n\x04side\x18\x02 \x01(\t\x12\r\n\x05price\x18\x03 \x01(\x01\x12\x10\n\x08quantity\x18\x04 \x01(\x03\"K\n\x12MarketOrderRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0c\n\x04side\x18\x02 \x01(\t\x12\x10\n\x08quantity\x18\x03 \x01(\x03\"!\n\rOrderResponse\x12\x10\n\x08order_id\x18\x01 \x01(\t2\xde\x02\n\rTickerService\x12K\n\nGetTickers\x12\x1d.ticker_service.TickerRequest\x1a\x1e.ticker_service.TickerResponse\x12R\n\x13\x43onnectToMarketData\x12\x1d.ticker_service.TickerRequest\x1a\x1a.ticker_service.MarketData0\x01\x12T\n\x10SubmitLimitOrder\x12!.ticker_service.LimitOrderRequest\x1a\x1d.ticker_service.OrderResponse\x12V\n\x11SubmitMarketOrder\x12\".ticker_service.MarketOrderRequest\x1a\x1d.ticker_service.OrderResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14ticker_service.proto\x12\x0eticker_service\"\x93\x01\n\rTickerRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0e\n\x06prefix\x18\x02 \x01(\t\x12\x11\n\tpage_size\x18\x03 \x01(\x05\x12\x12\n\npage_token\x18\x04 \x01(\t\x12\x34\n\x07options\x18\x05 \x01(\x0b\x32#.ticker_service.SubscriptionOptions\"^\n\x13SubscriptionOptions\x12\x16\n\x0eonly_on_change\x18\x01 \x01(\x08\x12\x16\n\x0emin_price_move\x18\x02 \x01(\x01\x12\x17\n\x0fmin_interval_ms\x18\x03 \x01(\x05\"k\n\x0eTickerResponse\x12+\n\x07tickers\x18\x01 \x03(\x0b\x32\x1a.ticker_service.TickerInfo\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\x12\x13\n\x0btotal_count\x18\x03 \x01(\x05\"*\n\nTickerInfo\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"@\n\x11\x41\x64\x64TickersRequest\x12+\n\x07tickers\x18\x01 \x03(\x0b\x32\x1a.ticker_service.TickerInfo\"6\n\x14RetireTickersRequest\x12\x0f\n\x07symbols\x18\x01 \x03(\t\x12\r\n\x05\x66orce\x18\x02 \x01(\x08\"f\n\x13TickerAdminResponse\x12\r\n\x05\x61\x64\x64\x65\x64\x18\x01 \x01(\x05\x12\x0f\n\x07updated\x18\x02 \x01(\x05\x12\x0f\n\x07retired\x18\x03 \x03(\t\x12\x0f\n\x07refused\x18\x04 \x03(\t\x12\r\n\x05total\x18\x05 \x01(\x05\"\xe0\x03\n\nMarketData\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x16\n\x0e\x62\x65st_bid_price\x18\x02 \x01(\x01\x12\x16\n\x0e\x62\x65st_ask_price\x18\x03 \x01(\x01\x12\x19\n\x11\x62\x65st_bid_quantity\x18\x04 \x01(\x03\x12\x19\n\x11\x62\x65st_ask_quantity\x18\x05 \x01(\x03\x12\x1f\n\x17order_book_variance_max\x18\x06 \x01(\x01\x12\x1f\n\x17order_book_variance_min\x18\x07 \x01(\x01\x12\x1d\n\x15total_volume_quantity\x18\x08 \x01(\x03\x12\x10\n\x08sequence\x18\t \x01(\x03\x12\x1d\n\x15order_receive_time_ns\x18\n \x01(\x03\x12\"\n\x1aorder_receive_monotonic_ns\x18\x0b \x01(\x03\x12\x15\n\rmatch_time_ns\x18\x0c \x01(\x03\x12\x1a\n\x12match_monotonic_ns\x18\r \x01(\x03\x12\x17\n\x0fpublish_time_ns\x18\x0e \x01(\x03\x12\x1c\n\x14publish_monotonic_ns\x18\x0f \x01(\x03\x12\x1b\n\x13\x63lient_send_time_ns\x18\x10 \x01(\x03\x12\x18\n\x10snapshot_version\x18\x11 \x01(\x03\"J\n\x0c\x44\x65pthRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0e\n\x06levels\x18\x02 \x01(\x05\x12\x13\n\x0b\x63ompression\x18\x03 \x01(\t\"\xfe\x01\n\x0bMarketDepth\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x18\n\x10snapshot_version\x18\x02 \x01(\x03\x12\x11\n\ttick_size\x18\x03 \x01(\x01\x12\x16\n\x0e\x62\x65st_bid_ticks\x18\x04 \x01(\x03\x12\x18\n\x10\x62id_price_deltas\x18\x05 \x03(\x04\x12\x16\n\x0e\x62id_quantities\x18\x06 \x03(\x03\x12\x16\n\x0e\x62\x65st_ask_ticks\x18\x07 \x01(\x03\x12\x18\n\x10\x61sk_price_deltas\x18\x08 \x03(\x04\x12\x16\n\x0e\x61sk_quantities\x18\t \x03(\x03\x12\x17\n\x0fpublish_time_ns\x18\n \x01(\x03\"\xa2\x01\n\x0eOrderBookEvent\x12\x10\n\x08sequence\x18\x01 \x01(\x03\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08order_id\x18\x03 \x01(\t\x12\x0c\n\x04side\x18\x04 \x01(\t\x12\r\n\x05price\x18\x05 \x01(\x01\x12\x10\n\x08quantity\x18\x06 \x01(\x03\x12\x1a\n\x12remaining_quantity\x18\x07 \x01(\x03\x12\x13\n\x0btrade_price\x18\x08 \x01(\x01\"\\\n\x13OrderBookEventBatch\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12.\n\x06\x65vents\x18\x02 \x03(\x0b\x32\x1e.ticker_service.OrderBookEvent\"A\n\x0cRestingOrder\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\r\n\x05price\x18\x02 \x01(\x01\x12\x10\n\x08quantity\x18\x03 \x01(\x03\"\x94\x01\n\x11OrderBookSnapshot\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12*\n\x04\x62ids\x18\x03 \x03(\x0b\x32\x1c.ticker_service.RestingOrder\x12*\n\x04\x61sks\x18\x04 \x03(\x0b\x32\x1c.ticker_service.RestingOrder\"b\n\x12MultiTickerRequest\x12\x16\n\x0eticker_symbols\x18\x01 \x03(\t\x12\x34\n\x07options\x18\x02 \x01(\x0b\x32#.ticker_service.SubscriptionOptions\"r\n\x12SubscriptionChange\x12\x11\n\tsubscribe\x18\x01 \x03(\t\x12\x13\n\x0bunsubscribe\x18\x02 \x03(\t\x12\x34\n\x07options\x18\x03 \x01(\x0b\x32#.ticker_service.SubscriptionOptions\">\n\x0fMarketDataBatch\x12+\n\x07updates\x18\x01 \x03(\x0b\x32\x1a.ticker_service.MarketData\"\xc9\x01\n\x11LimitOrderRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0c\n\x04side\x18\x02 \x01(\t\x12\r\n\x05price\x18\x03 \x01(\x01\x12\x10\n\x08quantity\x18\x04 \x01(\x03\x12\x1b\n\x13\x63lient_send_time_ns\x18\x05 \x01(\x03\x12\x15\n\rtime_in_force\x18\x06 \x01(\t\x12\x12\n\nstop_price\x18\x07 \x01(\x01\x12\x16\n\x0e\x65xpire_time_ns\x18\x08 \x01(\x03\x12\x0e\n\x06ttl_ms\x18\t \x01(\x03\"\x93\x01\n\x12MarketOrderRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0c\n\x04side\x18\x02 \x01(\t\x12\x10\n\x08quantity\x18\x03 \x01(\x03\x12\x1b\n\x13\x63lient_send_time_ns\x18\x04 \x01(\x03\x12\x12\n\nstop_price\x18\x05 \x01(\x01\x12\x15\n\rtime_in_force\x18\x06 \x01(\t\"\xef\x02\n\rOrderResponse\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x17\n\x0freceive_time_ns\x18\x02 \x01(\x03\x12\x1c\n\x14receive_monotonic_ns\x18\x03 \x01(\x03\x12\x15\n\rmatch_time_ns\x18\x04 \x01(\x03\x12\x1a\n\x12match_monotonic_ns\x18\x05 \x01(\x03\x12\x18\n\x10response_time_ns\x18\x06 \x01(\x03\x12\x1d\n\x15response_monotonic_ns\x18\x07 \x01(\x03\x12\x1b\n\x13\x63lient_send_time_ns\x18\x08 \x01(\x03\x12\x0e\n\x06status\x18\t \x01(\t\x12\x17\n\x0f\x66illed_quantity\x18\n \x01(\x03\x12\x15\n\raverage_price\x18\x0b \x01(\x01\x12\x14\n\x0clevels_swept\x18\x0c \x01(\x05\x12\x1a\n\x12remaining_quantity\x18\r \x01(\x03\x12\x1a\n\x12\x63\x61ncelled_quantity\x18\x0e \x01(\x03\"3\n\x13OrderUpdatesRequest\x12\x1c\n\x14\x63\x61ncel_on_disconnect\x18\x01 \x01(\x08\"\xa9\x01\n\x0bOrderUpdate\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x15\n\rticker_symbol\x18\x02 \x01(\t\x12\x0c\n\x04side\x18\x03 \x01(\t\x12\r\n\x05price\x18\x04 \x01(\x01\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x1a\n\x12\x63\x61ncelled_quantity\x18\x06 \x01(\x03\x12\x17\n\x0f\x66illed_quantity\x18\x07 \x01(\x03\x12\x0f\n\x07time_ns\x18\x08 \x01(\x03\"8\n\x11MassCancelRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0c\n\x04side\x18\x02 \x01(\t\"C\n\x12MassCancelResponse\x12\x11\n\tcancelled\x18\x01 \x01(\x05\x12\x1a\n\x12\x63\x61ncelled_quantity\x18\x02 \x01(\x03\"N\n\x12TradingModeRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0c\n\x04mode\x18\x02 \x01(\t\x12\x13\n\x0binterval_ms\x18\x03 \x01(\x05\"K\n\x13TradingModeResponse\x12\x0c\n\x04mode\x18\x01 \x01(\t\x12\x16\n\x0e\x63learing_price\x18\x02 \x01(\x01\x12\x0e\n\x06volume\x18\x03 \x01(\x03\"k\n\x12QueryTradesRequest\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x15\n\rstart_time_ns\x18\x02 \x01(\x03\x12\x13\n\x0b\x65nd_time_ns\x18\x03 \x01(\x03\x12\x12\n\nbatch_size\x18\x04 \x01(\x05\"\x82\x01\n\nTradeBatch\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x0f\n\x07time_ns\x18\x02 \x03(\x03\x12\r\n\x05price\x18\x03 \x03(\x01\x12\x10\n\x08quantity\x18\x04 \x03(\x03\x12\x14\n\x0c\x62uy_order_id\x18\x05 \x03(\x03\x12\x15\n\rsell_order_id\x18\x06 \x03(\x03\"\x90\x03\n\x12ReplicationCommand\x12\x10\n\x08sequence\x18\x01 \x01(\x03\x12\x0f\n\x07time_ns\x18\x02 \x01(\x03\x12\x30\n\x05order\x18\x03 \x01(\x0b\x32\x1f.ticker_service.ReplicatedOrderH\x00\x12\x32\n\x06\x63\x61ncel\x18\x04 \x01(\x0b\x32 .ticker_service.ReplicatedCancelH\x00\x12:\n\x0ctrading_mode\x18\x05 \x01(\x0b\x32\".ticker_service.TradingModeRequestH\x00\x12\x30\n\x07uncross\x18\x06 \x01(\x0b\x32\x1d.ticker_service.TickerRequestH\x00\x12\x38\n\x0b\x61\x64\x64_tickers\x18\x07 \x01(\x0b\x32!.ticker_service.AddTickersRequestH\x00\x12>\n\x0eretire_tickers\x18\x08 \x01(\x0b\x32$.ticker_service.RetireTickersRequestH\x00\x42\t\n\x07\x63ommand\"\xf5\x01\n\x0fReplicatedOrder\x12\x10\n\x08order_id\x18\x01 \x01(\x03\x12\x15\n\rticker_symbol\x18\x02 \x01(\t\x12\x11\n\tclient_id\x18\x03 \x01(\t\x12\x0c\n\x04side\x18\x04 \x01(\t\x12\r\n\x05price\x18\x05 \x01(\x01\x12\x10\n\x08quantity\x18\x06 \x01(\x03\x12\x15\n\rtime_in_force\x18\x07 \x01(\t\x12\x12\n\nstop_price\x18\x08 \x01(\x01\x12\x16\n\x0e\x65xpire_time_ns\x18\t \x01(\x03\x12\x17\n\x0freceive_time_ns\x18\n \x01(\x03\x12\x1b\n\x13\x63lient_send_time_ns\x18\x0b \x01(\x03\"L\n\x10ReplicatedCancel\x12\x15\n\rticker_symbol\x18\x01 \x01(\t\x12\x11\n\torder_ids\x18\x02 \x03(\x03\x12\x0e\n\x06status\x18\x03 \x01(\t\"b\n\x10ReplicationBatch\x12\x34\n\x08\x63ommands\x18\x01 \x03(\x0b\x32\".ticker_service.ReplicationCommand\x12\x18\n\x10primary_sequence\x18\x02 \x01(\x03\"*\n\x0eReplicationAck\x12\x18\n\x10\x61pplied_sequence\x18\x01 \x01(\x03\"\x1a\n\x18ReplicationStatusRequest\"\xc1\x01\n\x11ReplicationStatus\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x10\n\x08sequence\x18\x02 \x01(\x03\x12\x18\n\x10primary_sequence\x18\x03 \x01(\x03\x12\x15\n\revents_behind\x18\x04 \x01(\x03\x12\x0e\n\x06lag_us\x18\x05 \x01(\x03\x12\x10\n\x08standbys\x18\x06 \x01(\x05\x12\x11\n\tconnected\x18\x07 \x01(\x08\x12\x14\n\x0c\x61\x63k_timeouts\x18\x08 \x01(\x03\x12\x10\n\x08\x64iverged\x18\t \x01(\t\"\x10\n\x0ePromoteRequest\"A\n\x0cStatsRequest\x12\x0b\n\x03rpc\x18\x01 \x01(\t\x12\x15\n\rticker_symbol\x18\x02 \x01(\t\x12\r\n\x05reset\x18\x03 \x01(\x08\"\xc0\x01\n\nStageStats\x12\x0b\n\x03rpc\x18\x01 \x01(\t\x12\x15\n\rticker_symbol\x18\x02 \x01(\t\x12\r\n\x05stage\x18\x03 \x01(\t\x12\r\n\x05\x63ount\x18\x04 \x01(\x03\x12\x0e\n\x06min_ns\x18\x05 \x01(\x03\x12\x0f\n\x07mean_ns\x18\x06 \x01(\x01\x12\x0e\n\x06p50_ns\x18\x07 \x01(\x03\x12\x0e\n\x06p90_ns\x18\x08 \x01(\x03\x12\x0e\n\x06p99_ns\x18\t \x01(\x03\x12\x0f\n\x07p999_ns\x18\n \x01(\x03\x12\x0e\n\x06max_ns\x18\x0b \x01(\x03\"\xa2\x01\n\rStatsResponse\x12\x0f\n\x07\x65nabled\x18\x01 \x01(\x08\x12\x1e\n\x16\x63ollection_duration_ns\x18\x02 \x01(\x03\x12*\n\x06stages\x18\x03 \x03(\x0b\x32\x1a.ticker_service.StageStats\x12\x34\n\x0eslow_callbacks\x18\x04 \x03(\x0b\x32\x1c.ticker_service.SlowCallback\"o\n\x0cSlowCallback\x12\x14\n\x0ctimestamp_ns\x18\x01 \x01(\x03\x12\x13\n\x0b\x64uration_ns\x18\x02 \x01(\x03\x12\x0b\n\x03rpc\x18\x03 \x01(\t\x12\x15\n\rticker_symbol\x18\x04 \x01(\t\x12\x10\n\x08\x63\x61llback\x18\x05 \x01(\t\"\x7f\n\x0eProfileRequest\x12\x0c\n\x04mode\x18\x01 \x01(\t\x12\x13\n\x0b\x64uration_ms\x18\x02 \x01(\x03\x12\x1a\n\x12sample_interval_us\x18\x03 \x01(\x03\x12\x17\n\x0ftracemalloc_top\x18\x04 \x01(\x05\x12\x15\n\rtop_functions\x18\x05 \x01(\x05\"\x90\x01\n\x0fProfileResponse\x12\x0e\n\x06pstats\x18\x01 \x01(\x0c\x12\x18\n\x10\x63ollapsed_stacks\x18\x02 \x01(\x0c\x12\x0f\n\x07summary\x18\x03 \x01(\t\x12\x17\n\x0ftracemalloc_top\x18\x04 \x01(\t\x12\x13\n\x0b\x64uration_ns\x18\x05 \x01(\x03\x12\x14\n\x0csample_count\x18\x06 \x01(\x03\"\x14\n\x12StopProfileRequest\"&\n\x13StopProfileResponse\x12\x0f\n\x07stopped\x18\x01 \x01(\x08\x32\xd2\x0f\n\rTickerService\x12K\n\nGetTickers\x12\x1d.ticker_service.TickerRequest\x1a\x1e.ticker_service.TickerResponse\x12T\n\nAddTickers\x12!.ticker_service.AddTickersRequest\x1a#.ticker_service.TickerAdminResponse\x12Z\n\rRetireTickers\x12$.ticker_service.RetireTickersRequest\x1a#.ticker_service.TickerAdminResponse\x12R\n\x13\x43onnectToMarketData\x12\x1d.ticker_service.TickerRequest\x1a\x1a.ticker_service.MarketData0\x01\x12J\n\rGetMarketData\x12\x1d.ticker_service.TickerRequest\x1a\x1a.ticker_service.MarketData\x12K\n\x0eGetMarketDepth\x12\x1c.ticker_service.DepthRequest\x1a\x1b.ticker_service.MarketDepth\x12S\n\x14\x43onnectToMarketDepth\x12\x1c.ticker_service.DepthRequest\x1a\x1b.ticker_service.MarketDepth0\x01\x12`\n\x18\x43onnectToOrderBookEvents\x12\x1d.ticker_service.TickerRequest\x1a#.ticker_service.OrderBookEventBatch0\x01\x12X\n\x14GetOrderBookSnapshot\x12\x1d.ticker_service.TickerRequest\x1a!.ticker_service.OrderBookSnapshot\x12\\\n\x13SubscribeMarketData\x12\".ticker_service.MultiTickerRequest\x1a\x1f.ticker_service.MarketDataBatch0\x01\x12g\n\x1cManageMarketDataSubscription\x12\".ticker_service.SubscriptionChange\x1a\x1f.ticker_service.MarketDataBatch(\x01\x30\x01\x12[\n\x15\x43onnectToOrderUpdates\x12#.ticker_service.OrderUpdatesRequest\x1a\x1b.ticker_service.OrderUpdate0\x01\x12S\n\nMassCancel\x12!.ticker_service.MassCancelRequest\x1a\".ticker_service.MassCancelResponse\x12Y\n\x0eSetTradingMode\x12\".ticker_service.TradingModeRequest\x1a#.ticker_service.TradingModeResponse\x12T\n\x10SubmitLimitOrder\x12!.ticker_service.LimitOrderRequest\x1a\x1d.ticker_service.OrderResponse\x12V\n\x11SubmitMarketOrder\x12\".ticker_service.MarketOrderRequest\x1a\x1d.ticker_service.OrderResponse\x12O\n\x0bQueryTrades\x12\".ticker_service.QueryTradesRequest\x1a\x1a.ticker_service.TradeBatch0\x01\x12Q\n\tReplicate\x12\x1e.ticker_service.ReplicationAck\x1a .ticker_service.ReplicationBatch(\x01\x30\x01\x12\x63\n\x14GetReplicationStatus\x12(.ticker_service.ReplicationStatusRequest\x1a!.ticker_service.ReplicationStatus\x12L\n\x07Promote\x12\x1e.ticker_service.PromoteRequest\x1a!.ticker_service.ReplicationStatus\x12G\n\x08GetStats\x12\x1c.ticker_service.StatsRequest\x1a\x1d.ticker_service.StatsResponse\x12J\n\x07Profile\x12\x1e.ticker_service.ProfileRequest\x1a\x1f.ticker_service.ProfileResponse\x12V\n\x0bStopProfile\x12\".ticker_service.StopProfileRequest\x1a#.ticker_service.StopProfileResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'ticker_service_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
-
   DESCRIPTOR._options = None
-  _globals['_TICKERREQUEST']._serialized_start=40
-  _globals['_TICKERREQUEST']._serialized_end=78
-  _globals['_TICKERRESPONSE']._serialized_start=80
-  _globals['_TICKERRESPONSE']._serialized_end=141
-  _globals['_TICKERINFO']._serialized_start=143
-  _globals['_TICKERINFO']._serialized_end=185
-  _globals['_MARKETDATA']._serialized_start=188
-  _globals['_MARKETDATA']._serialized_end=422
-  _globals['_LIMITORDERREQUEST']._serialized_start=424
-  _globals['_LIMITORDERREQUEST']._serialized_end=513
-  _globals['_MARKETORDERREQUEST']._serialized_start=515
-  _globals['_MARKETORDERREQUEST']._serialized_end=590
-  _globals['_ORDERRESPONSE']._serialized_start=592
-  _globals['_ORDERRESPONSE']._serialized_end=625
-  _globals['_TICKERSERVICE']._serialized_start=628
-  _globals['_TICKERSERVICE']._serialized_end=978
+  _globals['_TICKERREQUEST']._serialized_start=41
+  _globals['_TICKERREQUEST']._serialized_end=188
+  _globals['_SUBSCRIPTIONOPTIONS']._serialized_start=190
+  _globals['_SUBSCRIPTIONOPTIONS']._serialized_end=284
+  _globals['_TICKERRESPONSE']._serialized_start=286
+  _globals['_TICKERRESPONSE']._serialized_end=393
+  _globals['_TICKERINFO']._serialized_start=395
+  _globals['_TICKERINFO']._serialized_end=437
+  _globals['_ADDTICKERSREQUEST']._serialized_start=439
+  _globals['_ADDTICKERSREQUEST']._serialized_end=503
+  _globals['_RETIRETICKERSREQUEST']._serialized_start=505
+  _globals['_RETIRETICKERSREQUEST']._serialized_end=559
+  _globals['_TICKERADMINRESPONSE']._serialized_start=561
+  _globals['_TICKERADMINRESPONSE']._serialized_end=663
+  _globals['_MARKETDATA']._serialized_start=666
+  _globals['_MARKETDATA']._serialized_end=1146
+  _globals['_DEPTHREQUEST']._serialized_start=1148
+  _globals['_DEPTHREQUEST']._serialized_end=1222
+  _globals['_MARKETDEPTH']._serialized_start=1225
+  _globals['_MARKETDEPTH']._serialized_end=1479
+  _globals['_ORDERBOOKEVENT']._serialized_start=1482
+  _globals['_ORDERBOOKEVENT']._serialized_end=1644
+  _globals['_ORDERBOOKEVENTBATCH']._serialized_start=1646
+  _globals['_ORDERBOOKEVENTBATCH']._serialized_end=1738
+  _globals['_RESTINGORDER']._serialized_start=1740
+  _globals['_RESTINGORDER']._serialized_end=1805
+  _globals['_ORDERBOOKSNAPSHOT']._serialized_start=1808
+  _globals['_ORDERBOOKSNAPSHOT']._serialized_end=1956
+  _globals['_MULTITICKERREQUEST']._serialized_start=1958
+  _globals['_MULTITICKERREQUEST']._serialized_end=2056
+  _globals['_SUBSCRIPTIONCHANGE']._serialized_start=2058
+  _globals['_SUBSCRIPTIONCHANGE']._serialized_end=2172
+  _globals['_MARKETDATABATCH']._serialized_start=2174
+  _globals['_MARKETDATABATCH']._serialized_end=2236
+  _globals['_LIMITORDERREQUEST']._serialized_start=2239
+  _globals['_LIMITORDERREQUEST']._serialized_end=2440
+  _globals['_MARKETORDERREQUEST']._serialized_start=2443
+  _globals['_MARKETORDERREQUEST']._serialized_end=2590
+  _globals['_ORDERRESPONSE']._serialized_start=2593
+  _globals['_ORDERRESPONSE']._serialized_end=2960
+  _globals['_ORDERUPDATESREQUEST']._serialized_start=2962
+  _globals['_ORDERUPDATESREQUEST']._serialized_end=3013
+  _globals['_ORDERUPDATE']._serialized_start=3016
+  _globals['_ORDERUPDATE']._serialized_end=3185
+  _globals['_MASSCANCELREQUEST']._serialized_start=3187
+  _globals['_MASSCANCELREQUEST']._serialized_end=3243
+  _globals['_MASSCANCELRESPONSE']._serialized_start=3245
+  _globals['_MASSCANCELRESPONSE']._serialized_end=3312
+  _globals['_TRADINGMODEREQUEST']._serialized_start=3314
+  _globals['_TRADINGMODEREQUEST']._serialized_end=3392
+  _globals['_TRADINGMODERESPONSE']._serialized_start=3394
+  _globals['_TRADINGMODERESPONSE']._serialized_end=3469
+  _globals['_QUERYTRADESREQUEST']._serialized_start=3471
+  _globals['_QUERYTRADESREQUEST']._serialized_end=3578
+  _globals['_TRADEBATCH']._serialized_start=3581
+  _globals['_TRADEBATCH']._serialized_end=3711
+  _globals['_REPLICATIONCOMMAND']._serialized_start=3714
+  _globals['_REPLICATIONCOMMAND']._serialized_end=4114
+  _globals['_REPLICATEDORDER']._serialized_start=4117
+  _globals['_REPLICATEDORDER']._serialized_end=4362
+  _globals['_REPLICATEDCANCEL']._serialized_start=4364
+  _globals['_REPLICATEDCANCEL']._serialized_end=4440
+  _globals['_REPLICATIONBATCH']._serialized_start=4442
+  _globals['_REPLICATIONBATCH']._serialized_end=4540
+  _globals['_REPLICATIONACK']._serialized_start=4542
+  _globals['_REPLICATIONACK']._serialized_end=4584
+  _globals['_REPLICATIONSTATUSREQUEST']._serialized_start=4586
+  _globals['_REPLICATIONSTATUSREQUEST']._serialized_end=4612
+  _globals['_REPLICATIONSTATUS']._serialized_start=4615
+  _globals['_REPLICATIONSTATUS']._serialized_end=4808
+  _globals['_PROMOTEREQUEST']._serialized_start=4810
+  _globals['_PROMOTEREQUEST']._serialized_end=4826
+  _globals['_STATSREQUEST']._serialized_start=4828
+  _globals['_STATSREQUEST']._serialized_end=4893
+  _globals['_STAGESTATS']._serialized_start=4896
+  _globals['_STAGESTATS']._serialized_end=5088
+  _globals['_STATSRESPONSE']._serialized_start=5091
+  _globals['_STATSRESPONSE']._serialized_end=5253
+  _globals['_SLOWCALLBACK']._serialized_start=5255
+  _globals['_SLOWCALLBACK']._serialized_end=5366
+  _globals['_PROFILEREQUEST']._serialized_start=5368
+  _globals['_PROFILEREQUEST']._serialized_end=5495
+  _globals['_PROFILERESPONSE']._serialized_start=5498
+  _globals['_PROFILERESPONSE']._serialized_end=5642
+  _globals['_STOPPROFILEREQUEST']._serialized_start=5644
+  _globals['_STOPPROFILEREQUEST']._serialized_end=5664
+  _globals['_STOPPROFILERESPONSE']._serialized_start=5666
+  _globals['_STOPPROFILERESPONSE']._serialized_end=5704
+  _globals['_TICKERSERVICE']._serialized_start=5707
+  _globals['_TICKERSERVICE']._serialized_end=7709
 # @@protoc_insertion_point(module_scope)
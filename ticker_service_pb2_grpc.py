@@ -39,11 +39,71 @@ class TickerServiceStub(object):
                 request_serializer=ticker__service__pb2.TickerRequest.SerializeToString,
                 response_deserializer=ticker__service__pb2.TickerResponse.FromString,
                 _registered_method=True)
+        self.AddTickers = channel.unary_unary(
+                '/ticker_service.TickerService/AddTickers',
+                request_serializer=ticker__service__pb2.AddTickersRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.TickerAdminResponse.FromString,
+                _registered_method=True)
+        self.RetireTickers = channel.unary_unary(
+                '/ticker_service.TickerService/RetireTickers',
+                request_serializer=ticker__service__pb2.RetireTickersRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.TickerAdminResponse.FromString,
+                _registered_method=True)
         self.ConnectToMarketData = channel.unary_stream(
                 '/ticker_service.TickerService/ConnectToMarketData',
                 request_serializer=ticker__service__pb2.TickerRequest.SerializeToString,
                 response_deserializer=ticker__service__pb2.MarketData.FromString,
                 _registered_method=True)
+        self.GetMarketData = channel.unary_unary(
+                '/ticker_service.TickerService/GetMarketData',
+                request_serializer=ticker__service__pb2.TickerRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.MarketData.FromString,
+                _registered_method=True)
+        self.GetMarketDepth = channel.unary_unary(
+                '/ticker_service.TickerService/GetMarketDepth',
+                request_serializer=ticker__service__pb2.DepthRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.MarketDepth.FromString,
+                _registered_method=True)
+        self.ConnectToMarketDepth = channel.unary_stream(
+                '/ticker_service.TickerService/ConnectToMarketDepth',
+                request_serializer=ticker__service__pb2.DepthRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.MarketDepth.FromString,
+                _registered_method=True)
+        self.ConnectToOrderBookEvents = channel.unary_stream(
+                '/ticker_service.TickerService/ConnectToOrderBookEvents',
+                request_serializer=ticker__service__pb2.TickerRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.OrderBookEventBatch.FromString,
+                _registered_method=True)
+        self.GetOrderBookSnapshot = channel.unary_unary(
+                '/ticker_service.TickerService/GetOrderBookSnapshot',
+                request_serializer=ticker__service__pb2.TickerRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.OrderBookSnapshot.FromString,
+                _registered_method=True)
+        self.SubscribeMarketData = channel.unary_stream(
+                '/ticker_service.TickerService/SubscribeMarketData',
+                request_serializer=ticker__service__pb2.MultiTickerRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.MarketDataBatch.FromString,
+                _registered_method=True)
+        self.ManageMarketDataSubscription = channel.stream_stream(
+                '/ticker_service.TickerService/ManageMarketDataSubscription',
+                request_serializer=ticker__service__pb2.SubscriptionChange.SerializeToString,
+                response_deserializer=ticker__service__pb2.MarketDataBatch.FromString,
+                _registered_method=True)
+        self.ConnectToOrderUpdates = channel.unary_stream(
+                '/ticker_service.TickerService/ConnectToOrderUpdates',
+                request_serializer=ticker__service__pb2.OrderUpdatesRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.OrderUpdate.FromString,
+                _registered_method=True)
+        self.MassCancel = channel.unary_unary(
+                '/ticker_service.TickerService/MassCancel',
+                request_serializer=ticker__service__pb2.MassCancelRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.MassCancelResponse.FromString,
+                _registered_method=True)
+        self.SetTradingMode = channel.unary_unary(
+                '/ticker_service.TickerService/SetTradingMode',
+                request_serializer=ticker__service__pb2.TradingModeRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.TradingModeResponse.FromString,
+                _registered_method=True)
         self.SubmitLimitOrder = channel.unary_unary(
                 '/ticker_service.TickerService/SubmitLimitOrder',
                 request_serializer=ticker__service__pb2.LimitOrderRequest.SerializeToString,
@@ -54,6 +114,41 @@ class TickerServiceStub(object):
                 request_serializer=ticker__service__pb2.MarketOrderRequest.SerializeToString,
                 response_deserializer=ticker__service__pb2.OrderResponse.FromString,
                 _registered_method=True)
+        self.QueryTrades = channel.unary_stream(
+                '/ticker_service.TickerService/QueryTrades',
+                request_serializer=ticker__service__pb2.QueryTradesRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.TradeBatch.FromString,
+                _registered_method=True)
+        self.Replicate = channel.stream_stream(
+                '/ticker_service.TickerService/Replicate',
+                request_serializer=ticker__service__pb2.ReplicationAck.SerializeToString,
+                response_deserializer=ticker__service__pb2.ReplicationBatch.FromString,
+                _registered_method=True)
+        self.GetReplicationStatus = channel.unary_unary(
+                '/ticker_service.TickerService/GetReplicationStatus',
+                request_serializer=ticker__service__pb2.ReplicationStatusRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.ReplicationStatus.FromString,
+                _registered_method=True)
+        self.Promote = channel.unary_unary(
+                '/ticker_service.TickerService/Promote',
+                request_serializer=ticker__service__pb2.PromoteRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.ReplicationStatus.FromString,
+                _registered_method=True)
+        self.GetStats = channel.unary_unary(
+                '/ticker_service.TickerService/GetStats',
+                request_serializer=ticker__service__pb2.StatsRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.StatsResponse.FromString,
+                _registered_method=True)
+        self.Profile = channel.unary_unary(
+                '/ticker_service.TickerService/Profile',
+                request_serializer=ticker__service__pb2.ProfileRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.ProfileResponse.FromString,
+                _registered_method=True)
+        self.StopProfile = channel.unary_unary(
+                '/ticker_service.TickerService/StopProfile',
+                request_serializer=ticker__service__pb2.StopProfileRequest.SerializeToString,
+                response_deserializer=ticker__service__pb2.StopProfileResponse.FromString,
+                _registered_method=True)
 
 
 class TickerServiceServicer(object):
@@ -66,6 +161,20 @@ class TickerServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AddTickers(self, request, context):
+        """Register new tickers or rename existing ones
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RetireTickers(self, request, context):
+        """Retire tickers so they no longer accept orders
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ConnectToMarketData(self, request, context):
         """Connect to a stream of market data for a specific ticker
         """
@@ -73,6 +182,76 @@ class TickerServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetMarketData(self, request, context):
+        """Get the latest market data update published for a ticker, e.g. to initialize a view before streaming
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetMarketDepth(self, request, context):
+        """Get the aggregated depth of a ticker's book
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ConnectToMarketDepth(self, request, context):
+        """Connect to a stream of the depth of a ticker's book, a client that falls behind only gets the latest depth
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ConnectToOrderBookEvents(self, request, context):
+        """Connect to a stream of every change of the orders resting in a ticker's book (market by order)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetOrderBookSnapshot(self, request, context):
+        """Get the orders resting in a ticker's book and the sequence number of the latest book event they include
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeMarketData(self, request, context):
+        """Connect to one stream of market data for several tickers, starting with their latest updates
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ManageMarketDataSubscription(self, request_iterator, context):
+        """Like SubscribeMarketData, adding and removing tickers while the stream is open
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ConnectToOrderUpdates(self, request, context):
+        """Connect to a stream of cancels and expiries of the calling client's orders
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def MassCancel(self, request, context):
+        """Cancel all live orders of the calling client, optionally only for one ticker and/or side
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SetTradingMode(self, request, context):
+        """Switch a ticker between continuous matching and periodic call auctions
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def SubmitLimitOrder(self, request, context):
         """Submit a limit order
         """
@@ -87,6 +266,55 @@ class TickerServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def QueryTrades(self, request, context):
+        """Get the archived trades of a ticker in a time range, in batches (needs --archive-dir)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Replicate(self, request_iterator, context):
+        """Stream the command log of a primary server to a standby, which acknowledges the commands it applied
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetReplicationStatus(self, request, context):
+        """Get the replication role, position and lag of the server
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Promote(self, request, context):
+        """Turn a standby into a primary that accepts orders
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetStats(self, request, context):
+        """Get per-stage latency statistics of the server
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Profile(self, request, context):
+        """Profile the running server for a bounded duration
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StopProfile(self, request, context):
+        """End the running profiling session early
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TickerServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -95,11 +323,71 @@ def add_TickerServiceServicer_to_server(servicer, server):
                     request_deserializer=ticker__service__pb2.TickerRequest.FromString,
                     response_serializer=ticker__service__pb2.TickerResponse.SerializeToString,
             ),
+            'AddTickers': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddTickers,
+                    request_deserializer=ticker__service__pb2.AddTickersRequest.FromString,
+                    response_serializer=ticker__service__pb2.TickerAdminResponse.SerializeToString,
+            ),
+            'RetireTickers': grpc.unary_unary_rpc_method_handler(
+                    servicer.RetireTickers,
+                    request_deserializer=ticker__service__pb2.RetireTickersRequest.FromString,
+                    response_serializer=ticker__service__pb2.TickerAdminResponse.SerializeToString,
+            ),
             'ConnectToMarketData': grpc.unary_stream_rpc_method_handler(
                     servicer.ConnectToMarketData,
                     request_deserializer=ticker__service__pb2.TickerRequest.FromString,
                     response_serializer=ticker__service__pb2.MarketData.SerializeToString,
             ),
+            'GetMarketData': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetMarketData,
+                    request_deserializer=ticker__service__pb2.TickerRequest.FromString,
+                    response_serializer=ticker__service__pb2.MarketData.SerializeToString,
+            ),
+            'GetMarketDepth': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetMarketDepth,
+                    request_deserializer=ticker__service__pb2.DepthRequest.FromString,
+                    response_serializer=ticker__service__pb2.MarketDepth.SerializeToString,
+            ),
+            'ConnectToMarketDepth': grpc.unary_stream_rpc_method_handler(
+                    servicer.ConnectToMarketDepth,
+                    request_deserializer=ticker__service__pb2.DepthRequest.FromString,
+                    response_serializer=ticker__service__pb2.MarketDepth.SerializeToString,
+            ),
+            'ConnectToOrderBookEvents': grpc.unary_stream_rpc_method_handler(
+                    servicer.ConnectToOrderBookEvents,
+                    request_deserializer=ticker__service__pb2.TickerRequest.FromString,
+                    response_serializer=ticker__service__pb2.OrderBookEventBatch.SerializeToString,
+            ),
+            'GetOrderBookSnapshot': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetOrderBookSnapshot,
+                    request_deserializer=ticker__service__pb2.TickerRequest.FromString,
+                    response_serializer=ticker__service__pb2.OrderBookSnapshot.SerializeToString,
+            ),
+            'SubscribeMarketData': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeMarketData,
+                    request_deserializer=ticker__service__pb2.MultiTickerRequest.FromString,
+                    response_serializer=ticker__service__pb2.MarketDataBatch.SerializeToString,
+            ),
+            'ManageMarketDataSubscription': grpc.stream_stream_rpc_method_handler(
+                    servicer.ManageMarketDataSubscription,
+                    request_deserializer=ticker__service__pb2.SubscriptionChange.FromString,
+                    response_serializer=ticker__service__pb2.MarketDataBatch.SerializeToString,
+            ),
+            'ConnectToOrderUpdates': grpc.unary_stream_rpc_method_handler(
+                    servicer.ConnectToOrderUpdates,
+                    request_deserializer=ticker__service__pb2.OrderUpdatesRequest.FromString,
+                    response_serializer=ticker__service__pb2.OrderUpdate.SerializeToString,
+            ),
+            'MassCancel': grpc.unary_unary_rpc_method_handler(
+                    servicer.MassCancel,
+                    request_deserializer=ticker__service__pb2.MassCancelRequest.FromString,
+                    response_serializer=ticker__service__pb2.MassCancelResponse.SerializeToString,
+            ),
+            'SetTradingMode': grpc.unary_unary_rpc_method_handler(
+                    servicer.SetTradingMode,
+                    request_deserializer=ticker__service__pb2.TradingModeRequest.FromString,
+                    response_serializer=ticker__service__pb2.TradingModeResponse.SerializeToString,
+            ),
             'SubmitLimitOrder': grpc.unary_unary_rpc_method_handler(
                     servicer.SubmitLimitOrder,
                     request_deserializer=ticker__service__pb2.LimitOrderRequest.FromString,
@@ -110,6 +398,41 @@ def add_TickerServiceServicer_to_server(servicer, server):
                     request_deserializer=ticker__service__pb2.MarketOrderRequest.FromString,
                     response_serializer=ticker__service__pb2.OrderResponse.SerializeToString,
             ),
+            'QueryTrades': grpc.unary_stream_rpc_method_handler(
+                    servicer.QueryTrades,
+                    request_deserializer=ticker__service__pb2.QueryTradesRequest.FromString,
+                    response_serializer=ticker__service__pb2.TradeBatch.SerializeToString,
+            ),
+            'Replicate': grpc.stream_stream_rpc_method_handler(
+                    servicer.Replicate,
+                    request_deserializer=ticker__service__pb2.ReplicationAck.FromString,
+                    response_serializer=ticker__service__pb2.ReplicationBatch.SerializeToString,
+            ),
+            'GetReplicationStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetReplicationStatus,
+                    request_deserializer=ticker__service__pb2.ReplicationStatusRequest.FromString,
+                    response_serializer=ticker__service__pb2.ReplicationStatus.SerializeToString,
+            ),
+            'Promote': grpc.unary_unary_rpc_method_handler(
+                    servicer.Promote,
+                    request_deserializer=ticker__service__pb2.PromoteRequest.FromString,
+                    response_serializer=ticker__service__pb2.ReplicationStatus.SerializeToString,
+            ),
+            'GetStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStats,
+                    request_deserializer=ticker__service__pb2.StatsRequest.FromString,
+                    response_serializer=ticker__service__pb2.StatsResponse.SerializeToString,
+            ),
+            'Profile': grpc.unary_unary_rpc_method_handler(
+                    servicer.Profile,
+                    request_deserializer=ticker__service__pb2.ProfileRequest.FromString,
+                    response_serializer=ticker__service__pb2.ProfileResponse.SerializeToString,
+            ),
+            'StopProfile': grpc.unary_unary_rpc_method_handler(
+                    servicer.StopProfile,
+                    request_deserializer=ticker__service__pb2.StopProfileRequest.FromString,
+                    response_serializer=ticker__service__pb2.StopProfileResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'ticker_service.TickerService', rpc_method_handlers)
@@ -148,6 +471,60 @@ class TickerService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def AddTickers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/AddTickers',
+            ticker__service__pb2.AddTickersRequest.SerializeToString,
+            ticker__service__pb2.TickerAdminResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RetireTickers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/RetireTickers',
+            ticker__service__pb2.RetireTickersRequest.SerializeToString,
+            ticker__service__pb2.TickerAdminResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ConnectToMarketData(request,
             target,
@@ -176,7 +553,7 @@ class TickerService(object):
             _registered_method=True)
 
     @staticmethod
-    def SubmitLimitOrder(request,
+    def GetMarketData(request,
             target,
             options=(),
             channel_credentials=None,
@@ -189,9 +566,9 @@ class TickerService(object):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/ticker_service.TickerService/SubmitLimitOrder',
-            ticker__service__pb2.LimitOrderRequest.SerializeToString,
-            ticker__service__pb2.OrderResponse.FromString,
+            '/ticker_service.TickerService/GetMarketData',
+            ticker__service__pb2.TickerRequest.SerializeToString,
+            ticker__service__pb2.MarketData.FromString,
             options,
             channel_credentials,
             insecure,
@@ -203,7 +580,7 @@ class TickerService(object):
             _registered_method=True)
 
     @staticmethod
-    def SubmitMarketOrder(request,
+    def GetMarketDepth(request,
             target,
             options=(),
             channel_credentials=None,
@@ -216,9 +593,468 @@ class TickerService(object):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/ticker_service.TickerService/SubmitMarketOrder',
-            ticker__service__pb2.MarketOrderRequest.SerializeToString,
-            ticker__service__pb2.OrderResponse.FromString,
+            '/ticker_service.TickerService/GetMarketDepth',
+            ticker__service__pb2.DepthRequest.SerializeToString,
+            ticker__service__pb2.MarketDepth.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ConnectToMarketDepth(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ticker_service.TickerService/ConnectToMarketDepth',
+            ticker__service__pb2.DepthRequest.SerializeToString,
+            ticker__service__pb2.MarketDepth.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ConnectToOrderBookEvents(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ticker_service.TickerService/ConnectToOrderBookEvents',
+            ticker__service__pb2.TickerRequest.SerializeToString,
+            ticker__service__pb2.OrderBookEventBatch.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetOrderBookSnapshot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/GetOrderBookSnapshot',
+            ticker__service__pb2.TickerRequest.SerializeToString,
+            ticker__service__pb2.OrderBookSnapshot.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubscribeMarketData(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ticker_service.TickerService/SubscribeMarketData',
+            ticker__service__pb2.MultiTickerRequest.SerializeToString,
+            ticker__service__pb2.MarketDataBatch.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ManageMarketDataSubscription(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/ticker_service.TickerService/ManageMarketDataSubscription',
+            ticker__service__pb2.SubscriptionChange.SerializeToString,
+            ticker__service__pb2.MarketDataBatch.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ConnectToOrderUpdates(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ticker_service.TickerService/ConnectToOrderUpdates',
+            ticker__service__pb2.OrderUpdatesRequest.SerializeToString,
+            ticker__service__pb2.OrderUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def MassCancel(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/MassCancel',
+            ticker__service__pb2.MassCancelRequest.SerializeToString,
+            ticker__service__pb2.MassCancelResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SetTradingMode(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/SetTradingMode',
+            ticker__service__pb2.TradingModeRequest.SerializeToString,
+            ticker__service__pb2.TradingModeResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitLimitOrder(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/SubmitLimitOrder',
+            ticker__service__pb2.LimitOrderRequest.SerializeToString,
+            ticker__service__pb2.OrderResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitMarketOrder(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/SubmitMarketOrder',
+            ticker__service__pb2.MarketOrderRequest.SerializeToString,
+            ticker__service__pb2.OrderResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def QueryTrades(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/ticker_service.TickerService/QueryTrades',
+            ticker__service__pb2.QueryTradesRequest.SerializeToString,
+            ticker__service__pb2.TradeBatch.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Replicate(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/ticker_service.TickerService/Replicate',
+            ticker__service__pb2.ReplicationAck.SerializeToString,
+            ticker__service__pb2.ReplicationBatch.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetReplicationStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/GetReplicationStatus',
+            ticker__service__pb2.ReplicationStatusRequest.SerializeToString,
+            ticker__service__pb2.ReplicationStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Promote(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/Promote',
+            ticker__service__pb2.PromoteRequest.SerializeToString,
+            ticker__service__pb2.ReplicationStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/GetStats',
+            ticker__service__pb2.StatsRequest.SerializeToString,
+            ticker__service__pb2.StatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Profile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/Profile',
+            ticker__service__pb2.ProfileRequest.SerializeToString,
+            ticker__service__pb2.ProfileResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StopProfile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ticker_service.TickerService/StopProfile',
+            ticker__service__pb2.StopProfileRequest.SerializeToString,
+            ticker__service__pb2.StopProfileResponse.FromString,
             options,
             channel_credentials,
             insecure,
@@ -0,0 +1,86 @@
+import time
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel for large numbers of deadlines, such as order expiries.
+
+    Level 0 has one slot per tick; each higher level has slots that are
+    wheel_size times wider. A timer goes into the lowest level whose span covers
+    its deadline and moves down a level each time the wheel reaches its slot,
+    so scheduling is O(1) and every timer is touched at most `levels` times
+    before it expires. Timers are not removed when cancelled: the caller checks
+    whether an expired item is still live, which keeps cancellation free.
+    """
+
+    def __init__(self, tick_ns=10_000_000, wheel_size=256, levels=4, start_ns=None):
+        self.tick_ns = tick_ns
+        self.wheel_size = wheel_size
+        self.levels = [[[] for _ in range(wheel_size)] for _ in range(levels)]
+        self.spans = [wheel_size ** level for level in range(levels + 1)]  # Ticks per slot at each level
+        self.current_tick = (start_ns if start_ns is not None else time.monotonic_ns()) // tick_ns
+        self.count = 0  # Scheduled timers, including cancelled ones not yet reached
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, deadline_ns, item):
+        """
+        Schedule `item` to be returned by advance() once the clock passes deadline_ns.
+        Deadlines already in the past expire on the next tick.
+        """
+        deadline_tick = max(-(-deadline_ns // self.tick_ns), self.current_tick + 1)
+        self._insert(deadline_tick, item)
+        self.count += 1
+
+    def _insert(self, deadline_tick, item):
+        ticks = deadline_tick - self.current_tick
+        spans = self.spans
+        for level, slots in enumerate(self.levels):
+            if ticks < spans[level + 1]:
+                slots[(deadline_tick // spans[level]) % self.wheel_size].append((deadline_tick, item))
+                return
+        # Beyond the top level: park it in the furthest top level slot, it is re-placed when that slot cascades
+        top = len(self.levels) - 1
+        furthest_tick = self.current_tick + spans[top + 1] - 1
+        self.levels[top][(furthest_tick // spans[top]) % self.wheel_size].append((deadline_tick, item))
+
+    def advance(self, now_ns=None):
+        """
+        Move the wheel forward to now_ns.
+        Returns:
+            list: the items whose deadline has passed, in deadline order by tick
+        """
+        now_tick = (now_ns if now_ns is not None else time.monotonic_ns()) // self.tick_ns
+        expired = []
+        if self.count == 0:
+            self.current_tick = max(self.current_tick, now_tick)
+            return expired
+
+        spans = self.spans
+        wheel_size = self.wheel_size
+        level_0 = self.levels[0]
+        while self.current_tick < now_tick and self.count:
+            tick = self.current_tick = self.current_tick + 1
+            # Move due timers down from the widest level first, so they can cascade more than one level
+            for level in range(len(self.levels) - 1, 0, -1):
+                if tick % spans[level] == 0:
+                    slots = self.levels[level]
+                    index = (tick // spans[level]) % wheel_size
+                    timers, slots[index] = slots[index], []
+                    for deadline_tick, item in timers:
+                        self._insert(deadline_tick, item)
+
+            index = tick % wheel_size
+            timers = level_0[index]
+            if timers:
+                level_0[index] = []
+                for deadline_tick, item in timers:
+                    if deadline_tick <= tick:
+                        expired.append(item)
+                        self.count -= 1
+                    else:
+                        self._insert(deadline_tick, item)  # Parked beyond the wheel's range
+
+        self.current_tick = max(self.current_tick, now_tick)
+        return expired